@@ -0,0 +1,3 @@
+"""
+Benchmarks of the pyenvoy client; run them with python -m benchmarks.bench_client.
+"""
@@ -0,0 +1,273 @@
+"""
+Benchmarks of the pyenvoy client hot paths against the in-process mock Envoy node.
+
+Measures requests per second, the per-call overhead of the client without the network,
+the throughput of scanning a paginated collection, the transactions export in MB/s, and
+the cost of wrapping records. Results can be saved to a JSON file and compared with a
+previous run to catch regressions; the script exits non-zero if any metric regresses by
+more than the threshold.
+
+Note that the mock node runs in the same process as the client, so absolute numbers
+(particularly for concurrent requests) are lower than against a real node and should
+only be compared with other runs on the same machine.
+
+Usage (from the root of the repository so that the envoy package can be imported):
+
+    python -m benchmarks.bench_client
+    python -m benchmarks.bench_client --save baseline.json
+    python -m benchmarks.bench_client --compare baseline.json --threshold 0.2
+"""
+
+import io
+import sys
+import json
+import time
+import argparse
+
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+
+from envoy.batch import imap
+from envoy.mock import MockEnvoy
+from envoy.credentials import Credentials
+from envoy.transactions import PaginatedTransactions
+
+
+class Metric(object):
+
+    def __init__(self, name, value, unit, higher_is_better=True):
+        self.name = name
+        self.value = value
+        self.unit = unit
+        self.higher_is_better = higher_is_better
+
+    def regression(self, baseline: float) -> float:
+        """
+        Returns the fractional regression of this metric from the baseline (positive
+        values are worse than the baseline).
+        """
+        if not baseline:
+            return 0.0
+        if self.higher_is_better:
+            return (baseline - self.value) / baseline
+        return (self.value - baseline) / baseline
+
+    def to_dict(self) -> dict:
+        return {
+            "value": self.value,
+            "unit": self.unit,
+            "higher_is_better": self.higher_is_better,
+        }
+
+
+class NullSession(object):
+    """
+    A session that returns the same response to every request without any network
+    I/O so that only the work done by the client itself is measured.
+    """
+
+    def __init__(self, data):
+        self.response = Response()
+        self.response.status_code = 200
+        self.response.headers = CaseInsensitiveDict(
+            {"Content-Type": "application/json; charset=utf-8"}
+        )
+        self.response._content = json.dumps(data).encode("utf-8")
+
+    def request(self, method, uri, **kwargs):
+        return self.response
+
+    def close(self):
+        pass
+
+
+def best_of(repeat: int, func) -> float:
+    """
+    Returns the fastest wall clock time in seconds of repeat calls to func.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_requests(envoy, n, repeat, workers=8):
+    metrics = []
+    with envoy.client(pool_maxsize=workers) as client:
+        rids = list(envoy.data["transactions"])[:n]
+        client.transactions.detail(rids[0])
+
+        elapsed = best_of(repeat, lambda: [client.transactions.detail(r) for r in rids])
+        metrics.append(Metric("requests_sequential", n / elapsed, "req/s"))
+
+        def concurrent():
+            for result in imap(client.transactions.detail, rids, workers):
+                if not result.ok:
+                    raise result.error
+
+        elapsed = best_of(repeat, concurrent)
+        metrics.append(Metric(f"requests_concurrent_{workers}", n / elapsed, "req/s"))
+    return metrics
+
+
+def bench_overhead(envoy, n, repeat):
+    tx = next(iter(envoy.data["transactions"].values()))
+    with envoy.client() as client:
+        tokens = envoy.issue_credentials()
+        client._creds = Credentials(tokens["access_token"], tokens["refresh_token"])
+        client.session = NullSession(tx)
+
+        def calls():
+            for _ in range(n):
+                client.get("transactions", tx["id"])
+
+        elapsed = best_of(repeat, calls)
+    return [Metric("client_overhead", elapsed / n * 1e6, "us/call", False)]
+
+
+def bench_pagination(envoy, repeat):
+    metrics = []
+    n = len(envoy.data["transactions"])
+    with envoy.client() as client:
+        client.transactions.list({"page_size": 1})
+        for prefetch in (False, True):
+            elapsed = best_of(
+                repeat,
+                lambda: sum(
+                    1
+                    for _ in client.transactions.iter_all(
+                        {"page_size": envoy.page_size}, prefetch=prefetch
+                    )
+                ),
+            )
+            name = "pagination_prefetch" if prefetch else "pagination"
+            metrics.append(Metric(name, n / elapsed, "records/s"))
+    return metrics
+
+
+def bench_export(envoy, repeat):
+    size = len(envoy.export_csv()) / 1e6
+    with envoy.client() as client:
+        client.transactions.list({"page_size": 1})
+        elapsed = best_of(repeat, lambda: client.transactions.export(io.StringIO()))
+    return [Metric("export", size / elapsed, "MB/s")]
+
+
+def bench_records(envoy, repeat):
+    page = {
+        "transactions": list(envoy.data["transactions"].values()),
+        "page": {"page_size": len(envoy.data["transactions"])},
+    }
+    n = len(page["transactions"])
+
+    def wrap():
+        for tx in PaginatedTransactions(page, lazy=True):
+            tx["id"], tx["amount"]
+
+    elapsed = best_of(repeat, wrap)
+    return [Metric("record_wrapping", elapsed / n * 1e6, "us/record", False)]
+
+
+def run(args) -> list:
+    with MockEnvoy(
+        transactions=args.transactions, page_size=args.page_size, latency=args.latency
+    ) as envoy:
+        metrics = []
+        metrics.extend(bench_requests(envoy, args.requests, args.repeat))
+        metrics.extend(bench_overhead(envoy, args.requests * 10, args.repeat))
+        metrics.extend(bench_pagination(envoy, args.repeat))
+        metrics.extend(bench_export(envoy, args.repeat))
+        metrics.extend(bench_records(envoy, args.repeat))
+        return metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="benchmark the pyenvoy client against a mock envoy node",
+    )
+    parser.add_argument(
+        "-n",
+        "--requests",
+        type=int,
+        default=500,
+        help="the number of requests to make in the request benchmarks",
+    )
+    parser.add_argument(
+        "-T",
+        "--transactions",
+        type=int,
+        default=20000,
+        help="the number of transactions served by the mock node",
+    )
+    parser.add_argument(
+        "-p",
+        "--page-size",
+        type=int,
+        default=100,
+        help="the page size used by the pagination benchmarks",
+    )
+    parser.add_argument(
+        "-l",
+        "--latency",
+        type=float,
+        default=0.0,
+        help="seconds of latency the mock node adds to each response",
+    )
+    parser.add_argument(
+        "-r",
+        "--repeat",
+        type=int,
+        default=3,
+        help="the number of times to run each benchmark (the best time is kept)",
+    )
+    parser.add_argument(
+        "-q",
+        "--quick",
+        action="store_true",
+        help="run a small version of every benchmark as a smoke test",
+    )
+    parser.add_argument("--save", metavar="PATH", help="save the results as JSON")
+    parser.add_argument(
+        "--compare", metavar="PATH", help="compare the results to a saved baseline"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="the fractional regression from the baseline that fails the comparison",
+    )
+
+    args = parser.parse_args()
+    if args.quick:
+        args.requests, args.transactions, args.repeat = 50, 1000, 1
+
+    metrics = run(args)
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    regressions = []
+    print(f"{'benchmark':<28} {'result':>14}  {'unit':<10} {'change':>8}")
+    for metric in metrics:
+        change = ""
+        if metric.name in baseline:
+            regression = metric.regression(baseline[metric.name]["value"])
+            change = f"{-regression:+.1%}"
+            if regression > args.threshold:
+                regressions.append(metric.name)
+        print(f"{metric.name:<28} {metric.value:>14.2f}  {metric.unit:<10} {change:>8}")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({m.name: m.to_dict() for m in metrics}, f, indent=2)
+
+    if regressions:
+        print(f"regressions: {', '.join(regressions)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
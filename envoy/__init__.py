@@ -28,7 +28,7 @@ from dotenv import load_dotenv
 from envoy.client import Client
 
 
-def connect(url=None, client_id=None, client_secret=None, timeout=None):
+def connect(url=None, client_id=None, client_secret=None, timeout=None, **kwargs):
     """
     Create an API client with the specified URL and api key material. If not specified,
     this function will first load any .env files in the local path, then attempt to
@@ -50,6 +50,10 @@ def connect(url=None, client_id=None, client_secret=None, timeout=None):
 
     timeout : float
         The number of seconds to wait for a response until error.
+
+    kwargs : dict
+        Additional keyword arguments are passed to the Client, e.g. to enable the
+        background refresh of credentials with auto_refresh=True.
     """
 
     if url is None or client_id is None or client_secret is None:
@@ -59,7 +63,11 @@ def connect(url=None, client_id=None, client_secret=None, timeout=None):
     # create the client and perform the pre-flight now to authorize the client
     # now so the client's first actual data request isn't delayed by seconds
     client = Client(
-        url=url, client_id=client_id, client_secret=client_secret, timeout=timeout
+        url=url,
+        client_id=client_id,
+        client_secret=client_secret,
+        timeout=timeout,
+        **kwargs,
     )
     client._pre_flight(require_authentication=True)
     return client
@@ -82,6 +82,7 @@ def main():
             client_id=args.client_id,
             client_secret=args.secret,
             timeout=args.timeout,
+            pool_maxsize=max(16, getattr(args, "workers", 1)),
         )
 
         args.func(client, args)
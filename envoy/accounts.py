@@ -17,9 +17,16 @@ from envoy.transactions import PaginatedTransactions
 
 class Account(Record):
 
-    def __init__(self, data=None, **kwargs):
-        super(Account, self).__init__(data, **kwargs)
-        self.crypto_addresses = CryptoAddresses(self, self.parent.client)
+    __slots__ = ("_crypto_addresses",)
+
+    @property
+    def crypto_addresses(self) -> "CryptoAddresses":
+        # The nested resource is only created when it is first accessed
+        try:
+            return self._crypto_addresses
+        except AttributeError:
+            self._crypto_addresses = CryptoAddresses(self, self.parent.client)
+            return self._crypto_addresses
 
 
 class PaginatedAccounts(PaginatedRecords):
@@ -27,11 +34,12 @@ class PaginatedAccounts(PaginatedRecords):
     CollectionKey = "accounts"
 
     def cast(self, item):
-        return Account(item, parent=self.parent)
+        return Account(item, parent=self.parent, lazy=self._lazy)
 
 
 class CryptoAddress(Record):
-    pass
+
+    __slots__ = ()
 
 
 class PaginatedCryptoAddresses(PaginatedRecords):
@@ -39,7 +47,7 @@ class PaginatedCryptoAddresses(PaginatedRecords):
     CollectionKey = "crypto_addresses"
 
     def cast(self, item):
-        return CryptoAddress(item)
+        return CryptoAddress(item, lazy=self._lazy)
 
 
 ##########################################################################
@@ -52,6 +60,9 @@ class Accounts(Resource):
     RecordType = Account
     RecordListType = PaginatedAccounts
 
+    # An envoy.resolver.AddressResolver used to look up accounts from a local index
+    resolver = None
+
     @property
     def endpoint(self):
         return "accounts"
@@ -59,6 +70,9 @@ class Accounts(Resource):
     def lookup(self, crypto_address: str, params: dict = None) -> dict:
         """Lookup a customer account record by a crypto wallet address
 
+        If a resolver has been assigned to the resource, the account is looked up in
+        its local index first and the API is only used if the address is not found.
+
         Parameters
         ----------
         crypto_address : str
@@ -71,7 +85,11 @@ class Accounts(Resource):
         dict
             an account
         """
+        if self.resolver is not None and not params:
+            return self.resolver.lookup(crypto_address)
+        return self._lookup(crypto_address, params)
 
+    def _lookup(self, crypto_address: str, params: dict = None) -> dict:
         if params:
             params.update({"crypto_address": crypto_address})
         else:
@@ -85,6 +103,7 @@ class Accounts(Resource):
                 require_authentication=True,
             ),
             parent=self,
+            lazy=True,
         )
 
     def transfers(self, rid: str, params: dict = None) -> list[dict]:
@@ -113,6 +132,7 @@ class Accounts(Resource):
                 require_authentication=True,
             ),
             parent=self,
+            lazy=True,
         )
 
     def qrcode(self, rid: str) -> BytesIO:
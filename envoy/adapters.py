@@ -0,0 +1,78 @@
+"""
+A requests transport adapter that measures how long it takes to open connections to
+the Envoy node so that request timings can be split into connecting (including the DNS
+lookup and TLS handshake), waiting for the first byte, and reading the response body.
+"""
+
+import time
+import threading
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+
+# Connect timings are recorded per thread since requests are sent on the caller's thread
+_timings = threading.local()
+
+
+def reset_connect_time() -> None:
+    """
+    Resets the connect time of the current thread before sending a request.
+    """
+    _timings.connect = 0.0
+
+
+def connect_time() -> float:
+    """
+    Returns the number of seconds spent opening connections on the current thread since
+    the last reset (0 if an existing connection from the pool was reused).
+    """
+    return getattr(_timings, "connect", 0.0)
+
+
+def _record_connect(started: float) -> None:
+    _timings.connect = connect_time() + (time.perf_counter() - started)
+
+
+class TimedHTTPConnection(HTTPConnection):
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            super(TimedHTTPConnection, self).connect()
+        finally:
+            _record_connect(started)
+
+
+class TimedHTTPSConnection(HTTPSConnection):
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            super(TimedHTTPSConnection, self).connect()
+        finally:
+            _record_connect(started)
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """
+    An HTTPAdapter whose connection pools record the time spent opening connections.
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        super(TimedHTTPAdapter, self).init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": TimedHTTPConnectionPool,
+            "https": TimedHTTPSConnectionPool,
+        }
@@ -0,0 +1,63 @@
+"""
+An asyncio API client for TRISA Envoy nodes. The AsyncClient mirrors the resources and
+methods of envoy.client.Client, but all of its methods are awaitable and share a single
+connection pool so that many requests can be in flight from one event loop. This
+package requires the optional httpx dependency (`pip install pyenvoy[aio]`).
+"""
+
+##########################################################################
+## Primary API entry point
+##########################################################################
+
+from dotenv import load_dotenv
+from envoy.aio.client import AsyncClient
+
+
+async def connect(url=None, client_id=None, client_secret=None, timeout=None, **kwargs):
+    """
+    Create an asyncio API client with the specified URL and api key material. If not
+    specified, this function will first load any .env files in the local path, then
+    attempt to configure the client from the environment.
+
+    Parameters
+    ----------
+    url : str
+        The URL of your Envoy server (e.g. https://myenvoy.tr-envoy.com). If not
+        set, it is discovered from the $ENVOY_URL environment variable.
+
+    client_id : str
+        The Client ID from your API Key to access your Envoy server. If not set, it
+        is discovered from the $ENVOY_CLIENT_ID environment variable.
+
+    client_secret : str
+        The Client Secret from your API Key to access your Envoy server. If not set,
+        it is discovered from the $ENVOY_CLIENT_SECRET environment variable.
+
+    timeout : float
+        The number of seconds to wait for a response until error.
+
+    kwargs : dict
+        Additional keyword arguments are passed to the AsyncClient, e.g. to limit the
+        number of concurrent connections with max_connections.
+    """
+
+    if url is None or client_id is None or client_secret is None:
+        # We need to load information from the environment
+        load_dotenv()
+
+    # create the client and perform the pre-flight now to authorize the client
+    # now so the client's first actual data request isn't delayed by seconds
+    client = AsyncClient(
+        url=url,
+        client_id=client_id,
+        client_secret=client_secret,
+        timeout=timeout,
+        **kwargs,
+    )
+    try:
+        await client._pre_flight(require_authentication=True)
+    except BaseException:
+        # Do not leak the connection pool of a client that could not be authorized
+        await client.close()
+        raise
+    return client
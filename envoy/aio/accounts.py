@@ -0,0 +1,175 @@
+"""
+Asyncio resource that manages the customer accounts the Envoy node knows about.
+"""
+
+from io import BytesIO
+
+from envoy.aio import client
+from envoy.aio.resource import Resource
+from envoy.records import Record, PaginatedRecords
+from envoy.aio.transactions import PaginatedTransactions
+from envoy.accounts import CryptoAddress, PaginatedCryptoAddresses
+
+
+##########################################################################
+## Data Records
+##########################################################################
+
+
+class Account(Record):
+
+    __slots__ = ("_crypto_addresses",)
+
+    @property
+    def crypto_addresses(self) -> "CryptoAddresses":
+        # The nested resource is only created when it is first accessed
+        try:
+            return self._crypto_addresses
+        except AttributeError:
+            self._crypto_addresses = CryptoAddresses(self, self.parent.client)
+            return self._crypto_addresses
+
+
+class PaginatedAccounts(PaginatedRecords):
+
+    CollectionKey = "accounts"
+
+    def cast(self, item):
+        return Account(item, parent=self.parent, lazy=self._lazy)
+
+
+##########################################################################
+## API Resources
+##########################################################################
+
+
+class Accounts(Resource):
+
+    RecordType = Account
+    RecordListType = PaginatedAccounts
+
+    @property
+    def endpoint(self):
+        return "accounts"
+
+    async def lookup(self, crypto_address: str, params: dict = None) -> dict:
+        """Lookup a customer account record by a crypto wallet address
+
+        Parameters
+        ----------
+        crypto_address : str
+            the crypto wallet address to lookup the associated account for
+        params : dict, optional
+            additional query parameters, by default None
+
+        Returns
+        -------
+        dict
+            an account
+        """
+
+        if params:
+            params.update({"crypto_address": crypto_address})
+        else:
+            params = {"crypto_address": crypto_address}
+
+        return self.RecordType(
+            await self.client.get(
+                *self._endpoint(),
+                "lookup",
+                params=params,
+                require_authentication=True,
+            ),
+            parent=self,
+            lazy=True,
+        )
+
+    async def transfers(self, rid: str, params: dict = None) -> list[dict]:
+        """Search for all transfers related to the account by matching the associated
+        crypto wallet addresses.
+
+        Parameters
+        ----------
+        rid : str
+            the ID of the account to list transfers for
+        params : dict, optional
+            additional query parameters, by default None
+
+        Returns
+        -------
+        list[dict]
+            a list of all transfers related to the account
+        """
+
+        return PaginatedTransactions(
+            await self.client.get(
+                *self._endpoint(),
+                rid,
+                "transfers",
+                params=params,
+                require_authentication=True,
+            ),
+            parent=self,
+            lazy=True,
+        )
+
+    async def qrcode(self, rid: str) -> BytesIO:
+        """Generate and download a QR code for the account travel address.
+
+        Parameters
+        ----------
+        rid : str
+            the ID of the crypto address to generate a QR code for
+
+        Returns
+        -------
+        BytesIO
+            the QR code image bytes
+        """
+
+        return BytesIO(
+            await self.client.get(
+                *self._endpoint(),
+                rid,
+                "qrcode",
+                require_authentication=True,
+            )
+        )
+
+
+class CryptoAddresses(Resource):
+
+    RecordType = CryptoAddress
+    RecordListType = PaginatedCryptoAddresses
+
+    def __init__(self, account: Account, client: "client.AsyncClient"):
+        super(CryptoAddresses, self).__init__(client)
+        self.account = account
+
+    @property
+    def endpoint(self):
+        return ("accounts", self.account["id"], "crypto-addresses")
+
+    async def qrcode(self, rid: str) -> BytesIO:
+        """Generate and download a QR code for the travel address associated with the
+        crypto wallet address.
+
+        Parameters
+        ----------
+        rid : str
+            the ID of the crypto address to generate a QR code for
+
+        Returns
+        -------
+        BytesIO
+            the QR code image bytes
+        """
+
+        return BytesIO(
+            await self.client.get(
+                *self._endpoint(),
+                rid,
+                "qrcode",
+                require_authentication=True,
+            )
+        )
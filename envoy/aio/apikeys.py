@@ -0,0 +1,16 @@
+"""
+Asyncio resource that manages the api keys that can access the Envoy node.
+"""
+
+from envoy.aio.resource import Resource
+from envoy.apikeys import APIKey, PaginatedAPIKeys
+
+
+class APIKeys(Resource):
+
+    RecordType = APIKey
+    RecordListType = PaginatedAPIKeys
+
+    @property
+    def endpoint(self):
+        return "apikeys"
@@ -0,0 +1,29 @@
+"""
+Asyncio resource that lists compliance audit logs for the Envoy node.
+"""
+
+from envoy.aio.resource import Resource
+from envoy.exceptions import ReadOnlyEndpoint
+from envoy.auditlogs import AuditLog, PaginatedAuditLogs
+
+
+class AuditLogs(Resource):
+
+    RecordType = AuditLog
+    RecordListType = PaginatedAuditLogs
+
+    @property
+    def endpoint(self):
+        return "auditlogs"
+
+    async def create(self) -> None:
+        """Audit logs are a read-only resource; this function will raise envoy.exceptions.ReadOnlyEndpoint."""
+        raise ReadOnlyEndpoint
+
+    async def update(self) -> None:
+        """Audit logs are a read-only resource; this function will raise envoy.exceptions.ReadOnlyEndpoint."""
+        raise ReadOnlyEndpoint
+
+    async def delete(self) -> None:
+        """Audit logs are a read-only resource; this function will raise envoy.exceptions.ReadOnlyEndpoint."""
+        raise ReadOnlyEndpoint
@@ -0,0 +1,382 @@
+"""
+Implements the asyncio API client that manages the authentication state of requests to
+and from the Envoy server. This is a lower level object and should only be used by
+advanced users.
+"""
+
+from __future__ import annotations
+
+import time
+import asyncio
+import logging
+
+from typing import Optional
+
+from envoy.credentials import Credentials
+from envoy.hooks import REQUEST_START, REQUEST_END, RETRY, ERROR
+from envoy.client import BaseClient
+from envoy.exceptions import AuthenticationError, ClientError
+
+from envoy.aio.users import Users
+from envoy.aio.apikeys import APIKeys
+from envoy.aio.accounts import Accounts
+from envoy.aio.utilities import Utilities
+from envoy.aio.auditlogs import AuditLogs
+from envoy.aio.transactions import Transactions
+from envoy.aio.counterparties import Counterparties
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+
+# Setup debug logging for pyenvoy
+logger = logging.getLogger("envoy")
+
+
+class AsyncClient(BaseClient):
+    """
+    Create an AsyncClient object to make awaitable API calls to your Envoy API. All
+    requests share a single httpx connection pool so that one event loop can keep many
+    requests in flight to the Envoy node at the same time. The client should be closed
+    when it is no longer needed, preferably by using it as an async context manager.
+
+    Parameters
+    ----------
+    url : str
+        The URL of your Envoy server (e.g. https://myenvoy.tr-envoy.com). If not
+        set, it is discovered from the $ENVOY_URL environment variable.
+
+    client_id : str
+        The Client ID from your API Key to access your Envoy server. If not set, it
+        is discovered from the $ENVOY_CLIENT_ID environment variable.
+
+    client_secret : str
+        The Client Secret from your API Key to access your Envoy server. If not set,
+        it is discovered from the $ENVOY_CLIENT_SECRET environment variable.
+
+    timeout : float
+        The number of seconds to wait for a response until error.
+
+    max_connections : int
+        The maximum number of concurrent connections that may be opened to the node;
+        requests beyond this limit wait for a connection to become available.
+
+    max_keepalive_connections : int
+        The maximum number of idle connections to keep in the pool.
+
+    max_retries : int
+        The maximum number of retries each connection should attempt. Note, this
+        applies only to failed socket connections and connection timeouts, never to
+        requests where data has made it to the server.
+
+    leeway : float
+        The number of seconds of clock skew to tolerate between the client and the
+        Envoy node when checking if the access and refresh tokens have expired.
+
+    codec : JSONCodec or str
+        The JSON codec used to serialize request bodies and parse response bodies,
+        either a codec or the name of one ("orjson", "ujson", or "json"). By default
+        the fastest installed codec is used.
+
+    log_payloads : bool
+        If True, request bodies are logged when the envoy logger is enabled for debug
+        messages; otherwise only the size of request and response bodies is logged.
+
+    retry : RetryPolicy or int or bool
+        If specified, requests that fail with a 429, 502, 503, or 504 response are
+        retried with exponential backoff and jitter (or after the Retry-After of the
+        response). Specify True to use the default RetryPolicy, the maximum number of
+        retries, or a RetryPolicy. Only idempotent requests are retried on 5xx errors.
+
+    hooks : Hooks
+        Callbacks for the request_start, request_end, retry, and error events of the
+        client's requests. Only the total time of each request is measured.
+
+    transport : httpx.AsyncBaseTransport
+        The transport that sends requests, e.g. an httpx.MockTransport in tests. By
+        default an httpx.AsyncHTTPTransport with the connection limits is used.
+    """
+
+    def __init__(
+        self,
+        url=None,
+        client_id=None,
+        client_secret=None,
+        timeout=None,
+        max_connections=100,
+        max_keepalive_connections=20,
+        max_retries=3,
+        leeway=0.0,
+        codec=None,
+        log_payloads=True,
+        retry=None,
+        hooks=None,
+        transport=None,
+    ):
+        if httpx is None:
+            raise ImportError(
+                "the httpx package is required to use the asyncio client, "
+                "install it with `pip install pyenvoy[aio]`"
+            )
+
+        super(AsyncClient, self).__init__(
+            url=url,
+            client_id=client_id,
+            client_secret=client_secret,
+            timeout=timeout,
+            leeway=leeway,
+            codec=codec,
+            log_payloads=log_payloads,
+            retry=retry,
+            hooks=hooks,
+        )
+
+        # Ensures that only one coroutine authenticates at a time
+        self._auth_lock = asyncio.Lock()
+
+        # Configure HTTP requests with a shared httpx connection pool
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+        )
+        if transport is None:
+            transport = httpx.AsyncHTTPTransport(limits=limits, retries=max_retries)
+        self.session = httpx.AsyncClient(limits=limits, transport=transport)
+
+        # Configure REST resources on the client
+        self.accounts = Accounts(self)
+        self.transactions = Transactions(self)
+        self.counterparties = Counterparties(self)
+        self.users = Users(self)
+        self.apikeys = APIKeys(self)
+        self.utilities = Utilities(self)
+        self.auditlogs = AuditLogs(self)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        """
+        Closes all of the connections in the connection pool.
+        """
+        await self.session.aclose()
+
+    async def status(self):
+        return await self.get("status", require_authentication=False)
+
+    async def get(
+        self,
+        *endpoint,
+        params: Optional[dict] = None,
+        require_authentication: bool = True,
+    ):
+        return await self._request(
+            "GET",
+            endpoint,
+            params=params,
+            require_authentication=require_authentication,
+        )
+
+    async def post(
+        self,
+        data,
+        *endpoint,
+        params: Optional[dict] = None,
+        require_authentication: bool = True,
+    ):
+        return await self._request(
+            "POST",
+            endpoint,
+            data=data,
+            params=params,
+            require_authentication=require_authentication,
+        )
+
+    async def put(
+        self,
+        data,
+        *endpoint,
+        params: Optional[dict] = None,
+        require_authentication: bool = True,
+    ):
+        return await self._request(
+            "PUT",
+            endpoint,
+            data=data,
+            params=params,
+            require_authentication=require_authentication,
+        )
+
+    async def delete(
+        self,
+        *endpoint,
+        params: Optional[dict] = None,
+        require_authentication: bool = True,
+    ):
+        return await self._request(
+            "DELETE",
+            endpoint,
+            params=params,
+            require_authentication=require_authentication,
+        )
+
+    async def _request(
+        self,
+        method: str,
+        endpoint: tuple,
+        data=None,
+        params: Optional[dict] = None,
+        require_authentication: bool = True,
+    ):
+        uri = self._make_endpoint(*endpoint)
+        body = self._encode(data)
+        started, attempt = time.monotonic(), 0
+
+        while True:
+            headers = await self._pre_flight(require_authentication)
+            if logger.isEnabledFor(logging.DEBUG):
+                self._log_request(method, uri, params, data, body, headers)
+
+            rep = await self._send(
+                method, endpoint, uri, body, params, headers, attempt
+            )
+            if self.retry is None:
+                break
+
+            delay = self.retry.next_delay(
+                method, rep, attempt, time.monotonic() - started
+            )
+            if delay is None:
+                break
+
+            attempt += 1
+            self._log_retry(method, uri, rep, attempt, delay)
+            if self.hooks:
+                self._emit(
+                    RETRY,
+                    method,
+                    endpoint,
+                    status=rep.status_code,
+                    attempt=attempt,
+                    delay=delay,
+                )
+            await asyncio.sleep(delay)
+
+        try:
+            return self.handle(rep)
+        except Exception as e:
+            if self.hooks:
+                self._emit(
+                    ERROR,
+                    method,
+                    endpoint,
+                    status=rep.status_code,
+                    attempt=attempt,
+                    error=e,
+                )
+            raise
+
+    async def _send(self, method, endpoint, uri, body, params, headers, attempt):
+        """
+        Sends a single attempt of a request, emitting the request_start and request_end
+        events if any hooks are registered.
+        """
+        instrumented = bool(self.hooks)
+        bytes_out = len(body) if body else 0
+        if instrumented:
+            self._emit(
+                REQUEST_START, method, endpoint, bytes_out=bytes_out, attempt=attempt
+            )
+            sent = time.perf_counter()
+
+        try:
+            rep = await self.session.request(
+                method,
+                uri,
+                content=body,
+                params=params,
+                headers=headers,
+                timeout=self.httpx_timeout,
+            )
+        except Exception as e:
+            if instrumented:
+                self._emit(
+                    ERROR,
+                    method,
+                    endpoint,
+                    bytes_out=bytes_out,
+                    attempt=attempt,
+                    error=e,
+                )
+            raise
+
+        if instrumented:
+            self._emit(
+                REQUEST_END,
+                method,
+                endpoint,
+                status=rep.status_code,
+                bytes_out=bytes_out,
+                bytes_in=len(rep.content),
+                timings={"total": time.perf_counter() - sent},
+                attempt=attempt,
+            )
+        return rep
+
+    @property
+    def httpx_timeout(self) -> "httpx.Timeout":
+        """
+        Converts the requests-style (connect, read) timeout into an httpx timeout.
+        """
+        if isinstance(self.timeout, (tuple, list)):
+            connect, read = self.timeout
+            return httpx.Timeout(read, connect=connect)
+        return httpx.Timeout(self.timeout)
+
+    async def _pre_flight(self, require_authentication: bool = True) -> dict:
+        if not self._host:
+            raise ClientError("no envoy url or host specified")
+
+        headers = dict(self.headers)
+        if require_authentication:
+            headers.update(await self._authentication_headers())
+        return headers
+
+    async def _authentication_headers(self) -> dict:
+        if not self.is_authenticated():
+            async with self._auth_lock:
+                # Another coroutine may have refreshed the credentials while we waited
+                if not self.is_authenticated():
+                    self._creds = await self._renew_credentials()
+
+        return {"Authorization": "Bearer " + str(self._creds.access_token)}
+
+    async def _renew_credentials(self) -> Credentials:
+        # We need to reauthenticate, determine if we can refresh our credentials
+        if self.is_refreshable():
+            try:
+                return await self._reauthenticate()
+            except AuthenticationError:
+                logger.debug("could not reauthenticate, authenticating with api keys")
+        return await self._authenticate()
+
+    async def _authenticate(self) -> Credentials:
+        if not self.client_id or not self.client_secret:
+            raise AuthenticationError("no client id or secret specified")
+
+        apikey = {"client_id": self.client_id, "client_secret": self.client_secret}
+        rep = await self.post(apikey, "authenticate", require_authentication=False)
+        return Credentials(rep["access_token"], rep["refresh_token"], self.leeway)
+
+    async def _reauthenticate(self) -> Credentials:
+        if not self._creds.refresh_token:
+            raise AuthenticationError("no refresh token available")
+
+        refresh = {"refresh_token": str(self._creds.refresh_token)}
+        rep = await self.post(refresh, "reauthenticate", require_authentication=False)
+        return Credentials(rep["access_token"], rep["refresh_token"], self.leeway)
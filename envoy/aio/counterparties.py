@@ -0,0 +1,96 @@
+"""
+Asyncio resource that manages the counterparties the Envoy node knows about.
+"""
+
+from envoy.aio import client
+
+from envoy.aio.resource import Resource
+from envoy.records import Record, PaginatedRecords
+from envoy.counterparties import Contact, PaginatedContacts
+
+
+##########################################################################
+## Data Records
+##########################################################################
+
+
+class Counterparty(Record):
+
+    __slots__ = ("_contacts",)
+
+    @property
+    def contacts(self) -> "Contacts":
+        # The nested resource is only created when it is first accessed
+        try:
+            return self._contacts
+        except AttributeError:
+            self._contacts = Contacts(self, self.parent.client)
+            return self._contacts
+
+
+class PaginatedCounterparties(PaginatedRecords):
+
+    CollectionKey = "counterparties"
+
+    def cast(self, item):
+        return Counterparty(item, parent=self.parent, lazy=self._lazy)
+
+
+##########################################################################
+## API Resources
+##########################################################################
+
+
+class Counterparties(Resource):
+
+    RecordType = Counterparty
+    RecordListType = PaginatedCounterparties
+
+    @property
+    def endpoint(self):
+        return "counterparties"
+
+    async def search(
+        self,
+        query: str,
+        limit: int = 10,
+    ) -> Counterparty | PaginatedCounterparties:
+        """Perform a fuzzy search of counterparty names that is case-insensitive, and
+        normalizes unicode characters. The search results are ranked by match distance
+        so the first results are more relevant than later results.
+
+        Parameters
+        ----------
+        query : str
+            The name of the counterparty you would like to search for.
+
+        limit : int, default 10
+            Limit the number of search results returned; for example to get only the
+            first most relevant result, set the limit to 1.
+        """
+        params = {"query": query, "limit": limit}
+        reply = await self.client.get(
+            self.endpoint,
+            "search",
+            params=params,
+            require_authentication=True,
+        )
+
+        if limit == 1 and len(reply["counterparties"]) == 1:
+            return Counterparty(reply["counterparties"][0], parent=self, lazy=True)
+
+        return PaginatedCounterparties(reply, parent=self, lazy=True)
+
+
+class Contacts(Resource):
+
+    RecordType = Contact
+    RecordListType = PaginatedContacts
+
+    def __init__(self, counterparty: Counterparty, client: "client.AsyncClient"):
+        super(Contacts, self).__init__(client)
+        self.counterparty = counterparty
+
+    @property
+    def endpoint(self):
+        return ("counterparties", self.counterparty["id"], "contacts")
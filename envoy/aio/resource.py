@@ -0,0 +1,134 @@
+"""
+The asyncio counterpart of envoy.resource, providing awaitable list, create, detail,
+update, and delete REST functionality to the API resources serviced by the API.
+"""
+
+import asyncio
+
+from envoy.aio import client
+from envoy.exceptions import ValidationError
+from envoy.records import Record, PaginatedRecords, NextPageToken
+
+
+class Resource(object):
+    """
+    Resource objects are not intended to be used directly but are intended to be
+    subclassed by resources to provide the standard functionality for REST operations.
+    """
+
+    RecordType = Record
+    RecordListType = PaginatedRecords
+
+    def __init__(self, client: "client.AsyncClient"):
+        self.client = client
+
+    @property
+    def endpoint(self):
+        raise AttributeError("subclasses should define the endpoint for their resource")
+
+    async def list(self, params: dict = None) -> list[dict]:
+        return self.RecordListType(
+            await self.client.get(
+                *self._endpoint(),
+                params=params,
+                require_authentication=True,
+            ),
+            parent=self,
+            lazy=True,
+        )
+
+    async def iter_all(self, params: dict = None, prefetch: bool = True):
+        """
+        Lazily iterate over every record in the collection with `async for`, following
+        the next page token of each page until the last page has been returned.
+
+        Parameters
+        ----------
+        params : dict, default None
+            A dictionary of query parameters to attach to the URL of every page.
+
+        prefetch : bool, default True
+            If True, the next page is requested in a background task while the records
+            of the current page are being consumed.
+        """
+        params = dict(params or {})
+        task = None
+
+        try:
+            seen = set()
+            page = await self.list(params)
+
+            while True:
+                token, task = page.next_page_token, None
+                if token is not None and token not in seen:
+                    seen.add(token)
+                    params[NextPageToken] = token
+                    if prefetch:
+                        task = asyncio.create_task(self.list(dict(params)))
+                else:
+                    token = None
+
+                for record in page:
+                    yield record
+
+                if token is None:
+                    return
+
+                page = await task if task is not None else await self.list(params)
+        finally:
+            if task is not None and not task.done():
+                task.cancel()
+
+    async def create(self, data: dict, params: dict = None) -> dict:
+        return self.RecordType(
+            await self.client.post(
+                data,
+                *self._endpoint(),
+                params=params,
+                require_authentication=True,
+            ),
+            parent=self,
+            lazy=True,
+        )
+
+    async def detail(self, rid: str, params: dict = None) -> dict:
+        return self.RecordType(
+            await self.client.get(
+                *self._endpoint(),
+                rid,
+                params=params,
+                require_authentication=True,
+            ),
+            parent=self,
+            lazy=True,
+        )
+
+    async def update(self, data: dict, params: dict = None) -> dict:
+        if "id" not in data:
+            raise ValidationError("an ID is required to update this resource")
+
+        return self.RecordType(
+            await self.client.put(
+                data,
+                *self._endpoint(),
+                data["id"],
+                params=params,
+                require_authentication=True,
+            ),
+            parent=self,
+            lazy=True,
+        )
+
+    async def delete(self, rid: str, params: dict = None) -> dict | None:
+        return await self.client.delete(
+            *self._endpoint(),
+            rid,
+            params=params,
+            require_authentication=True,
+        )
+
+    def _endpoint(self):
+        endpoint = self.endpoint
+        if isinstance(endpoint, str):
+            return (endpoint,)
+        return endpoint
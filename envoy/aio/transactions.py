@@ -0,0 +1,226 @@
+"""
+Asyncio resource that manages the transactions the Envoy node is managing.
+"""
+
+from typing import TextIO
+
+from envoy.aio import client
+from envoy.aio.resource import Resource
+from envoy.exceptions import ReadOnlyEndpoint
+from envoy.records import Record, PaginatedRecords
+from envoy.transactions import CHUNK_SIZE, SecureEnvelope, PaginatedSecureEnvelopes
+from envoy.exceptions import AuthenticationError, ServerError, ClientError
+
+
+##########################################################################
+## Data Records
+##########################################################################
+
+
+class Transaction(Record):
+
+    __slots__ = ("_secure_envelopes",)
+
+    @property
+    def secure_envelopes(self) -> "SecureEnvelopes":
+        # The nested resource is only created when it is first accessed
+        try:
+            return self._secure_envelopes
+        except AttributeError:
+            self._secure_envelopes = SecureEnvelopes(self, self.parent.client)
+            return self._secure_envelopes
+
+    async def send(self, envelope) -> dict:
+        ep = self._make_endpoint("send")
+        return Record(
+            await self.parent.client.post(envelope, *ep, require_authentication=True),
+            parent=self,
+            lazy=True,
+        )
+
+    async def latest_payload(self, params=None) -> dict:
+        ep = self._make_endpoint("payload")
+        return Record(
+            await self.parent.client.get(
+                *ep, params=params, require_authentication=True
+            ),
+            parent=self,
+            lazy=True,
+        )
+
+    async def accept_preview(self, params=None) -> dict:
+        ep = self._make_endpoint("accept")
+        return Record(
+            await self.parent.client.get(
+                *ep, params=params, require_authentication=True
+            ),
+            parent=self,
+            lazy=True,
+        )
+
+    async def accept(self, envelope) -> dict:
+        ep = self._make_endpoint("accept")
+        return Record(
+            await self.parent.client.post(envelope, *ep, require_authentication=True),
+            parent=self,
+            lazy=True,
+        )
+
+    async def reject(self, rejection) -> dict:
+        ep = self._make_endpoint("reject")
+        return Record(
+            await self.parent.client.post(rejection, *ep, require_authentication=True),
+            parent=self,
+            lazy=True,
+        )
+
+    async def repair_preview(self, params=None) -> dict:
+        ep = self._make_endpoint("repair")
+        return Record(
+            await self.parent.client.get(
+                *ep, params=params, require_authentication=True
+            ),
+            parent=self,
+            lazy=True,
+        )
+
+    async def repair(self, envelope) -> dict:
+        ep = self._make_endpoint("repair")
+        return Record(
+            await self.parent.client.post(envelope, *ep, require_authentication=True),
+            parent=self,
+            lazy=True,
+        )
+
+    async def archive(self) -> None:
+        ep = self._make_endpoint("archive")
+        await self.parent.client.post(None, *ep, require_authentication=True)
+
+    async def unarchive(self) -> None:
+        ep = self._make_endpoint("unarchive")
+        await self.parent.client.post(None, *ep, require_authentication=True)
+
+    def _make_endpoint(self, *actions) -> tuple[str]:
+        return tuple(["transactions", self["id"]] + list(actions))
+
+
+class PaginatedTransactions(PaginatedRecords):
+
+    CollectionKey = "transactions"
+
+    def cast(self, item):
+        return Transaction(item, parent=self.parent, lazy=self._lazy)
+
+
+##########################################################################
+## API Resources
+##########################################################################
+
+
+class Transactions(Resource):
+
+    RecordType = Transaction
+    RecordListType = PaginatedTransactions
+
+    @property
+    def endpoint(self):
+        return "transactions"
+
+    async def prepare(self, prepare):
+        return Record(
+            await self.client.post(
+                prepare,
+                *self._endpoint(),
+                "prepare",
+                require_authentication=True,
+            ),
+            parent=self,
+            lazy=True,
+        )
+
+    async def send_prepared(self, prepared):
+        return Record(
+            await self.client.post(
+                prepared,
+                *self._endpoint(),
+                "send-prepared",
+                require_authentication=True,
+            ),
+            parent=self,
+            lazy=True,
+        )
+
+    async def archive(self):
+        return Record(
+            await self.client.post(
+                None,
+                *self._endpoint(),
+                "archive",
+                require_authentication=True,
+            ),
+            parent=self,
+            lazy=True,
+        )
+
+    async def export(self, f: TextIO, params: dict = None):
+        """
+        Export the transactions CSV file to the file-like object, f. This performs a
+        streaming download of the possibly very large CSV file; note that writes to f
+        are blocking, so prefer an in-memory buffer or a fast local disk.
+
+        Parameters
+        ----------
+        f : file-like object
+            Either open a file on disk to write the file to or use the io package to
+            collect the CSV data in memory. This object must have a write() method.
+
+        params : dict, default None
+            A dictionary of query parameters to attach to the URL.
+        """
+        headers = await self.client._pre_flight(require_authentication=True)
+        uri = self.client._make_endpoint("transactions", "export")
+        headers["Accept"] = "text/csv"
+
+        kwargs = {
+            "params": params,
+            "headers": headers,
+            "timeout": self.client.httpx_timeout,
+        }
+
+        # Perform a streaming download
+        async with self.client.session.stream("GET", uri, **kwargs) as reply:
+            if reply.status_code != 200:
+                content = await reply.aread()
+                if reply.status_code == 401 or reply.status_code == 403:
+                    raise AuthenticationError("authentication failed")
+                elif 400 <= reply.status_code < 500:
+                    raise ClientError(content)
+                else:
+                    raise ServerError(content)
+
+            async for chunk in reply.aiter_text(chunk_size=CHUNK_SIZE):
+                if chunk:
+                    f.write(chunk)
+
+
+class SecureEnvelopes(Resource):
+
+    RecordType = SecureEnvelope
+    RecordListType = PaginatedSecureEnvelopes
+
+    def __init__(self, transaction: Transaction, client: "client.AsyncClient"):
+        super(SecureEnvelopes, self).__init__(client)
+        self.transaction = transaction
+
+    @property
+    def endpoint(self):
+        return ("transactions", self.transaction["id"], "secure-envelopes")
+
+    async def create(self, data: dict, params: dict = None) -> dict:
+        raise ReadOnlyEndpoint("transaction secure envelopes are a read-only endpoint")
+
+    async def update(self, data: dict, params: dict = None) -> dict:
+        raise ReadOnlyEndpoint("transaction secure envelopes are a read-only endpoint")
+
+    async def delete(self, rid: str, params: dict = None) -> dict | None:
+        raise ReadOnlyEndpoint("transaction secure envelopes are a read-only endpoint")
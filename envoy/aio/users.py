@@ -0,0 +1,16 @@
+"""
+Asyncio resource that manages the users that can access the Envoy node.
+"""
+
+from envoy.aio.resource import Resource
+from envoy.users import User, PaginatedUsers
+
+
+class Users(Resource):
+
+    RecordType = User
+    RecordListType = PaginatedUsers
+
+    @property
+    def endpoint(self):
+        return "users"
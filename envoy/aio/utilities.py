@@ -0,0 +1,111 @@
+"""
+Asyncio access to the utilities endpoints provided as helpers by the Envoy node
+"""
+
+from envoy import traddr
+from envoy.aio import client
+
+
+class Utilities(object):
+
+    def __init__(self, client: "client.AsyncClient"):
+        self.travel_addresses = TravelAddresses(client)
+        self.ivms101_validator = IVMS101Validator(client)
+
+
+class TravelAddresses(object):
+    """
+    Encodes and decodes travel addresses. Travel addresses are encoded and decoded
+    locally with envoy.traddr unless remote is True, in which case the travel address
+    utilities on the Envoy node are used. Travel addresses that cannot be decoded
+    locally are sent to the node, which reports why they are invalid.
+    """
+
+    def __init__(self, client: "client.AsyncClient"):
+        self.client = client
+
+    async def encode(self, rawuri: str, remote: bool = False) -> str:
+        """
+        Encodes a raw URI as a travel address.
+        """
+        if not remote:
+            return traddr.encode(rawuri)
+
+        data = {"decoded": rawuri}
+        reply = await self.client.post(
+            data,
+            "utilities",
+            "travel-address",
+            "encode",
+            require_authentication=True,
+        )
+        return reply["encoded"]
+
+    async def decode(self, travel_address: str, remote: bool = False) -> str:
+        """
+        Decodes a travel address into its raw URI.
+        """
+        if not remote:
+            try:
+                return traddr.decode(travel_address)
+            except ValueError:
+                pass
+
+        data = {"encoded": travel_address}
+        reply = await self.client.post(
+            data,
+            "utilities",
+            "travel-address",
+            "decode",
+            require_authentication=True,
+        )
+        return reply["decoded"]
+
+    def encode_many(self, rawuris) -> list[str]:
+        """
+        Encodes each of the raw URIs as a travel address without any requests.
+        """
+        return traddr.encode_many(rawuris)
+
+    async def decode_many(self, travel_addresses) -> list[str]:
+        """
+        Decodes each of the travel addresses into a raw URI; only travel addresses that
+        cannot be decoded locally are sent to the node.
+        """
+        travel_addresses = list(travel_addresses)
+        uris = traddr.decode_many(travel_addresses, strict=False)
+        for i, uri in enumerate(uris):
+            if uri is None:
+                uris[i] = await self.decode(travel_addresses[i], remote=True)
+        return uris
+
+
+class IVMS101Validator(object):
+    """
+    Accesses the IVMS101 validator utility on the Envoy node.
+    """
+
+    def __init__(self, client: "client.AsyncClient"):
+        self.client = client
+
+    async def validate(self, data: dict) -> dict:
+        """Validates an arbitrary JSON payload as IVMS101 and returns the
+        cross-protocol compatible JSON formatted IVMS101.
+
+        Parameters
+        ----------
+        data : dict
+            the IVMS101 object to validate
+
+        Returns
+        -------
+        dict
+            cross-protocol compatible IVMS101 object
+        """
+
+        return await self.client.post(
+            data,
+            "utilities",
+            "ivms101-validator",
+            require_authentication=True,
+        )
@@ -7,7 +7,8 @@ from envoy.records import Record, PaginatedRecords
 
 
 class APIKey(Record):
-    pass
+
+    __slots__ = ()
 
 
 class PaginatedAPIKeys(PaginatedRecords):
@@ -15,7 +16,7 @@ class PaginatedAPIKeys(PaginatedRecords):
     CollectionKey = "api_keys"
 
     def cast(self, item):
-        return APIKey(item)
+        return APIKey(item, lazy=self._lazy)
 
 
 class APIKeys(Resource):
@@ -8,7 +8,8 @@ from envoy.exceptions import ReadOnlyEndpoint
 
 
 class AuditLog(Record):
-    pass
+
+    __slots__ = ()
 
 
 class PaginatedAuditLogs(PaginatedRecords):
@@ -16,7 +17,7 @@ class PaginatedAuditLogs(PaginatedRecords):
     CollectionKey = "logs"
 
     def cast(self, item):
-        return AuditLog(item)
+        return AuditLog(item, lazy=self._lazy)
 
 
 class AuditLogs(Resource):
@@ -0,0 +1,101 @@
+"""
+Helpers for running many requests against the Envoy node concurrently with a bounded
+number of requests in flight, collecting per-item results and errors rather than
+aborting on the first failure.
+"""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+
+class Result(object):
+    """
+    The result of applying a function to a single item of a batch. If the function
+    raised an exception, it is stored as the error and the value is None.
+    """
+
+    __slots__ = ("index", "item", "value", "error")
+
+    def __init__(self, index, item, value=None, error=None):
+        self.index = index
+        self.item = item
+        self.value = value
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __repr__(self):
+        if self.ok:
+            return f"<Result {self.index} ok>"
+        return f"<Result {self.index} error={self.error!r}>"
+
+
+def imap(func, items, workers: int = 8, ordered: bool = True):
+    """
+    Lazily apply func to each item using a pool of worker threads, keeping at most
+    workers calls in flight at a time so that arbitrarily long iterables can be
+    processed without queueing every item up front. Yields a Result for every item.
+
+    Parameters
+    ----------
+    func : callable
+        The function to call with each item; exceptions that it raises are captured in
+        the result for that item rather than stopping the batch.
+
+    items : iterable
+        The items to apply the function to; consumed lazily as workers free up.
+
+    workers : int, default 8
+        The maximum number of calls in flight at a time. Note that this should be no
+        more than the size of the client's connection pool.
+
+    ordered : bool, default True
+        If True, results are yielded in the same order as the items; otherwise they
+        are yielded as soon as they complete.
+    """
+    if workers < 1:
+        raise ValueError("at least one worker is required")
+
+    def call(item):
+        try:
+            return func(item), None
+        except Exception as e:
+            return None, e
+
+    items = enumerate(items)
+    executor = ThreadPoolExecutor(max_workers=workers)
+    pending = deque() if ordered else set()
+
+    def submit() -> bool:
+        for index, item in items:
+            future = executor.submit(call, item)
+            future.index, future.item = index, item
+            if ordered:
+                pending.append(future)
+            else:
+                pending.add(future)
+            return True
+        return False
+
+    def result(future) -> Result:
+        value, error = future.result()
+        return Result(future.index, future.item, value, error)
+
+    try:
+        while len(pending) < workers and submit():
+            continue
+
+        while pending:
+            if ordered:
+                done = [pending.popleft()]
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                pending.difference_update(done)
+
+            for future in done:
+                yield result(future)
+                submit()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
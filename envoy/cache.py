@@ -0,0 +1,242 @@
+"""
+A thread-safe, size-bounded cache whose entries expire after a time to live, used to
+serve repeated reads of data that rarely changes (such as counterparties) from memory,
+and a cache of responses that are revalidated with conditional requests.
+"""
+
+import copy
+import time
+import threading
+
+from collections import OrderedDict
+
+
+# Sentinel for keys that are not in the cache (None is a valid cached value)
+MISSING = object()
+
+
+class TTLCache(object):
+    """
+    A least recently used cache of at most maxsize entries that expire ttl seconds
+    after they were set. The cache counts hits, misses, evictions, and expirations.
+
+    Parameters
+    ----------
+    maxsize : int, default 1024
+        The maximum number of entries; the least recently used entry is evicted when a
+        new entry is added to a full cache.
+
+    ttl : float, default 300.0
+        The number of seconds an entry is served from the cache. If None, entries are
+        only removed when they are evicted or invalidated.
+    """
+
+    def __init__(self, maxsize=1024, ttl=300.0):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def get(self, key, default=None):
+        """
+        Returns the value of the key if it is in the cache and has not expired.
+        """
+        with self._lock:
+            entry = self._data.get(key, MISSING)
+            if entry is not MISSING:
+                expires, value = entry
+                if expires is None or expires > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+
+                del self._data[key]
+                self.expirations += 1
+
+            self.misses += 1
+            return default
+
+    def set(self, key, value) -> None:
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_set(self, key, func):
+        """
+        Returns the value of the key, calling func to compute and cache the value if
+        the key is not in the cache. Exceptions raised by func are not cached.
+        """
+        value = self.get(key, MISSING)
+        if value is MISSING:
+            value = func()
+            self.set(key, value)
+        return value
+
+    def invalidate(self, key) -> bool:
+        """
+        Removes the key from the cache, returning True if it was in the cache.
+        """
+        with self._lock:
+            return self._data.pop(key, MISSING) is not MISSING
+
+    def clear(self) -> None:
+        """
+        Removes every entry from the cache (the stats are not reset).
+        """
+        with self._lock:
+            self._data.clear()
+
+    def reset_stats(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def stats(self) -> dict:
+        """
+        Returns the size of the cache and the number of hits, misses, evictions, and
+        expirations since the stats were last reset.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._data.get(key, MISSING)
+            if entry is MISSING:
+                return False
+            return entry[0] is None or entry[0] > time.monotonic()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __repr__(self):
+        return f"<TTLCache size={len(self)} maxsize={self.maxsize} ttl={self.ttl}>"
+
+
+class CachedResponse(object):
+    """
+    The parsed body of a response and the validators used to revalidate it.
+    """
+
+    __slots__ = ("etag", "last_modified", "data")
+
+    def __init__(self, etag, last_modified, data):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.data = data
+
+    def conditional_headers(self) -> dict:
+        """
+        Returns the headers that make a request conditional on the cached response.
+        """
+        headers = {}
+        if self.etag is not None:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified is not None:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache(object):
+    """
+    Caches the parsed bodies of GET responses that have an ETag or Last-Modified
+    header. Cached responses are always revalidated with a conditional request; if the
+    node replies 304 Not Modified, a copy of the cached data is returned without a body
+    being sent or parsed. The data is copied when it is cached and when it is returned
+    so that changes made by the caller never modify the cache.
+
+    Parameters
+    ----------
+    maxsize : int, default 1024
+        The maximum number of cached responses; the least recently used response is
+        evicted when the cache is full.
+    """
+
+    def __init__(self, maxsize=1024):
+        self._cache = TTLCache(maxsize=maxsize, ttl=None)
+        self.not_modified = 0
+
+    @staticmethod
+    def key(uri: str, params: dict = None) -> tuple:
+        return (uri,) + freeze_params(params)
+
+    def get(self, uri: str, params: dict = None) -> CachedResponse | None:
+        return self._cache.get(self.key(uri, params))
+
+    def store(self, uri: str, params: dict, rep, data) -> None:
+        """
+        Caches the parsed data of the response if it has validators, otherwise removes
+        any previous response for the URL from the cache.
+        """
+        key = self.key(uri, params)
+        etag = rep.headers.get("ETag")
+        last_modified = rep.headers.get("Last-Modified")
+
+        if etag is None and last_modified is None:
+            self._cache.invalidate(key)
+            return
+        data = copy.deepcopy(data)
+        self._cache.set(key, CachedResponse(etag, last_modified, data))
+
+    def revalidated(self, entry: CachedResponse):
+        """
+        Returns a copy of the data of an entry after the node replied that it is not
+        modified.
+        """
+        self.not_modified += 1
+        return copy.deepcopy(entry.data)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        stats = self._cache.stats()
+        stats["not_modified"] = self.not_modified
+        return stats
+
+    def __len__(self):
+        return len(self._cache)
+
+
+def get_response_cache(cache) -> ResponseCache | None:
+    """
+    Returns the response cache specified by a client's response_cache argument: either
+    a cache, True for a cache of the default size, the maximum number of responses to
+    cache, or None/False to disable the cache.
+    """
+    if cache is None or cache is False:
+        return None
+    if cache is True:
+        return ResponseCache()
+    if isinstance(cache, int):
+        return ResponseCache(maxsize=cache)
+    if isinstance(cache, ResponseCache):
+        return cache
+    raise TypeError(f"cannot create a response cache from {cache!r}")
+
+
+def freeze_params(params: dict = None) -> tuple:
+    """
+    Returns a hashable representation of query parameters for use in a cache key.
+    """
+    if not params:
+        return ()
+    return tuple(sorted((key, str(value)) for key, value in params.items()))
@@ -2,16 +2,26 @@
 This module implements the `cleanup` command for the `envoy` CLI.
 """
 import re
+import sys
+import time
 
 from .prompt import confirm
+from ..batch import imap
 from ..exceptions import CommandError, NotFound
 
 
+# Minimum number of seconds between progress reports
+PROGRESS_INTERVAL = 1.0
+
+
 def is_ulid(value: str) -> bool:
     return re.match(r'^[0-9A-HJ-NP-TV-Z]{26}$', value) is not None
 
 
 def cleanup(client, args):
+    if args.workers < 1:
+        raise CommandError("at least one worker is required")
+
     # Get Counterparty ID and Confirm Counterparty Selection
     counterparty_id = None
     if is_ulid(args.counterparty):
@@ -35,8 +45,7 @@ def cleanup(client, args):
 
     # Get transactions and confirm transaction selection
     # TODO: use `/v1/counterparties/{counterparty_id}/transfers` when implemented
-    # TODO: handle pagination when implemented
-    transactions = client.transactions.list(
+    transactions = client.transactions.iter_all(
         params={
             "status": args.status,
         }
@@ -53,18 +62,59 @@ def cleanup(client, args):
     if not args.yes and not confirm(f"{method} {len(transactions)} {args.status} transactions for {counterparty['name']} ({counterparty_id})?"):
         raise CommandError(f"{method} operation cancelled")
 
-    for tx in transactions:
-        if args.dry_run:
+    if args.dry_run:
+        for tx in transactions:
             print(" ".join([
                 f"dry run: {method} transfer {tx['id']} (status {tx['status']})",
                 f"with {tx['counterparty']}: {tx['amount']} {tx['virtual_asset']}",
                 f"from {tx['originator_address']} to {tx['beneficiary_address']}"
             ]))
-        elif args.delete:
-            client.transactions.delete(tx["id"])
-        else:
-            tx = client.transactions.detail(tx["id"])
-            tx.archive()
+        return
+
+    # The transactions returned by the list endpoint are bound to the transactions
+    # resource so they can be archived without fetching the detail of each one.
+    if args.delete:
+
+        def execute(tx):
+            return client.transactions.delete(tx["id"])
+
+    else:
+
+        def execute(tx):
+            return tx.archive()
+
+    failures = []
+    total = len(transactions)
+    started = last = time.monotonic()
+    results = imap(execute, transactions, workers=args.workers, ordered=False)
+    for i, result in enumerate(results, 1):
+        if not result.ok:
+            failures.append(result)
+
+        now = time.monotonic()
+        if now - last >= PROGRESS_INTERVAL or i == total:
+            last = now
+            report_progress(method, i, total, len(failures), now - started)
+
+    for result in failures:
+        print(
+            f"could not {method} transfer {result.item['id']}: {result.error}",
+            file=sys.stderr,
+        )
+
+    if failures:
+        raise CommandError(
+            f"{len(failures)} of {total} transactions could not be {method}d"
+        )
+
+
+def report_progress(method: str, done: int, total: int, failed: int, elapsed: float):
+    rate = done / elapsed if elapsed > 0 else 0.0
+    print(
+        f"{method}d {done - failed}/{total} transactions "
+        f"({failed} failed, {rate:0.1f} tx/s)",
+        file=sys.stderr,
+    )
 
 
 CLEANUP_ARGS = {
@@ -95,6 +145,12 @@ CLEANUP_ARGS = {
             "action": "store_true",
             "default": False,
         },
+        ("-w", "--workers"): {
+            "help": "the number of transactions to archive or delete concurrently",
+            "default": 1,
+            "type": int,
+            "metavar": "N",
+        },
         ("-y", "--yes"): {
             "help": "answer yes to all confirmation prompts",
             "action": "store_true",
@@ -7,7 +7,9 @@ advanced users.
 from __future__ import annotations
 
 import os
+import time
 import logging
+import threading
 import posixpath
 
 from platform import python_version
@@ -17,11 +19,19 @@ from typing import Optional
 from requests import Response
 from email.message import Message
 from collections import namedtuple
+from contextlib import nullcontext
 from requests.sessions import Session
-from requests.adapters import HTTPAdapter
 from urllib.parse import urlparse, urlunparse, urlencode
 
-from envoy.credentials import Credentials
+from envoy.codec import JSONCodec, get_codec
+from envoy.retry import RetryPolicy, get_retry_policy
+from envoy.limits import Governor, Limit, get_governor
+from envoy.adapters import TimedHTTPAdapter, reset_connect_time, connect_time
+from envoy.cache import ResponseCache, get_response_cache
+from envoy.hooks import Hooks, Event, endpoint_template
+from envoy.hooks import REQUEST_START, REQUEST_END, AUTH_REFRESH, RETRY, ERROR
+from envoy.credentials import Credentials, CredentialStore
+from envoy.refresh import RefreshScheduler, default_scheduler
 from envoy.exceptions import AuthenticationError, ServerError, ClientError, NotFound
 
 from envoy.users import Users
@@ -32,21 +42,21 @@ from envoy.auditlogs import AuditLogs
 from envoy.transactions import Transactions
 from envoy.counterparties import Counterparties
 
-try:
-    from json import JSONDecodeError
-except ImportError:
-    JSONDecodeError = ValueError
-
-
 # Setup debug logging for pyenvoy
 logger = logging.getLogger("envoy")
 
+# Hosts that are connected to over http rather than https
+LOCALHOSTS = frozenset(["localhost", "127.0.0.1"])
+
 
 # Environment variables for local configuration
 ENV_URL = "ENVOY_URL"
 ENV_CLIENT_ID = "ENVOY_CLIENT_ID"
 ENV_CLIENT_SECRET = "ENVOY_CLIENT_SECRET"
 
+# Seconds to wait before retrying a failed background credential refresh
+REFRESH_RETRY_INTERVAL = 5.0
+
 # Default header values
 ACCEPT = "application/json"
 ACCEPT_LANG = "en-US,en"
@@ -54,9 +64,11 @@ ACCEPT_ENCODE = "gzip, deflate, br"
 CONTENT_TYPE = "application/json; charset=utf-8"
 
 
-class Client(object):
+class BaseClient(object):
     """
-    Create a Client object to start making API calls to your Envoy API.
+    The base client manages the configuration, credentials, and response handling that
+    is shared by the blocking Client and the asyncio client in envoy.aio. It does not
+    make any requests itself and should not be used directly.
 
     Parameters
     ----------
@@ -75,16 +87,26 @@ class Client(object):
     timeout : float
         The number of seconds to wait for a response until error.
 
-    pool_connections : int
-        The number of urllib3 connection pools to cache.
+    leeway : float
+        The number of seconds of clock skew to tolerate between the client and the
+        Envoy node when checking if the access and refresh tokens have expired.
 
-    pool_maxsize : int
-        The maximum number of connections to save in the pool.
+    codec : JSONCodec or str
+        The JSON codec used to serialize request bodies and parse response bodies,
+        either a codec or the name of one ("orjson", "ujson", or "json"). By default
+        the fastest installed codec is used.
 
-    max_retries : int
-        The maximum number of retries each connection should attempt. Note, this
-        applies only to failed DNS lookups, socket connections and connection
-        timeouts, never to requests where data has made it to the server.
+    log_payloads : bool
+        If True, request bodies are logged when the envoy logger is enabled for debug
+        messages; otherwise only the size of request and response bodies is logged.
+
+    retry : RetryPolicy or int or bool
+        The policy used to retry requests that fail because the node is overloaded or
+        temporarily unavailable; see envoy.retry.get_retry_policy.
+
+    hooks : Hooks
+        The registry of callbacks that are called with the events of each request; a
+        new registry is created if not specified.
     """
 
     def __init__(
@@ -93,9 +115,11 @@ class Client(object):
         client_id=None,
         client_secret=None,
         timeout=None,
-        pool_connections=8,
-        pool_maxsize=16,
-        max_retries=3,
+        leeway=0.0,
+        codec: Optional[JSONCodec | str] = None,
+        log_payloads=True,
+        retry: Optional[RetryPolicy | int | bool] = None,
+        hooks: Optional[Hooks] = None,
     ):
         self.client_id = client_id or os.environ.get(ENV_CLIENT_ID, None)
         self.client_secret = client_secret or os.environ.get(ENV_CLIENT_SECRET, None)
@@ -118,24 +142,12 @@ class Client(object):
             "Content-Type": CONTENT_TYPE,
         }
 
-        # Configure HTTP requests with the requests library
         self.timeout = timeout
-        self.session = Session()
-        self.adapter = HTTPAdapter(
-            pool_connections=pool_connections,
-            pool_maxsize=pool_maxsize,
-            max_retries=max_retries,
-        )
-        self.session.mount(self.prefix + "://", self.adapter)
-
-        # Configure REST resources on the client
-        self.accounts = Accounts(self)
-        self.transactions = Transactions(self)
-        self.counterparties = Counterparties(self)
-        self.users = Users(self)
-        self.apikeys = APIKeys(self)
-        self.utilities = Utilities(self)
-        self.auditlogs = AuditLogs(self)
+        self.leeway = leeway
+        self.codec = get_codec(codec)
+        self.log_payloads = log_payloads
+        self.retry = get_retry_policy(retry)
+        self.hooks = hooks if hooks is not None else Hooks()
 
     @property
     def timeout(self):
@@ -169,107 +181,9 @@ class Client(object):
         else:
             return get_version(short)
 
-    def status(self):
-        return self.get("status", require_authentication=False)
-
-    def get(
-        self,
-        *endpoint,
-        params: Optional[dict] = None,
-        require_authentication: bool = True,
-    ):
-        self._pre_flight(require_authentication)
-        headers = self._request_headers
-        uri = self._make_endpoint(*endpoint)
-
-        logger.debug(
-            f"GET to {repr(uri)} with params {repr(params)} and headers {repr(headers)}"
-        )
-
-        rep = self.session.get(
-            uri,
-            headers=headers,
-            params=params,
-            timeout=self.timeout,
-        )
-
-        return self.handle(rep)
-
-    def post(
-        self,
-        data,
-        *endpoint,
-        params: Optional[dict] = None,
-        require_authentication: bool = True,
-    ):
-        self._pre_flight(require_authentication)
-        headers = self._request_headers
-        uri = self._make_endpoint(*endpoint)
-
-        logger.debug(
-            f"POST to {repr(uri)} with data {repr(data)} and headers {repr(headers)}"
-        )
-
-        rep = self.session.post(
-            uri,
-            json=data,
-            params=params,
-            headers=headers,
-            timeout=self.timeout,
-        )
-
-        return self.handle(rep)
-
-    def put(
-        self,
-        data,
-        *endpoint,
-        params: Optional[dict] = None,
-        require_authentication: bool = True,
-    ):
-        self._pre_flight(require_authentication)
-        headers = self._request_headers
-        uri = self._make_endpoint(*endpoint)
-
-        logger.debug(
-            f"PUT to {repr(uri)} with data {repr(data)} and headers {repr(headers)}"
-        )
-
-        rep = self.session.put(
-            uri,
-            json=data,
-            params=params,
-            headers=headers,
-            timeout=self.timeout,
-        )
-
-        return self.handle(rep)
-
-    def delete(
-        self,
-        *endpoint,
-        params: Optional[dict] = None,
-        require_authentication: bool = True,
-    ):
-        self._pre_flight(require_authentication)
-        headers = self._request_headers
-        uri = self._make_endpoint(*endpoint)
-
-        logger.debug(
-            f"DELETE to {repr(uri)} with params {repr(params)} and headers {repr(headers)}"  # noqa
-        )
-
-        rep = self.session.delete(
-            uri,
-            headers=headers,
-            params=params,
-            timeout=self.timeout,
-        )
-
-        return self.handle(rep)
-
     def handle(self, rep: Response):
-        logger.debug(f"response headers {repr(rep.headers)}")
+        if logger.isEnabledFor(logging.DEBUG):
+            self._log_response(rep)
 
         # handle response based on status codes
         if rep.status_code == 401 or rep.status_code == 403:
@@ -281,23 +195,23 @@ class Client(object):
         elif 200 <= rep.status_code < 300:
             mimetype, _ = parse_content_type(rep.headers.get("content-type"))
             if mimetype == "application/json":
-                return rep.json()
+                return self.codec.loads(rep.content)
             else:
                 return rep.content
 
         elif 400 <= rep.status_code < 500:
-            logger.warning(f"client error: {rep.status_code} {repr(rep.content)}")
+            logger.warning("client error: %d %r", rep.status_code, rep.content)
             message = f"{rep.status_code} response from {self._host}]"
 
             try:
-                err = rep.json()
+                err = self.codec.loads(rep.content)
                 if "error" in err:
                     message = err["error"]
                 if "errors" in err:
                     message += ":\n  " + "\n  ".join(
                         [f"{e['field']}: {e['error']}" for e in err["errors"]]
                     )
-            except JSONDecodeError:
+            except ValueError:
                 pass
 
             if rep.status_code == 404:
@@ -306,14 +220,14 @@ class Client(object):
                 raise ClientError(message)
 
         elif 500 <= rep.status_code < 600:
-            logger.warning(f"server error: {rep.status_code} {repr(rep.content)}")
+            logger.warning("server error: %d %r", rep.status_code, rep.content)
             message = f"{rep.status_code} response from {self._host}]"
 
             try:
-                err = rep.json()
+                err = self.codec.loads(rep.content)
                 if "error" in err:
                     message = err["error"]
-            except JSONDecodeError:
+            except ValueError:
                 pass
 
             raise ServerError(message)
@@ -321,6 +235,71 @@ class Client(object):
         else:
             raise ValueError(f"unhandled status code {rep.status_code}")
 
+    def _log_request(self, method, uri, params, data, body, headers) -> None:
+        """
+        Logs a request at the debug level; callers should check that debug logging is
+        enabled before calling this method to avoid the formatting overhead.
+        """
+        if body is None:
+            logger.debug(
+                "%s to %r with params %r and headers %r", method, uri, params, headers
+            )
+        elif self.log_payloads:
+            logger.debug(
+                "%s to %r with data %r and headers %r", method, uri, data, headers
+            )
+        else:
+            logger.debug(
+                "%s to %r with %d byte payload and headers %r",
+                method,
+                uri,
+                len(body),
+                headers,
+            )
+
+    def _log_response(self, rep) -> None:
+        """
+        Logs a response at the debug level; callers should check that debug logging is
+        enabled before calling this method to avoid the formatting overhead.
+        """
+        if self.log_payloads:
+            logger.debug("response headers %r", rep.headers)
+        else:
+            logger.debug(
+                "%d response with %d byte payload and headers %r",
+                rep.status_code,
+                len(rep.content),
+                rep.headers,
+            )
+
+    def _log_retry(self, method, uri, rep, attempt, delay):
+        logger.info(
+            "retrying %s %s after %d response in %0.2fs (retry %d of %d)",
+            method,
+            uri,
+            rep.status_code,
+            delay,
+            attempt,
+            self.retry.total,
+        )
+
+    def _emit(self, type: str, method: str = None, endpoint: tuple = None, **kwargs):
+        """
+        Emits an event to the hooks; callers should check that hooks are registered
+        before calling this method to avoid the overhead of creating the event.
+        """
+        if endpoint is not None:
+            endpoint = endpoint_template(endpoint)
+        self.hooks.emit(Event(type, method, endpoint, **kwargs))
+
+    def _encode(self, data) -> Optional[bytes]:
+        """
+        Serializes the data of a request body with the client's JSON codec.
+        """
+        if data is None:
+            return None
+        return self.codec.dumps(data)
+
     def _make_endpoint(self, *endpoint, params: Optional[dict] = None) -> str:
         """
         Creates an API endpoint from the specified resource endpoint, adding the api
@@ -340,25 +319,525 @@ class Client(object):
             )
         )
 
-    def _pre_flight(self, require_authentication: bool = True) -> None:
+    def is_authenticated(self) -> bool:
+        """
+        Returns True if there are JWT claims with a valid access token
+        """
+        return self._creds is not None and self._creds.is_authenticated()
+
+    def is_refreshable(self) -> bool:
+        """
+        Returns True if there are JWT claims with a valid refresh token
+        """
+        return self._creds is not None and self._creds.is_refreshable()
+
+    def is_localhost(self) -> bool:
+        """
+        Returns true if the host is a local domain (e.g. localhost)
+        """
+        host = self._host
+        if ":" in host:
+            host = host.split(":")[0]
+        return host in LOCALHOSTS or host.endswith(".local")
+
+
+class Client(BaseClient):
+    """
+    Create a Client object to start making API calls to your Envoy API.
+
+    Parameters
+    ----------
+    url : str
+        The URL of your Envoy server (e.g. https://myenvoy.tr-envoy.com). If not
+        set, it is discovered from the $ENVOY_URL environment variable.
+
+    client_id : str
+        The Client ID from your API Key to access your Envoy server. If not set, it
+        is discovered from the $ENVOY_CLIENT_ID environment variable.
+
+    client_secret : str
+        The Client Secret from your API Key to access your Envoy server. If not set,
+        it is discovered from the $ENVOY_CLIENT_SECRET environment variable.
+
+    timeout : float
+        The number of seconds to wait for a response until error.
+
+    pool_connections : int
+        The number of urllib3 connection pools to cache.
+
+    pool_maxsize : int
+        The maximum number of connections to save in the pool.
+
+    max_retries : int
+        The maximum number of retries each connection should attempt. Note, this
+        applies only to failed DNS lookups, socket connections and connection
+        timeouts, never to requests where data has made it to the server.
+
+    leeway : float, default 0.0
+        The number of seconds of clock skew to tolerate between the client and the
+        Envoy node when checking if the access and refresh tokens have expired.
+
+    codec : JSONCodec or str, default None
+        The JSON codec used to serialize request bodies and parse response bodies,
+        either a codec or the name of one ("orjson", "ujson", or "json"). By default
+        the fastest installed codec is used.
+
+    log_payloads : bool, default True
+        If True, request bodies are logged when the envoy logger is enabled for debug
+        messages; otherwise only the size of request and response bodies is logged.
+
+    auto_refresh : bool, default False
+        If True, the access token is refreshed in the background shortly before it
+        expires so that requests never have to wait for the client to reauthenticate.
+        Call close() when the client is no longer needed to stop background refreshes.
+
+    refresh_margin : float, default 60.0
+        The number of seconds before the access token expires that the background
+        refresh is performed when auto_refresh is enabled.
+
+    scheduler : RefreshScheduler, default None
+        The scheduler that performs background refreshes; if not specified, a scheduler
+        shared by all clients in the process is used.
+
+    credential_store : CredentialStore or str or bool, default None
+        If specified, access and refresh tokens are persisted to a file that is shared
+        with other processes, so that new processes can reuse valid tokens rather than
+        authenticating with the Envoy node. Specify True to use the default store, a
+        path to the credentials file, or a CredentialStore.
+
+    retry : RetryPolicy or int or bool, default None
+        If specified, requests that fail with a 429, 502, 503, or 504 response are
+        retried with exponential backoff and jitter (or after the Retry-After of the
+        response). Specify True to use the default RetryPolicy, the maximum number of
+        retries, or a RetryPolicy. Only idempotent requests are retried on 5xx errors.
+
+    limits : Governor or Limit or dict, default None
+        If specified, limits the rate and number of concurrent requests that are made
+        to the node by this client (across all threads). Specify a Limit that applies
+        to all requests, a dict of endpoint groups ("send", "list", and "default") to
+        limits, or a Governor, which may be shared by several clients.
+
+    hooks : Hooks, default None
+        Callbacks for the request_start, request_end, auth_refresh, retry, and error
+        events of the client's requests, e.g. to collect metrics with a
+        envoy.metrics.MetricsCollector. Callbacks can also be registered later on the
+        client's hooks attribute.
+
+    response_cache : ResponseCache or int or bool, default None
+        If specified, the bodies of GET responses with an ETag or Last-Modified header
+        are cached and later requests for the same URL are made conditional; if the
+        node replies 304 Not Modified, the cached data is returned without a body being
+        transferred or parsed. Specify True for the default ResponseCache, the maximum
+        number of responses to cache, or a ResponseCache.
+
+    session : Session, default None
+        A requests session whose connection pools are shared with other clients (e.g.
+        by an envoy.pool.EnvoyPool). The session is not closed when the client is
+        closed and the pool_connections, pool_maxsize, and max_retries arguments are
+        ignored in favor of the adapter mounted on the session.
+    """
+
+    def __init__(
+        self,
+        url=None,
+        client_id=None,
+        client_secret=None,
+        timeout=None,
+        pool_connections=8,
+        pool_maxsize=16,
+        max_retries=3,
+        leeway=0.0,
+        codec=None,
+        log_payloads=True,
+        auto_refresh=False,
+        refresh_margin=60.0,
+        scheduler: Optional[RefreshScheduler] = None,
+        credential_store: Optional[CredentialStore | str | bool] = None,
+        retry: Optional[RetryPolicy | int | bool] = None,
+        limits: Optional[Governor | Limit | dict] = None,
+        hooks: Optional[Hooks] = None,
+        response_cache: Optional[ResponseCache | int | bool] = None,
+        session: Optional[Session] = None,
+    ):
+        super(Client, self).__init__(
+            url=url,
+            client_id=client_id,
+            client_secret=client_secret,
+            timeout=timeout,
+            leeway=leeway,
+            codec=codec,
+            log_payloads=log_payloads,
+            retry=retry,
+            hooks=hooks,
+        )
+
+        # Ensures that only one thread refreshes the credentials at a time
+        self._auth_lock = threading.Lock()
+
+        # Configure proactive background refresh of the credentials
+        self.auto_refresh = auto_refresh
+        self.refresh_margin = refresh_margin
+        self._scheduler = scheduler
+
+        # Configure the cross-process credential store
+        if credential_store is True:
+            credential_store = CredentialStore()
+        elif isinstance(credential_store, str):
+            credential_store = CredentialStore(credential_store)
+        self.credential_store = credential_store or None
+
+        # Configure client-side rate and concurrency limits
+        self.limits = get_governor(limits)
+
+        # Configure the cache of responses that are revalidated with conditional GETs
+        self.response_cache = get_response_cache(response_cache)
+
+        # Configure HTTP requests with the requests library
+        self._owns_session = session is None
+        if session is not None:
+            self.session = session
+            self.adapter = session.get_adapter(self.prefix + "://")
+        else:
+            self.session = Session()
+            self.adapter = TimedHTTPAdapter(
+                pool_connections=pool_connections,
+                pool_maxsize=pool_maxsize,
+                max_retries=max_retries,
+            )
+            self.session.mount(self.prefix + "://", self.adapter)
+
+        # Configure REST resources on the client
+        self.accounts = Accounts(self)
+        self.transactions = Transactions(self)
+        self.counterparties = Counterparties(self)
+        self.users = Users(self)
+        self.apikeys = APIKeys(self)
+        self.utilities = Utilities(self)
+        self.auditlogs = AuditLogs(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Cancels any scheduled background refresh and closes the connection pool unless
+        it is shared with other clients.
+        """
+        if self._scheduler is not None:
+            self._scheduler.cancel(self)
+        if self._owns_session:
+            self.session.close()
+
+    @property
+    def scheduler(self) -> RefreshScheduler:
+        if self._scheduler is None:
+            self._scheduler = default_scheduler()
+        return self._scheduler
+
+    def status(self):
+        return self.get("status", require_authentication=False)
+
+    def get(
+        self,
+        *endpoint,
+        params: Optional[dict] = None,
+        require_authentication: bool = True,
+    ):
+        return self._request(
+            "GET",
+            endpoint,
+            params=params,
+            require_authentication=require_authentication,
+        )
+
+    def post(
+        self,
+        data,
+        *endpoint,
+        params: Optional[dict] = None,
+        require_authentication: bool = True,
+    ):
+        return self._request(
+            "POST",
+            endpoint,
+            data=data,
+            params=params,
+            require_authentication=require_authentication,
+        )
+
+    def put(
+        self,
+        data,
+        *endpoint,
+        params: Optional[dict] = None,
+        require_authentication: bool = True,
+    ):
+        return self._request(
+            "PUT",
+            endpoint,
+            data=data,
+            params=params,
+            require_authentication=require_authentication,
+        )
+
+    def delete(
+        self,
+        *endpoint,
+        params: Optional[dict] = None,
+        require_authentication: bool = True,
+    ):
+        return self._request(
+            "DELETE",
+            endpoint,
+            params=params,
+            require_authentication=require_authentication,
+        )
+
+    def _request(
+        self,
+        method: str,
+        endpoint: tuple,
+        data=None,
+        params: Optional[dict] = None,
+        require_authentication: bool = True,
+    ):
+        uri = self._make_endpoint(*endpoint)
+        body = self._encode(data)
+        started, attempt = time.monotonic(), 0
+
+        cached = None
+        if method == "GET" and self.response_cache is not None:
+            cached = self.response_cache.get(uri, params)
+
+        while True:
+            headers = self._pre_flight(require_authentication)
+            if cached is not None:
+                headers.update(cached.conditional_headers())
+
+            if logger.isEnabledFor(logging.DEBUG):
+                self._log_request(method, uri, params, data, body, headers)
+
+            rep = self._send(method, endpoint, uri, body, params, headers, attempt)
+            if self.retry is None:
+                break
+
+            delay = self.retry.next_delay(
+                method, rep, attempt, time.monotonic() - started
+            )
+            if delay is None:
+                break
+
+            attempt += 1
+            self._log_retry(method, uri, rep, attempt, delay)
+            if self.hooks:
+                self._emit(
+                    RETRY,
+                    method,
+                    endpoint,
+                    status=rep.status_code,
+                    attempt=attempt,
+                    delay=delay,
+                )
+
+            rep.close()
+            time.sleep(delay)
+
+        try:
+            if rep.status_code == 304 and cached is not None:
+                return self.response_cache.revalidated(cached)
+
+            result = self.handle(rep)
+            if method == "GET" and self.response_cache is not None:
+                if rep.status_code == 200:
+                    self.response_cache.store(uri, params, rep, result)
+            return result
+        except Exception as e:
+            if self.hooks:
+                self._emit(
+                    ERROR,
+                    method,
+                    endpoint,
+                    status=rep.status_code,
+                    attempt=attempt,
+                    error=e,
+                )
+            raise
+
+    def _send(self, method, endpoint, uri, body, params, headers, attempt):
+        """
+        Sends a single attempt of a request within the client's limits, emitting the
+        request_start and request_end events with the timings of the request if any
+        hooks are registered.
+        """
+        instrumented = bool(self.hooks)
+        bytes_out = len(body) if body else 0
+        if instrumented:
+            self._emit(
+                REQUEST_START, method, endpoint, bytes_out=bytes_out, attempt=attempt
+            )
+
+        try:
+            with self._limit(method, endpoint):
+                if instrumented:
+                    reset_connect_time()
+                    sent = time.perf_counter()
+
+                rep = self.session.request(
+                    method,
+                    uri,
+                    data=body,
+                    params=params,
+                    headers=headers,
+                    timeout=self.timeout,
+                )
+        except Exception as e:
+            if instrumented:
+                self._emit(
+                    ERROR,
+                    method,
+                    endpoint,
+                    bytes_out=bytes_out,
+                    attempt=attempt,
+                    error=e,
+                )
+            raise
+
+        if instrumented:
+            self._emit(
+                REQUEST_END,
+                method,
+                endpoint,
+                status=rep.status_code,
+                bytes_out=bytes_out,
+                bytes_in=len(rep.content),
+                timings=request_timings(rep, time.perf_counter() - sent),
+                attempt=attempt,
+            )
+        return rep
+
+    def _limit(self, method: str, endpoint: tuple):
+        """
+        Returns a context manager that blocks until the request can be made without
+        exceeding the client's limits and that holds its concurrency slot until exit.
+        """
+        if self.limits is None:
+            return nullcontext()
+        return self.limits.acquire(method, endpoint)
+
+    def _pre_flight(self, require_authentication: bool = True) -> dict:
+        """
+        Returns a new dictionary of headers for a single request, including the
+        authorization header if required; the headers are local to the request so that
+        the client can be shared between threads.
+        """
         if not self._host:
             raise ClientError("no envoy url or host specified")
 
-        self._request_headers = {}
-        self._request_headers.update(self.headers)
-
+        headers = dict(self.headers)
         if require_authentication:
-            self._request_headers.update(self._authentication_headers())
+            headers.update(self._authentication_headers())
+        return headers
 
     def _authentication_headers(self) -> dict:
-        if not self.is_authenticated():
-            # We need to reauthenticate, determine if we can refresh our credentials
-            if self.is_refreshable():
-                self._creds = self._reauthenticate()
+        creds = self._creds
+        if creds is None or not creds.is_authenticated():
+            creds = self._refresh_credentials()
+        return {"Authorization": "Bearer " + str(creds.access_token)}
+
+    def _refresh_credentials(self, force: bool = False) -> Credentials:
+        """
+        Refreshes the credentials with a single request even when many threads find
+        that the access token has expired at the same time; the other threads wait for
+        the refresh and then use the new credentials.
+        """
+        with self._auth_lock:
+            # Another thread may have refreshed the credentials while we waited
+            if not force and self.is_authenticated():
+                return self._creds
+
+            started = time.perf_counter()
+            if self.credential_store is None:
+                self._creds = self._renew_credentials()
             else:
-                self._creds = self._authenticate()
+                # Hold the store lock so only one process refreshes the credentials
+                with self.credential_store.lock():
+                    self._creds = self._load_credentials(force)
+                    if self._creds is None:
+                        self._creds = self._renew_credentials()
+                        self.credential_store.save(
+                            self._host, self.client_id, self._creds
+                        )
+
+            if self.hooks:
+                self._emit(
+                    AUTH_REFRESH, timings={"total": time.perf_counter() - started}
+                )
+
+            if self.auto_refresh:
+                self._schedule_refresh()
+            return self._creds
+
+    def _renew_credentials(self) -> Credentials:
+        # We need to reauthenticate, determine if we can refresh our credentials
+        if self.is_refreshable():
+            try:
+                return self._reauthenticate()
+            except AuthenticationError:
+                logger.debug("could not reauthenticate, authenticating with api keys")
+        return self._authenticate()
+
+    def _load_credentials(self, force: bool = False) -> Optional[Credentials]:
+        """
+        Returns credentials from the credential store if another process has stored
+        newer credentials that can be used. If the stored access token cannot be used
+        but its refresh token can, it is adopted so that the credentials are refreshed
+        rather than performing a full authentication. Otherwise returns None.
+        """
+        stored = self.credential_store.load(self._host, self.client_id, self.leeway)
+        if stored is None:
+            return None
+
+        current = self._creds
+        if current is not None:
+            if (stored.access_token.exp or 0) <= (current.access_token.exp or 0):
+                return None
 
-        return {"Authorization": "Bearer " + str(self._creds.access_token)}
+        # A forced background refresh should not reuse tokens about to expire
+        remaining = stored.access_token.expires_in()
+        if remaining is not None and remaining > (self.refresh_margin if force else 0):
+            return stored
+
+        self._creds = stored
+        return None
+
+    def _schedule_refresh(self) -> None:
+        """
+        Schedules a background refresh of the credentials at the refresh margin before
+        the access token expires.
+        """
+        remaining = self._creds.access_token.expires_in()
+        if remaining is None:
+            return
+
+        # If the token lifetime is shorter than the margin, refresh at half-life
+        delay = max(remaining - self.refresh_margin, remaining / 2)
+        self.scheduler.schedule(self, delay)
+
+    def _background_refresh(self) -> None:
+        """
+        Called by the refresh scheduler to renew the credentials before they expire.
+        If the refresh fails it is retried until the access token has expired, at which
+        point the next request will refresh the credentials instead.
+        """
+        try:
+            self._refresh_credentials(force=True)
+        except Exception:
+            logger.warning("background credential refresh failed", exc_info=True)
+            if self.is_authenticated():
+                self.scheduler.schedule(self, REFRESH_RETRY_INTERVAL)
 
     def _authenticate(self) -> Credentials:
         if not self.client_id or not self.client_secret:
@@ -366,7 +845,7 @@ class Client(object):
 
         apikey = {"client_id": self.client_id, "client_secret": self.client_secret}
         rep = self.post(apikey, "authenticate", require_authentication=False)
-        return Credentials(rep["access_token"], rep["refresh_token"])
+        return Credentials(rep["access_token"], rep["refresh_token"], self.leeway)
 
     def _reauthenticate(self) -> Credentials:
         if not self._creds.refresh_token:
@@ -374,28 +853,23 @@ class Client(object):
 
         refresh = {"refresh_token": str(self._creds.refresh_token)}
         rep = self.post(refresh, "reauthenticate", require_authentication=False)
-        return Credentials(rep["access_token"], rep["refresh_token"])
-
-    def is_authenticated(self) -> bool:
-        """
-        Returns True if there are JWT claims with a valid access token
-        """
-        return self._creds is not None and self._creds.is_authenticated()
+        return Credentials(rep["access_token"], rep["refresh_token"], self.leeway)
 
-    def is_refreshable(self) -> bool:
-        """
-        Returns True if there are JWT claims with a valid refresh token
-        """
-        return self._creds is not None and self._creds.is_refreshable()
 
-    def is_localhost(self) -> bool:
-        """
-        Returns true if the host is a local domain (e.g. localhost)
-        """
-        host = self._host
-        if ":" in host:
-            host = host.split(":")[0]
-        return host == "localhost" or host.endswith(".local")
+def request_timings(rep: Response, total: float) -> dict:
+    """
+    Splits the total time of a request into the time spent opening a connection, the
+    time until the response headers were received, and the time reading the body.
+    """
+    connect = connect_time()
+    elapsed = getattr(rep, "elapsed", None)
+    elapsed = elapsed.total_seconds() if elapsed is not None else total
+    return {
+        "connect": connect,
+        "ttfb": max(elapsed - connect, 0.0),
+        "body": max(total - elapsed, 0.0),
+        "total": total,
+    }
 
 
 def parse_url_host(urlstr: str) -> str:
@@ -0,0 +1,120 @@
+"""
+JSON codecs that are used by the clients to serialize request bodies and to parse
+response bodies. If a faster JSON library (orjson or ujson) is installed it is used by
+default, otherwise the client falls back to the json module in the standard library.
+"""
+
+import json
+
+from collections.abc import Mapping
+from envoy.records import Record, RecordList
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+class JSONCodec(object):
+    """
+    Serializes and parses JSON using the json module in the standard library. Codecs
+    encode to UTF-8 bytes and parse either bytes or str. Subclasses wrap faster JSON
+    libraries; any errors raised while parsing are subclasses of ValueError.
+    """
+
+    name = "json"
+
+    def dumps(self, obj) -> bytes:
+        return json.dumps(
+            obj,
+            default=default,
+            allow_nan=False,
+            ensure_ascii=False,
+            separators=(",", ":"),
+        ).encode("utf-8")
+
+    def loads(self, data: bytes | str):
+        return json.loads(data)
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} {self.name}>"
+
+
+class OrjsonCodec(JSONCodec):
+    """
+    Serializes and parses JSON using the orjson library.
+    """
+
+    name = "orjson"
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("the orjson package is not installed")
+
+    def dumps(self, obj) -> bytes:
+        return orjson.dumps(obj, default=default)
+
+    def loads(self, data: bytes | str):
+        return orjson.loads(data)
+
+
+class UjsonCodec(JSONCodec):
+    """
+    Serializes and parses JSON using the ujson library.
+    """
+
+    name = "ujson"
+
+    def __init__(self):
+        if ujson is None:
+            raise ImportError("the ujson package is not installed")
+
+    def dumps(self, obj) -> bytes:
+        return ujson.dumps(obj, default=default, ensure_ascii=False).encode("utf-8")
+
+    def loads(self, data: bytes | str):
+        return ujson.loads(data)
+
+
+# Available codecs by name in order of preference
+CODECS = {
+    OrjsonCodec.name: OrjsonCodec,
+    UjsonCodec.name: UjsonCodec,
+    JSONCodec.name: JSONCodec,
+}
+
+
+def get_codec(codec: JSONCodec | str | None = None) -> JSONCodec:
+    """
+    Returns a JSON codec by name, or the fastest installed codec if no codec is
+    specified. If a codec instance is passed in, it is returned unmodified.
+    """
+    if isinstance(codec, JSONCodec):
+        return codec
+
+    if codec is None:
+        for cls in CODECS.values():
+            try:
+                return cls()
+            except ImportError:
+                continue
+
+    if codec not in CODECS:
+        raise ValueError(f"unknown json codec {codec!r}")
+    return CODECS[codec]()
+
+
+def default(obj):
+    """
+    Serializes records, record lists, and other mappings that are not dicts.
+    """
+    if isinstance(obj, (Record, RecordList)):
+        return obj.data
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    raise TypeError(f"Object of type {obj.__class__.__name__} is not JSON serializable")
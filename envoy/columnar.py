@@ -0,0 +1,204 @@
+"""
+Streaming conversion of CSV exports from the Envoy node into Arrow record batches and
+Parquet or Arrow IPC files. The CSV is parsed incrementally as it is downloaded so that
+memory use is bounded by the block and row group sizes rather than the export size.
+Requires the optional pyarrow package.
+"""
+
+import io
+import csv
+import os
+
+try:
+    import pyarrow
+    import pyarrow.csv as pacsv
+    import pyarrow.parquet as pq
+except ImportError:
+    pyarrow = None
+    pacsv = None
+    pq = None
+
+
+# Size in bytes of the blocks of CSV data that are parsed into each record batch
+BLOCK_SIZE = 1024 * 1024
+
+# Number of rows buffered before a Parquet row group is written
+ROW_GROUP_SIZE = 128 * 1024
+
+# Decimal type used for amounts if decimals are requested; virtual asset amounts
+# have up to 18 decimal places (e.g. wei).
+DECIMAL_PRECISION = 38
+DECIMAL_SCALE = 18
+
+# Columns whose types are not inferred from their name
+TIMESTAMP_COLUMNS = frozenset(["created", "modified", "last_update", "timestamp"])
+CATEGORY_COLUMNS = frozenset(
+    ["status", "source", "virtual_asset", "counterparty", "direction", "state"]
+)
+
+# Output formats by file extension
+FORMAT_EXTENSIONS = {
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".arrow": "arrow",
+    ".arrows": "arrow",
+    ".ipc": "arrow",
+}
+
+
+def column_types(names: list, decimal: bool = False) -> dict:
+    """
+    Returns the Arrow type of each CSV column based on its name: amounts are floats
+    (or decimals), timestamps are UTC timestamps, counts are integers, and columns with
+    few distinct values such as status are dictionary encoded. All other columns are
+    strings so that the types do not depend on the data in the first block.
+    """
+    require_pyarrow()
+    types = {}
+    for name in names:
+        key = name.lower()
+        if key == "amount" or key.endswith("_amount"):
+            if decimal:
+                types[name] = pyarrow.decimal128(DECIMAL_PRECISION, DECIMAL_SCALE)
+            else:
+                types[name] = pyarrow.float64()
+        elif key in TIMESTAMP_COLUMNS or key.endswith("_at"):
+            types[name] = pyarrow.timestamp("us", tz="UTC")
+        elif key.endswith("_count"):
+            types[name] = pyarrow.int64()
+        elif key in CATEGORY_COLUMNS:
+            types[name] = pyarrow.dictionary(pyarrow.int32(), pyarrow.string())
+        else:
+            types[name] = pyarrow.string()
+    return types
+
+
+def read_batches(
+    stream, types: dict = None, decimal: bool = False, block_size: int = BLOCK_SIZE
+):
+    """
+    Parses a binary stream of CSV data with a header row incrementally, returning a
+    pyarrow RecordBatchReader that yields a record batch for each block of the stream.
+
+    Parameters
+    ----------
+    stream : binary file-like object
+        The CSV data; only read() is required so it can be a streaming HTTP response.
+
+    types : dict, default None
+        Arrow types of columns that override the types inferred from the column names.
+
+    decimal : bool, default False
+        If True, amounts are parsed as decimals rather than floats.
+
+    block_size : int, default BLOCK_SIZE
+        The number of bytes of CSV data parsed into each record batch.
+    """
+    require_pyarrow()
+    if not isinstance(stream, io.BufferedIOBase):
+        stream = io.BufferedReader(stream, buffer_size=block_size)
+
+    # Read the header so that every column has an explicit type
+    header = stream.readline().decode("utf-8-sig")
+    names = next(csv.reader([header]), [])
+    if not names:
+        schema = pyarrow.schema([])
+        return pyarrow.RecordBatchReader.from_batches(schema, [])
+
+    convert = column_types(names, decimal=decimal)
+    convert.update(types or {})
+
+    return pacsv.open_csv(
+        stream,
+        read_options=pacsv.ReadOptions(
+            column_names=names, block_size=block_size, use_threads=True
+        ),
+        convert_options=pacsv.ConvertOptions(column_types=convert),
+    )
+
+
+def write_table(
+    reader,
+    f,
+    format: str = None,
+    compression: str = "snappy",
+    row_group_size: int = ROW_GROUP_SIZE,
+) -> int:
+    """
+    Writes the record batches of the reader to a Parquet file or an Arrow IPC stream,
+    holding at most one row group in memory at a time. Returns the number of rows.
+
+    Parameters
+    ----------
+    reader : pyarrow.RecordBatchReader
+        The record batches to write, e.g. from read_batches.
+
+    f : str or binary file-like object
+        The path or file to write the table to.
+
+    format : str, default None
+        Either "parquet" or "arrow"; if None it is inferred from the extension of the
+        path, defaulting to parquet.
+
+    compression : str, default "snappy"
+        The compression codec of the Parquet columns or the Arrow IPC buffers (either
+        "lz4" or "zstd", use None for no compression of Arrow buffers).
+
+    row_group_size : int, default ROW_GROUP_SIZE
+        The number of rows buffered before each Parquet row group is written.
+    """
+    require_pyarrow()
+    if format is None:
+        format = format_for(f) if isinstance(f, (str, os.PathLike)) else "parquet"
+
+    if format == "parquet":
+        return _write_parquet(reader, f, compression, row_group_size)
+
+    if format == "arrow":
+        # The stream format is used since the dictionaries may change between batches
+        options = pyarrow.ipc.IpcWriteOptions(
+            compression=compression if compression in ("lz4", "zstd") else None
+        )
+        rows = 0
+        with pyarrow.ipc.new_stream(f, reader.schema, options=options) as writer:
+            for batch in reader:
+                writer.write_batch(batch)
+                rows += batch.num_rows
+        return rows
+
+    raise ValueError(f"unknown columnar format {format!r}")
+
+
+def _write_parquet(reader, f, compression, row_group_size) -> int:
+    rows, pending, buffered = 0, [], 0
+    with pq.ParquetWriter(f, reader.schema, compression=compression) as writer:
+        for batch in reader:
+            pending.append(batch)
+            buffered += batch.num_rows
+            if buffered >= row_group_size:
+                table = pyarrow.Table.from_batches(pending, schema=reader.schema)
+                writer.write_table(table, row_group_size=row_group_size)
+                rows += buffered
+                pending, buffered = [], 0
+
+        if pending:
+            table = pyarrow.Table.from_batches(pending, schema=reader.schema)
+            writer.write_table(table, row_group_size=row_group_size)
+            rows += buffered
+    return rows
+
+
+def format_for(path: str) -> str:
+    """
+    Returns the columnar format for the extension of the path (parquet by default).
+    """
+    _, ext = os.path.splitext(str(path))
+    return FORMAT_EXTENSIONS.get(ext.lower(), "parquet")
+
+
+def require_pyarrow() -> None:
+    if pyarrow is None:
+        raise ImportError(
+            "the pyarrow package is required for columnar exports, "
+            "install it with `pip install pyenvoy[arrow]`"
+        )
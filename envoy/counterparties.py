@@ -2,7 +2,10 @@
 Resource that manages the counterparties the Envoy node knows about.
 """
 
+import copy
+
 from envoy import client
+from envoy.cache import freeze_params
 
 from envoy.resource import Resource
 from envoy.records import Record, PaginatedRecords
@@ -15,9 +18,16 @@ from envoy.records import Record, PaginatedRecords
 
 class Counterparty(Record):
 
-    def __init__(self, data=None, **kwargs):
-        super(Counterparty, self).__init__(data, **kwargs)
-        self.contacts = Contacts(self, self.parent.client)
+    __slots__ = ("_contacts",)
+
+    @property
+    def contacts(self) -> "Contacts":
+        # The nested resource is only created when it is first accessed
+        try:
+            return self._contacts
+        except AttributeError:
+            self._contacts = Contacts(self, self.parent.client)
+            return self._contacts
 
 
 class PaginatedCounterparties(PaginatedRecords):
@@ -25,11 +35,12 @@ class PaginatedCounterparties(PaginatedRecords):
     CollectionKey = "counterparties"
 
     def cast(self, item):
-        return Counterparty(item, parent=self.parent)
+        return Counterparty(item, parent=self.parent, lazy=self._lazy)
 
 
 class Contact(Record):
-    pass
+
+    __slots__ = ()
 
 
 class PaginatedContacts(PaginatedRecords):
@@ -37,7 +48,7 @@ class PaginatedContacts(PaginatedRecords):
     CollectionKey = "contacts"
 
     def cast(self, item):
-        return Contact(item)
+        return Contact(item, lazy=self._lazy)
 
 
 ##########################################################################
@@ -50,10 +61,60 @@ class Counterparties(Resource):
     RecordType = Counterparty
     RecordListType = PaginatedCounterparties
 
+    # An envoy.cache.TTLCache of detail and search replies; None disables caching
+    cache = None
+
     @property
     def endpoint(self):
         return "counterparties"
 
+    def detail(self, rid: str, params: dict = None) -> Counterparty:
+        """
+        Fetch the counterparty with the specified ID. If a cache has been assigned to
+        the resource, the counterparty is served from the cache until it expires.
+        """
+        if self.cache is None:
+            return super(Counterparties, self).detail(rid, params=params)
+
+        key = ("detail", rid, freeze_params(params))
+        reply = self.cache.get_or_set(
+            key,
+            lambda: self.client.get(
+                *self._endpoint(),
+                rid,
+                params=params,
+                require_authentication=True,
+            ),
+        )
+
+        # Records wrap the data they are given, so copy the cached reply to keep
+        # changes made to the record from modifying the cache.
+        return self.RecordType(copy.deepcopy(reply), parent=self, lazy=True)
+
+    def create(self, data: dict, params: dict = None) -> Counterparty:
+        record = super(Counterparties, self).create(data, params=params)
+        self.invalidate()
+        return record
+
+    def update(self, data: dict, params: dict = None) -> Counterparty:
+        record = super(Counterparties, self).update(data, params=params)
+        self.invalidate()
+        return record
+
+    def delete(self, rid: str, params: dict = None) -> dict | None:
+        reply = super(Counterparties, self).delete(rid, params=params)
+        self.invalidate()
+        return reply
+
+    def invalidate(self) -> None:
+        """
+        Clear the cached counterparties, e.g. after the directory has been changed by
+        another client. Changes made with this resource invalidate the cache since
+        they may change the results of any search.
+        """
+        if self.cache is not None:
+            self.cache.clear()
+
     def search(
         self,
         query: str,
@@ -71,19 +132,30 @@ class Counterparties(Resource):
         limit : int, default 10
             Limit the number of search results returned; for example to get only the
             first most relevant result, set the limit to 1.
+
+        If a cache has been assigned to the resource, the results of a query are served
+        from the cache until they expire or a counterparty is changed.
         """
         params = {"query": query, "limit": limit}
-        reply = self.client.get(
-            self.endpoint,
-            "search",
-            params=params,
-            require_authentication=True,
-        )
+
+        def search():
+            return self.client.get(
+                self.endpoint,
+                "search",
+                params=params,
+                require_authentication=True,
+            )
+
+        if self.cache is not None:
+            reply = self.cache.get_or_set(("search", query, limit), search)
+            reply = copy.deepcopy(reply)
+        else:
+            reply = search()
 
         if limit == 1 and len(reply["counterparties"]) == 1:
-            return Counterparty(reply["counterparties"][0], parent=self)
+            return Counterparty(reply["counterparties"][0], parent=self, lazy=True)
 
-        return PaginatedCounterparties(reply, parent=self)
+        return PaginatedCounterparties(reply, parent=self, lazy=True)
 
 
 class Contacts(Resource):
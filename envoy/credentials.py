@@ -2,10 +2,28 @@
 Manages JWT credentials that are returned from the Envoy server on authentication.
 """
 
+import os
 import jwt
+import json
+import time
+import tempfile
 
-from calendar import timegm
-from datetime import datetime, timezone
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+
+# Environment variable and defaults for the on-disk credential store
+ENV_CREDENTIALS_CACHE = "ENVOY_CREDENTIALS_CACHE"
+CREDENTIALS_CACHE_NAME = os.path.join("pyenvoy", "credentials.json")
 
 
 class Credentials(object):
@@ -13,11 +31,15 @@ class Credentials(object):
     Credentials are composed of an access and a refresh token and are used to maintain
     authenticated state to the Envoy server. The credentials also contains other claims
     such as the permissions allowed by the specified API key.
+
+    The leeway is the number of seconds of clock skew between the client and the Envoy
+    server to tolerate; tokens are treated as expired leeway seconds before their exp
+    claim and as not yet valid until leeway seconds after their nbf claim.
     """
 
-    def __init__(self, access_token: str, refresh_token: str):
-        self.access_token = Token(access_token)
-        self.refresh_token = Token(refresh_token)
+    def __init__(self, access_token: str, refresh_token: str, leeway: float = 0.0):
+        self.access_token = Token(access_token, leeway=leeway)
+        self.refresh_token = Token(refresh_token, leeway=leeway)
 
     def is_authenticated(self) -> bool:
         """
@@ -38,13 +60,35 @@ class Credentials(object):
 class Token(object):
     """
     A token is a lightweight wrapper for JWT tokens and provides unverified decoding.
+
+    The exp and nbf claims are parsed when the token is created and are converted to
+    deadlines on the monotonic clock so that checking whether the token is valid is a
+    single comparison that is unaffected by changes to the system clock.
     """
 
-    def __init__(self, token):
+    def __init__(self, token, leeway: float = 0.0):
         self.token = token
+        self.leeway = leeway
         self._header = None
         self._claims = None
 
+        self.exp = None
+        self.nbf = None
+        self._expires = None
+        self._not_before = None
+
+        if token:
+            claims = self.claims()
+            offset = time.monotonic() - time.time()
+
+            self.exp = claims.get("exp", None)
+            if self.exp is not None:
+                self._expires = self.exp + offset - leeway
+
+            self.nbf = claims.get("nbf", None)
+            if self.nbf is not None:
+                self._not_before = self.nbf + offset + leeway
+
     def headers(self) -> dict:
         if self._header is None:
             self._header = jwt.get_unverified_header(self.token)
@@ -59,21 +103,181 @@ class Token(object):
         """
         Returns true if the current time is after the exp claim.
         """
-        exp = self.claims().get("exp", None)
-        if exp is None:
-            return True
-
-        return timegm(datetime.now(tz=timezone.utc).utctimetuple()) > exp
+        return self._expires is None or time.monotonic() > self._expires
 
     def is_not_before(self) -> bool:
         """
         Returns true if the current time is before the nbf claim.
         """
-        nbf = self.claims().get("nbf", None)
-        if nbf is None:
-            return True
+        return self._not_before is None or time.monotonic() < self._not_before
 
-        return timegm(datetime.now(tz=timezone.utc).utctimetuple()) < nbf
+    def expires_in(self) -> float | None:
+        """
+        Returns the number of seconds until the token expires (negative if the token has
+        already expired) or None if the token does not have an exp claim.
+        """
+        if self._expires is None:
+            return None
+        return self._expires - time.monotonic()
 
     def __str__(self) -> str:
         return self.token
+
+
+class CredentialStore(object):
+    """
+    A credential store persists the access and refresh tokens of clients to a file so
+    that they can be reused by other processes rather than each process authenticating
+    with the Envoy node. Credentials are keyed by the host of the Envoy node and the
+    client ID of the API key; the client secret is never stored.
+
+    The store file is only readable by the current user and is replaced atomically on
+    every write. A separate lock file is used to ensure that only one process at a time
+    refreshes the credentials for the store.
+
+    Parameters
+    ----------
+    path : str, default None
+        The path to the credentials file. If not set, it is discovered from the
+        $ENVOY_CREDENTIALS_CACHE environment variable, otherwise the file is stored in
+        the user's cache directory (e.g. ~/.cache/pyenvoy/credentials.json).
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or default_credentials_path()
+
+    @contextmanager
+    def lock(self):
+        """
+        Hold an exclusive lock on the store across processes; used to ensure that only
+        one process refreshes the credentials while the others wait to reuse them.
+        """
+        self._makedirs()
+        with open(self.path + ".lock", "a+b") as f:
+            lock_file(f)
+            try:
+                yield self
+            finally:
+                unlock_file(f)
+
+    def load(self, host: str, client_id: str, leeway: float = 0.0) -> Credentials:
+        """
+        Returns the credentials stored for the host and client ID or None if there are
+        no stored credentials.
+        """
+        tokens = self._read().get(self._key(host, client_id), None)
+        if not tokens:
+            return None
+
+        try:
+            return Credentials(
+                tokens["access_token"], tokens["refresh_token"], leeway=leeway
+            )
+        except (KeyError, jwt.DecodeError):
+            return None
+
+    def save(self, host: str, client_id: str, creds: Credentials) -> None:
+        """
+        Stores the credentials for the host and client ID, removing any credentials in
+        the store that can no longer be used.
+        """
+        data = self._read()
+        data[self._key(host, client_id)] = {
+            "access_token": str(creds.access_token),
+            "refresh_token": str(creds.refresh_token),
+        }
+
+        # Remove credentials whose refresh tokens have expired
+        for key, tokens in list(data.items()):
+            try:
+                expired = Token(tokens["refresh_token"]).is_expired()
+            except (TypeError, KeyError, jwt.DecodeError):
+                expired = True
+
+            if expired:
+                del data[key]
+
+        self._write(data)
+
+    def clear(self, host: str = None, client_id: str = None) -> None:
+        """
+        Removes the credentials for the host and client ID or all credentials if
+        neither is specified.
+        """
+        if host is None and client_id is None:
+            self._write({})
+            return
+
+        data = self._read()
+        data.pop(self._key(host, client_id), None)
+        self._write(data)
+
+    def _key(self, host: str, client_id: str) -> str:
+        return f"{host}|{client_id}"
+
+    def _read(self) -> dict:
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _write(self, data: dict) -> None:
+        self._makedirs()
+        fd, tmp = tempfile.mkstemp(
+            prefix=".credentials-", dir=os.path.dirname(self.path)
+        )
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f)
+            os.chmod(tmp, 0o600)
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def _makedirs(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", mode=0o700, exist_ok=True)
+
+
+def default_credentials_path() -> str:
+    """
+    Returns the path of the credentials file from the environment or in the user's
+    cache directory.
+    """
+    path = os.environ.get(ENV_CREDENTIALS_CACHE, None)
+    if path:
+        return path
+
+    cache = os.environ.get("XDG_CACHE_HOME", None)
+    if not cache:
+        cache = os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache, CREDENTIALS_CACHE_NAME)
+
+
+def lock_file(f) -> None:
+    """
+    Acquires an exclusive lock on the open file, blocking until it is available.
+    """
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+    elif msvcrt is not None:
+        f.seek(0)
+        while True:
+            try:
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                continue
+
+
+def unlock_file(f) -> None:
+    """
+    Releases the lock on the open file acquired by lock_file.
+    """
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    elif msvcrt is not None:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
@@ -0,0 +1,297 @@
+"""
+Resumable streaming downloads of large files from the Envoy node, such as the
+transactions CSV export. The response body is written as raw bytes (optionally
+compressed on the fly) and downloads are resumed with a Range request if the
+connection is dropped partway through.
+"""
+
+import os
+import gzip
+import time
+import shutil
+import logging
+import tempfile
+
+from contextlib import nullcontext
+from requests.exceptions import ConnectionError, ChunkedEncodingError, Timeout
+
+from envoy.batch import imap
+from envoy.exceptions import AuthenticationError, ClientError, ServerError
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# Setup debug logging for pyenvoy
+logger = logging.getLogger("envoy")
+
+# Size of the chunks read from raw downloads
+CHUNK_SIZE = 1024 * 1024
+
+# Seconds to wait before resuming an interrupted download (doubled on each attempt)
+RESUME_BACKOFF = 0.5
+MAX_RESUME_BACKOFF = 10.0
+
+# Compression algorithms by file extension
+COMPRESSION_EXTENSIONS = {
+    ".gz": "gzip",
+    ".gzip": "gzip",
+    ".zst": "zstd",
+    ".zstd": "zstd",
+}
+
+
+def download(
+    client,
+    endpoint: tuple,
+    f,
+    params: dict = None,
+    accept: str = None,
+    max_attempts: int = 5,
+) -> int:
+    """
+    Streams the body of a GET request to the endpoint into the binary file-like object
+    f, resuming from the last byte written if the connection fails or the node stops
+    responding within the timeout of the client. Returns the number of bytes written.
+
+    If the node does not support Range requests or replies with a range that does not
+    start at the last byte written, the body is downloaded again from the start and the
+    bytes that have already been written are skipped.
+
+    Parameters
+    ----------
+    client : Client
+        The client used to make the request.
+
+    endpoint : tuple
+        The endpoint of the resource to download, e.g. ("transactions", "export").
+
+    f : file-like object
+        A binary file-like object with a write() method.
+
+    params : dict, default None
+        A dictionary of query parameters to attach to the URL.
+
+    accept : str, default None
+        The mimetype to request in the Accept header.
+
+    max_attempts : int, default 5
+        The maximum number of times the download is attempted.
+    """
+    uri = client._make_endpoint(*endpoint)
+    written, attempt = 0, 0
+    use_range = True
+
+    while True:
+        headers = client._pre_flight(require_authentication=True)
+        if accept is not None:
+            headers["Accept"] = accept
+
+        # Byte ranges refer to the encoded body, so the body must not be compressed
+        # in transit for resumed downloads to line up with the bytes already written.
+        headers["Accept-Encoding"] = "identity"
+        if written and use_range:
+            headers["Range"] = f"bytes={written}-"
+
+        kwargs = {
+            "params": params,
+            "headers": headers,
+            "timeout": client.timeout,
+            "stream": True,
+        }
+
+        try:
+            limit = client._limit("GET", endpoint)
+            with limit, client.session.get(uri, **kwargs) as reply:
+                if reply.status_code == 416 and written:
+                    return written
+
+                check_reply(reply)
+                skip = written
+                if reply.status_code == 206:
+                    start = content_range_start(reply.headers.get("Content-Range"))
+                    if start is None or start > written:
+                        if not use_range:
+                            raise ServerError("unexpected partial content in download")
+
+                        # The node ignored the offset, download the entire body again
+                        logger.warning(
+                            "download of %s resumed at byte %s instead of %d, "
+                            "restarting from the beginning",
+                            uri,
+                            start,
+                            written,
+                        )
+                        use_range = False
+                        continue
+                    skip = written - start
+
+                for chunk in reply.iter_content(chunk_size=CHUNK_SIZE):
+                    if skip:
+                        if len(chunk) <= skip:
+                            skip -= len(chunk)
+                            continue
+                        chunk, skip = chunk[skip:], 0
+
+                    f.write(chunk)
+                    written += len(chunk)
+
+                if skip:
+                    raise ServerError("download is shorter than the bytes written")
+                return written
+
+        except (ConnectionError, ChunkedEncodingError, Timeout) as e:
+            attempt += 1
+            if attempt >= max_attempts:
+                raise
+
+            delay = min(RESUME_BACKOFF * (2 ** (attempt - 1)), MAX_RESUME_BACKOFF)
+            logger.warning(
+                "download of %s interrupted after %d bytes, resuming in %0.1fs: %s",
+                uri,
+                written,
+                delay,
+                e,
+            )
+            time.sleep(delay)
+
+
+def download_windows(
+    client,
+    endpoint: tuple,
+    f,
+    windows: list,
+    params: dict = None,
+    accept: str = None,
+    workers: int = 4,
+    max_attempts: int = 5,
+    skip_header: bool = True,
+) -> int:
+    """
+    Downloads the endpoint once for each window of query parameters in parallel and
+    concatenates the downloads into f in the order of the windows. Each window is
+    downloaded to a temporary file so that windows can be resumed independently.
+
+    Parameters
+    ----------
+    windows : list of dict
+        The query parameters of each window (e.g. a date range), which are merged with
+        params; the windows should not overlap.
+
+    workers : int, default 4
+        The maximum number of windows downloaded at the same time.
+
+    skip_header : bool, default True
+        If True, the first line (e.g. the CSV header) is skipped in every window except
+        the first so that it only appears once in the output.
+
+    See download for the other parameters.
+    """
+    directory = getattr(f, "name", None)
+    if isinstance(directory, str):
+        directory = os.path.dirname(os.path.abspath(directory))
+    else:
+        directory = None
+
+    parts = []
+
+    def fetch(window):
+        fd, part = tempfile.mkstemp(prefix=".envoy-", suffix=".part", dir=directory)
+        parts.append(part)
+        with os.fdopen(fd, "wb") as w:
+            download(
+                client,
+                endpoint,
+                w,
+                params=dict(params or {}, **window),
+                accept=accept,
+                max_attempts=max_attempts,
+            )
+        return part
+
+    written = 0
+    results = imap(fetch, windows, workers)
+    try:
+        for result in results:
+            if not result.ok:
+                raise result.error
+
+            with open(result.value, "rb") as part:
+                if skip_header and result.index > 0:
+                    part.readline()
+
+                start = part.tell()
+                shutil.copyfileobj(part, f, CHUNK_SIZE)
+                written += part.tell() - start
+            os.unlink(result.value)
+    finally:
+        # Wait for the windows that are still downloading before removing their parts
+        results.close()
+        for part in parts:
+            if os.path.exists(part):
+                os.unlink(part)
+
+    return written
+
+
+def content_range_start(value: str | None) -> int | None:
+    """
+    Returns the first byte position of a Content-Range header (e.g. "bytes 100-199/200")
+    or None if the header is missing or cannot be parsed.
+    """
+    if not value:
+        return None
+
+    unit, _, spec = value.strip().partition(" ")
+    start, sep, _ = spec.partition("-")
+    if unit != "bytes" or not sep or not start.isdigit():
+        return None
+    return int(start)
+
+
+def compression_for(path: str) -> str | None:
+    """
+    Returns the compression algorithm for the extension of the path, if any.
+    """
+    _, ext = os.path.splitext(str(path))
+    return COMPRESSION_EXTENSIONS.get(ext.lower(), None)
+
+
+def compressed_writer(f, compression: str | None):
+    """
+    Returns a context manager that wraps the binary file-like object with a writer that
+    compresses the data written to it with gzip or zstd (which requires the zstandard
+    package). The underlying file is not closed when the writer is closed.
+    """
+    if compression is None:
+        return nullcontext(f)
+
+    if compression == "gzip":
+        return gzip.GzipFile(fileobj=f, mode="wb", compresslevel=6)
+
+    if compression == "zstd":
+        if zstandard is None:
+            raise ImportError(
+                "the zstandard package is required for zstd compression, "
+                "install it with `pip install zstandard`"
+            )
+        return zstandard.ZstdCompressor().stream_writer(f, closefd=False)
+
+    raise ValueError(f"unknown compression {compression!r}")
+
+
+def check_reply(reply) -> None:
+    """
+    Raises an exception if a streaming reply was not successful.
+    """
+    if reply.status_code in (200, 206):
+        return
+
+    if reply.status_code == 401 or reply.status_code == 403:
+        raise AuthenticationError("authentication failed")
+    elif 400 <= reply.status_code < 500:
+        raise ClientError(reply.content)
+    else:
+        raise ServerError(reply.content)
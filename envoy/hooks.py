@@ -0,0 +1,190 @@
+"""
+Hooks that allow applications to observe the requests made by a client, e.g. to collect
+metrics or traces. Callbacks are registered for an event type and are called
+synchronously with an Event in the thread that made the request.
+"""
+
+import re
+import time
+import logging
+
+
+# Setup debug logging for pyenvoy
+logger = logging.getLogger("envoy")
+
+# Event types emitted by the clients
+REQUEST_START = "request_start"
+REQUEST_END = "request_end"
+AUTH_REFRESH = "auth_refresh"
+RETRY = "retry"
+ERROR = "error"
+
+# Register a callback for this event type to receive every event
+ALL = "*"
+
+EVENT_TYPES = frozenset([REQUEST_START, REQUEST_END, AUTH_REFRESH, RETRY, ERROR, ALL])
+
+# Endpoint path segments that are record identifiers rather than part of the route
+ID_SEGMENT = re.compile(
+    r"^("
+    r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"
+    r"|[0-9A-HJKMNP-TV-Z]{26}"
+    r"|[0-9]+"
+    r")$"
+)
+
+
+class Event(object):
+    """
+    An event describes a single step of a request made by a client.
+
+    Attributes
+    ----------
+    type : str
+        The event type, e.g. request_start, request_end, auth_refresh, retry, or error.
+
+    method : str
+        The HTTP method of the request.
+
+    endpoint : str
+        The endpoint template of the request with record identifiers replaced by
+        {id}, e.g. transactions/{id}/accept, so that it can be used to group metrics.
+
+    status : int
+        The status code of the response (None if no response has been received).
+
+    bytes_out : int
+        The number of bytes in the request body.
+
+    bytes_in : int
+        The number of bytes in the response body.
+
+    timings : dict
+        The number of seconds spent in each phase of the request: connect (DNS lookup,
+        connecting, and the TLS handshake if a new connection was opened), ttfb (from
+        sending the request to receiving the response headers), body (reading the
+        response body), and total.
+
+    attempt : int
+        The number of times the request has been retried.
+
+    delay : float
+        The number of seconds until the request is retried, for retry events.
+
+    error : Exception
+        The exception that caused the request to fail, for error events.
+    """
+
+    __slots__ = (
+        "type",
+        "method",
+        "endpoint",
+        "status",
+        "bytes_out",
+        "bytes_in",
+        "timings",
+        "attempt",
+        "delay",
+        "error",
+        "timestamp",
+    )
+
+    def __init__(
+        self,
+        type,
+        method=None,
+        endpoint=None,
+        status=None,
+        bytes_out=0,
+        bytes_in=0,
+        timings=None,
+        attempt=0,
+        delay=None,
+        error=None,
+    ):
+        self.type = type
+        self.method = method
+        self.endpoint = endpoint
+        self.status = status
+        self.bytes_out = bytes_out
+        self.bytes_in = bytes_in
+        self.timings = timings or {}
+        self.attempt = attempt
+        self.delay = delay
+        self.error = error
+        self.timestamp = time.time()
+
+    @property
+    def duration(self) -> float | None:
+        return self.timings.get("total", None)
+
+    def __repr__(self):
+        return f"<Event {self.type} {self.method} {self.endpoint} {self.status}>"
+
+
+class Hooks(object):
+    """
+    A registry of callbacks for the events emitted by a client. A Hooks object is
+    false if no callbacks are registered so that clients can skip building events.
+    Exceptions raised by callbacks are logged and do not affect the request.
+    """
+
+    def __init__(self):
+        self._callbacks = {}
+
+    def on(self, event: str, callback=None):
+        """
+        Register the callback for the event type (or ALL events). May also be used as
+        a decorator, e.g. @client.hooks.on("request_end").
+        """
+        if event not in EVENT_TYPES:
+            raise ValueError(f"unknown event type {event!r}")
+
+        if callback is None:
+
+            def decorator(callback):
+                self.on(event, callback)
+                return callback
+
+            return decorator
+
+        self._callbacks.setdefault(event, []).append(callback)
+        return callback
+
+    def off(self, event: str, callback) -> None:
+        """
+        Remove the callback registered for the event type.
+        """
+        callbacks = self._callbacks.get(event, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+        if not callbacks:
+            self._callbacks.pop(event, None)
+
+    def emit(self, event: Event) -> None:
+        """
+        Call every callback registered for the type of the event or for ALL events.
+        """
+        callbacks = self._callbacks.get(event.type, []) + self._callbacks.get(ALL, [])
+        for callback in callbacks:
+            try:
+                callback(event)
+            except Exception:
+                logger.exception("%s hook %r failed", event.type, callback)
+
+    def __bool__(self):
+        return bool(self._callbacks)
+
+
+def endpoint_template(endpoint: tuple) -> str:
+    """
+    Returns the endpoint path with record identifiers (UUIDs, ULIDs, and integers)
+    replaced by {id}, e.g. ("transactions", "<uuid>", "accept") becomes
+    "transactions/{id}/accept".
+    """
+    if isinstance(endpoint, str):
+        endpoint = (endpoint,)
+    return "/".join(
+        "{id}" if ID_SEGMENT.match(str(segment)) else str(segment)
+        for segment in endpoint
+    )
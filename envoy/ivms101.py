@@ -0,0 +1,616 @@
+"""
+A local validator of IVMS101 identity payloads that checks their structure, required
+fields, field lengths, enumeration codes, country codes, and the IVMS101 constraints
+(e.g. that every person has a legal name) without a request to the Envoy node. Large
+batches of records can be validated in parallel with a pool of processes.
+
+Payloads are expected in the JSON format used by TRISA (with camelCase field names);
+enumeration codes may either be the IVMS101 code (e.g. "LEGL") or the protocol buffer
+name of the code (e.g. "NATURAL_PERSON_NAME_TYPE_CODE_LEGL"). Errors are reported as
+dicts with the field path and an error message, like the errors of the Envoy node.
+"""
+
+import re
+
+from datetime import date
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+
+from envoy.exceptions import ValidationError
+
+
+# Number of records validated by each task in batch mode
+CHUNK_SIZE = 512
+
+# IVMS101 enumeration codes
+NATURAL_PERSON_NAME_TYPES = frozenset(["ALIA", "BIRT", "MAID", "LEGL", "MISC"])
+LEGAL_PERSON_NAME_TYPES = frozenset(["LEGL", "SHRT", "TRAD"])
+ADDRESS_TYPES = frozenset(["HOME", "BIZZ", "GEOG"])
+NATIONAL_IDENTIFIER_TYPES = frozenset(
+    ["ARNU", "CCPT", "RAID", "DRLC", "FIIN", "TXID", "SOCS", "IDCD", "LEIX", "MISC"]
+)
+LEGAL_NATIONAL_IDENTIFIER_TYPES = frozenset(["RAID", "MISC", "LEIX", "TXID"])
+TRANSLITERATION_METHODS = frozenset(
+    [
+        "ARAB",
+        "ARAN",
+        "ARMN",
+        "CYRL",
+        "DEVA",
+        "GEOR",
+        "GREK",
+        "HANI",
+        "HEBR",
+        "KANA",
+        "KORE",
+        "THAI",
+        "OTHR",
+    ]
+)
+
+# ISO 3166-1 alpha-2 country codes (XX is used by IVMS101 for an unknown country)
+COUNTRIES = frozenset("""
+    AD AE AF AG AI AL AM AO AQ AR AS AT AU AW AX AZ BA BB BD BE BF BG BH BI BJ BL BM BN
+    BO BQ BR BS BT BV BW BY BZ CA CC CD CF CG CH CI CK CL CM CN CO CR CU CV CW CX CY CZ
+    DE DJ DK DM DO DZ EC EE EG EH ER ES ET FI FJ FK FM FO FR GA GB GD GE GF GG GH GI GL
+    GM GN GP GQ GR GS GT GU GW GY HK HM HN HR HT HU ID IE IL IM IN IO IQ IR IS IT JE JM
+    JO JP KE KG KH KI KM KN KP KR KW KY KZ LA LB LC LI LK LR LS LT LU LV LY MA MC MD ME
+    MF MG MH MK ML MM MN MO MP MQ MR MS MT MU MV MW MX MY MZ NA NC NE NF NG NI NL NO NP
+    NR NU NZ OM PA PE PF PG PH PK PL PM PN PR PS PT PW PY QA RE RO RS RU RW SA SB SC SD
+    SE SG SH SI SJ SK SL SM SN SO SR SS ST SV SX SY SZ TC TD TF TG TH TJ TK TL TM TN TO
+    TR TT TV TW TZ UA UG UM US UY UZ VA VC VE VG VI VN VU WF WS YE YT ZA ZM ZW XK XX
+    """.split())
+
+REGISTRATION_AUTHORITY = re.compile(r"^RA[0-9]{6}$")
+LEI = re.compile(r"^[A-Z0-9]{18}[0-9]{2}$")
+
+
+##########################################################################
+## Schema Definition
+##########################################################################
+
+
+def string(max_length=None):
+    return ("string", max_length)
+
+
+def code(codes):
+    return ("code", codes)
+
+
+def array(item, min_items=0, max_items=None):
+    return ("array", item, min_items, max_items)
+
+
+def obj(name):
+    return ("object", name)
+
+
+COUNTRY = ("country",)
+DATE = ("date",)
+INTEGER = ("integer",)
+
+
+# Each schema maps field names to (type, required) and lists the constraints that are
+# checked on objects of the schema after their fields are valid.
+SCHEMAS = {
+    "identity_payload": {
+        "fields": {
+            "originator": (obj("originator"), True),
+            "beneficiary": (obj("beneficiary"), True),
+            "originatingVASP": (obj("originating_vasp"), False),
+            "beneficiaryVASP": (obj("beneficiary_vasp"), False),
+            "transferPath": (obj("transfer_path"), False),
+            "payloadMetadata": (obj("payload_metadata"), False),
+        },
+    },
+    "originator": {
+        "fields": {
+            "originatorPersons": (array(obj("person"), min_items=1), True),
+            "accountNumber": (array(string(100)), False),
+        },
+        "constraints": ["originator_information"],
+    },
+    "beneficiary": {
+        "fields": {
+            "beneficiaryPersons": (array(obj("person"), min_items=1), True),
+            "accountNumber": (array(string(100)), False),
+        },
+    },
+    "originating_vasp": {"fields": {"originatingVASP": (obj("person"), True)}},
+    "beneficiary_vasp": {"fields": {"beneficiaryVASP": (obj("person"), True)}},
+    "transfer_path": {
+        "fields": {"transferPath": (array(obj("intermediary_vasp")), False)},
+    },
+    "intermediary_vasp": {
+        "fields": {
+            "intermediaryVASP": (obj("person"), True),
+            "sequence": (INTEGER, True),
+        },
+    },
+    "payload_metadata": {
+        "fields": {
+            "transliterationMethod": (array(code(TRANSLITERATION_METHODS)), False),
+        },
+    },
+    "person": {
+        "fields": {
+            "naturalPerson": (obj("natural_person"), False),
+            "legalPerson": (obj("legal_person"), False),
+        },
+        "constraints": ["one_person"],
+    },
+    "natural_person": {
+        "fields": {
+            "name": (obj("natural_person_name"), True),
+            "geographicAddress": (array(obj("address")), False),
+            "nationalIdentification": (obj("national_identification"), False),
+            "customerIdentification": (string(50), False),
+            "dateAndPlaceOfBirth": (obj("date_and_place_of_birth"), False),
+            "countryOfResidence": (COUNTRY, False),
+        },
+    },
+    "natural_person_name": {
+        "fields": {
+            "nameIdentifier": (array(obj("natural_person_name_id"), 1), True),
+            "localNameIdentifier": (array(obj("natural_person_name_id")), False),
+            "phoneticNameIdentifier": (array(obj("natural_person_name_id")), False),
+        },
+        "constraints": ["legal_name"],
+    },
+    "natural_person_name_id": {
+        "fields": {
+            "primaryIdentifier": (string(100), True),
+            "secondaryIdentifier": (string(100), False),
+            "nameIdentifierType": (code(NATURAL_PERSON_NAME_TYPES), True),
+        },
+    },
+    "legal_person": {
+        "fields": {
+            "name": (obj("legal_person_name"), True),
+            "geographicAddress": (array(obj("address")), False),
+            "customerNumber": (string(50), False),
+            "nationalIdentification": (obj("national_identification"), False),
+            "countryOfRegistration": (COUNTRY, False),
+        },
+        "constraints": ["legal_national_identification"],
+    },
+    "legal_person_name": {
+        "fields": {
+            "nameIdentifier": (array(obj("legal_person_name_id"), 1), True),
+            "localNameIdentifier": (array(obj("legal_person_name_id")), False),
+            "phoneticNameIdentifier": (array(obj("legal_person_name_id")), False),
+        },
+        "constraints": ["legal_name"],
+    },
+    "legal_person_name_id": {
+        "fields": {
+            "legalPersonName": (string(100), True),
+            "legalPersonNameIdentifierType": (code(LEGAL_PERSON_NAME_TYPES), True),
+        },
+    },
+    "address": {
+        "fields": {
+            "addressType": (code(ADDRESS_TYPES), True),
+            "department": (string(50), False),
+            "subDepartment": (string(70), False),
+            "streetName": (string(70), False),
+            "buildingNumber": (string(16), False),
+            "buildingName": (string(35), False),
+            "floor": (string(70), False),
+            "postBox": (string(16), False),
+            "room": (string(70), False),
+            "postCode": (string(16), False),
+            "townName": (string(35), False),
+            "townLocationName": (string(35), False),
+            "districtName": (string(35), False),
+            "countrySubDivision": (string(35), False),
+            "addressLine": (array(string(70), max_items=7), False),
+            "country": (COUNTRY, True),
+        },
+        "constraints": ["valid_address"],
+    },
+    "national_identification": {
+        "fields": {
+            "nationalIdentifier": (string(35), True),
+            "nationalIdentifierType": (code(NATIONAL_IDENTIFIER_TYPES), True),
+            "countryOfIssue": (COUNTRY, False),
+            "registrationAuthority": (string(8), False),
+        },
+        "constraints": ["national_identifier"],
+    },
+    "date_and_place_of_birth": {
+        "fields": {
+            "dateOfBirth": (DATE, True),
+            "placeOfBirth": (string(70), True),
+        },
+    },
+}
+
+# The schema of each kind of record that can be validated
+KINDS = {
+    "identity": "identity_payload",
+    "person": "person",
+    "natural_person": "natural_person",
+    "legal_person": "legal_person",
+    "address": "address",
+}
+
+
+##########################################################################
+## Constraints
+##########################################################################
+
+
+def code_value(value) -> str:
+    """
+    Returns the IVMS101 code of an enumeration value, which may be the protocol buffer
+    name of the code (e.g. ADDRESS_TYPE_CODE_GEOG).
+    """
+    if isinstance(value, str) and "_" in value:
+        return value.rsplit("_", 1)[1]
+    return value
+
+
+def originator_information(data, path, errors):
+    # C1/C4: the originator must be identifiable by more than their name
+    identifiers = {
+        "naturalPerson": (
+            "geographicAddress",
+            "customerIdentification",
+            "nationalIdentification",
+            "dateAndPlaceOfBirth",
+        ),
+        "legalPerson": (
+            "geographicAddress",
+            "customerNumber",
+            "nationalIdentification",
+        ),
+    }
+
+    for i, person in enumerate(data.get("originatorPersons") or ()):
+        if not isinstance(person, dict):
+            continue
+        for kind, fields in identifiers.items():
+            record = person.get(kind)
+            if isinstance(record, dict) and not any(record.get(f) for f in fields):
+                errors.append(
+                    {
+                        "field": f"{path}.originatorPersons[{i}].{kind}",
+                        "error": "originator must have an address, customer number, "
+                        "national identification, or date and place of birth",
+                    }
+                )
+
+
+def one_person(data, path, errors):
+    if ("naturalPerson" in data) == ("legalPerson" in data):
+        errors.append(
+            {
+                "field": path,
+                "error": "person must be either a natural person or a legal person",
+            }
+        )
+
+
+def legal_name(data, path, errors):
+    # C5/C6: a person must have at least one legal name
+    type_field = "nameIdentifierType"
+    for name in data.get("nameIdentifier") or ():
+        if isinstance(name, dict) and "legalPersonNameIdentifierType" in name:
+            type_field = "legalPersonNameIdentifierType"
+        if isinstance(name, dict) and code_value(name.get(type_field)) == "LEGL":
+            return
+
+    errors.append(
+        {"field": f"{path}.nameIdentifier", "error": "a legal name (LEGL) is required"}
+    )
+
+
+def valid_address(data, path, errors):
+    # C8: an address must have address lines or a street name and building
+    if data.get("addressLine"):
+        return
+    building = data.get("buildingNumber") or data.get("buildingName")
+    if data.get("streetName") and building:
+        return
+
+    errors.append(
+        {
+            "field": path,
+            "error": "address requires an address line or a street name and "
+            "building name or number",
+        }
+    )
+
+
+def national_identifier(data, path, errors):
+    authority = data.get("registrationAuthority")
+    if authority and not REGISTRATION_AUTHORITY.match(authority):
+        errors.append(
+            {
+                "field": f"{path}.registrationAuthority",
+                "error": "registration authority must be RA followed by six digits",
+            }
+        )
+
+    # C11: LEIs must have a valid check digit and no registration authority
+    if code_value(data.get("nationalIdentifierType")) == "LEIX":
+        if not is_lei(data.get("nationalIdentifier")):
+            errors.append(
+                {
+                    "field": f"{path}.nationalIdentifier",
+                    "error": "national identifier is not a valid LEI",
+                }
+            )
+        if authority:
+            errors.append(
+                {
+                    "field": f"{path}.registrationAuthority",
+                    "error": "registration authority must be empty for an LEI",
+                }
+            )
+
+
+def legal_national_identification(data, path, errors):
+    # C7: legal persons can only be identified by registration, tax, or LEI numbers
+    ident = data.get("nationalIdentification")
+    if not isinstance(ident, dict):
+        return
+
+    kind = code_value(ident.get("nationalIdentifierType"))
+    if kind in LEGAL_NATIONAL_IDENTIFIER_TYPES or kind not in NATIONAL_IDENTIFIER_TYPES:
+        return
+
+    errors.append(
+        {
+            "field": f"{path}.nationalIdentification.nationalIdentifierType",
+            "error": f"{kind} is not a valid national identifier of a legal person",
+        }
+    )
+
+
+def is_lei(value) -> bool:
+    """
+    Returns True if the value is a valid ISO 17442 Legal Entity Identifier.
+    """
+    if not isinstance(value, str) or not LEI.match(value):
+        return False
+    return int("".join(str(int(c, 36)) for c in value)) % 97 == 1
+
+
+CONSTRAINTS = {
+    "originator_information": originator_information,
+    "one_person": one_person,
+    "legal_name": legal_name,
+    "valid_address": valid_address,
+    "national_identifier": national_identifier,
+    "legal_national_identification": legal_national_identification,
+}
+
+
+##########################################################################
+## Schema Compiler
+##########################################################################
+
+
+@lru_cache(maxsize=None)
+def compile_schema(name: str):
+    """
+    Compiles the named schema into a function that appends the errors of an object to
+    a list. Compiled schemas are cached so each schema is only compiled once.
+    """
+    schema = SCHEMAS[name]
+    fields = {
+        field: (compile_type(spec), required)
+        for field, (spec, required) in schema["fields"].items()
+    }
+    required = [field for field, (_, req) in fields.items() if req]
+    constraints = [CONSTRAINTS[c] for c in schema.get("constraints", ())]
+
+    def validate(data, path, errors):
+        if not isinstance(data, dict):
+            errors.append({"field": path, "error": "must be an object"})
+            return
+
+        count = len(errors)
+        for field in required:
+            if data.get(field) in (None, "", [], {}):
+                errors.append({"field": join(path, field), "error": "is required"})
+
+        for field, value in data.items():
+            if field not in fields:
+                errors.append({"field": join(path, field), "error": "unknown field"})
+            elif value is not None:
+                fields[field][0](value, join(path, field), errors)
+
+        # Constraints are only checked if the fields of the object are valid
+        if len(errors) == count:
+            for constraint in constraints:
+                constraint(data, path, errors)
+
+    return validate
+
+
+def compile_type(spec):
+    kind = spec[0]
+
+    if kind == "object":
+        # Nested schemas are resolved when first used so that schemas can be recursive
+        name = spec[1]
+        return lambda value, path, errors: compile_schema(name)(value, path, errors)
+
+    if kind == "string":
+        max_length = spec[1]
+
+        def validate_string(value, path, errors):
+            if not isinstance(value, str):
+                errors.append({"field": path, "error": "must be a string"})
+            elif max_length is not None and len(value) > max_length:
+                errors.append(
+                    {"field": path, "error": f"must be at most {max_length} characters"}
+                )
+
+        return validate_string
+
+    if kind == "code":
+        codes = spec[1]
+
+        def validate_code(value, path, errors):
+            if code_value(value) not in codes:
+                errors.append(
+                    {
+                        "field": path,
+                        "error": f"{value!r} is not one of {', '.join(sorted(codes))}",
+                    }
+                )
+
+        return validate_code
+
+    if kind == "country":
+
+        def validate_country(value, path, errors):
+            if value not in COUNTRIES:
+                errors.append(
+                    {"field": path, "error": f"{value!r} is not an ISO 3166 country"}
+                )
+
+        return validate_country
+
+    if kind == "date":
+
+        def validate_date(value, path, errors):
+            try:
+                when = date.fromisoformat(value)
+            except (TypeError, ValueError):
+                errors.append({"field": path, "error": "must be a YYYY-MM-DD date"})
+                return
+
+            # C2: the date of birth must be in the past
+            if when >= date.today():
+                errors.append({"field": path, "error": "must be in the past"})
+
+        return validate_date
+
+    if kind == "integer":
+
+        def validate_integer(value, path, errors):
+            if isinstance(value, bool) or not isinstance(value, int):
+                errors.append({"field": path, "error": "must be an integer"})
+
+        return validate_integer
+
+    if kind == "array":
+        item = compile_type(spec[1])
+        min_items, max_items = spec[2], spec[3]
+
+        def validate_array(value, path, errors):
+            if not isinstance(value, list):
+                errors.append({"field": path, "error": "must be a list"})
+                return
+            if len(value) < min_items:
+                errors.append(
+                    {"field": path, "error": f"requires at least {min_items} items"}
+                )
+            if max_items is not None and len(value) > max_items:
+                errors.append(
+                    {"field": path, "error": f"must have at most {max_items} items"}
+                )
+            for i, element in enumerate(value):
+                item(element, f"{path}[{i}]", errors)
+
+        return validate_array
+
+    raise ValueError(f"unknown schema type {kind!r}")
+
+
+def join(path: str, field: str) -> str:
+    return f"{path}.{field}" if path else field
+
+
+##########################################################################
+## Validation
+##########################################################################
+
+
+def validate(data: dict, kind: str = "identity") -> list:
+    """
+    Validates an IVMS101 record and returns a list of errors, each a dict with the
+    path of the invalid field and an error message. The list is empty if the record
+    is valid.
+
+    Parameters
+    ----------
+    data : dict
+        The IVMS101 record to validate.
+
+    kind : str, default "identity"
+        The kind of record: "identity" for an identity payload, or "person",
+        "natural_person", "legal_person", or "address".
+    """
+    if kind not in KINDS:
+        raise ValueError(f"unknown IVMS101 record kind {kind!r}")
+
+    errors = []
+    compile_schema(KINDS[kind])(data, "", errors)
+    return errors
+
+
+def is_valid(data: dict, kind: str = "identity") -> bool:
+    return not validate(data, kind)
+
+
+def check(data: dict, kind: str = "identity") -> None:
+    """
+    Raises a ValidationError that lists the invalid fields if the record is invalid.
+    """
+    errors = validate(data, kind)
+    if errors:
+        message = (
+            "invalid IVMS101 "
+            + kind
+            + ":\n  "
+            + "\n  ".join(f"{e['field'] or kind}: {e['error']}" for e in errors)
+        )
+        raise ValidationError(message)
+
+
+def validate_many(
+    records, kind: str = "identity", workers: int = None, chunksize: int = CHUNK_SIZE
+) -> list:
+    """
+    Validates each of the IVMS101 records, returning a list of the errors of each
+    record in the same order as the records. Large batches are validated in parallel
+    by a pool of processes.
+
+    Parameters
+    ----------
+    records : iterable of dict
+        The IVMS101 records to validate.
+
+    kind : str, default "identity"
+        The kind of the records; see validate.
+
+    workers : int, default None
+        The number of processes to validate the records with; defaults to the number of
+        CPUs. If 1, or if there is only a single chunk of records, the records are
+        validated in the current process.
+
+    chunksize : int, default 512
+        The number of records sent to a process at a time.
+    """
+    if kind not in KINDS:
+        raise ValueError(f"unknown IVMS101 record kind {kind!r}")
+
+    records = list(records)
+    if workers == 1 or len(records) <= chunksize:
+        return [validate(record, kind) for record in records]
+
+    chunks = [records[i : i + chunksize] for i in range(0, len(records), chunksize)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(_validate_chunk, chunks, [kind] * len(chunks))
+        return [errors for chunk in results for errors in chunk]
+
+
+def _validate_chunk(records, kind):
+    return [validate(record, kind) for record in records]
@@ -0,0 +1,313 @@
+"""
+Client-side rate limits and concurrency limits that keep a client (or many threads
+sharing a client) from overloading the Envoy node. Requests are classified into endpoint
+groups (e.g. transaction send routes versus list routes) that are limited separately.
+"""
+
+import time
+import threading
+
+from contextlib import contextmanager, nullcontext
+
+
+# Endpoint groups used by the default classification of requests
+SEND = "send"
+LIST = "list"
+DEFAULT = "default"
+
+# Transaction actions that send secure envelopes to the counterparty
+SEND_ACTIONS = frozenset(["send", "send-prepared", "accept", "reject", "repair"])
+
+# Top-level resources whose endpoint returns the collection of its records
+COLLECTIONS = frozenset(
+    ["transactions", "accounts", "counterparties", "users", "apikeys", "auditlogs"]
+)
+
+# Endpoints that return collections of records rather than a single record
+LIST_ACTIONS = frozenset(
+    [
+        "search",
+        "export",
+        "transfers",
+        "secure-envelopes",
+        "crypto-addresses",
+        "contacts",
+    ]
+)
+
+# Weight of the most recent wait in the moving average of the queueing delay
+QUEUE_DELAY_ALPHA = 0.2
+
+
+class TokenBucket(object):
+    """
+    A thread-safe token bucket that allows rate requests per second on average with
+    bursts of up to burst requests. Callers reserve a token and then wait for the
+    returned delay, so waiting callers are served in the order they arrived.
+
+    Parameters
+    ----------
+    rate : float
+        The number of tokens added to the bucket every second.
+
+    burst : float, default None
+        The maximum number of tokens in the bucket; by default the bucket holds one
+        second worth of tokens (or a single token if the rate is less than one).
+    """
+
+    def __init__(self, rate: float, burst: float = None):
+        if rate <= 0:
+            raise ValueError("token bucket rate must be greater than zero")
+
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(1.0, rate))
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """
+        Takes tokens from the bucket, returning the number of seconds the caller must
+        wait before the tokens are available (0 if they are available now).
+        """
+        with self._lock:
+            self._fill()
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Takes tokens from the bucket, blocking until they are available. Returns the
+        number of seconds waited.
+        """
+        delay = self.reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    def delay(self) -> float:
+        """
+        Returns the number of seconds that a request made now would have to wait.
+        """
+        with self._lock:
+            self._fill()
+            if self._tokens >= 1.0:
+                return 0.0
+            return (1.0 - self._tokens) / self.rate
+
+    def _fill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+class Limit(object):
+    """
+    Limits the rate and the number of concurrent requests of an endpoint group and
+    keeps metrics about how long requests wait to be sent.
+
+    Parameters
+    ----------
+    rate : float, default None
+        The maximum average number of requests per second, or None for no rate limit.
+
+    burst : float, default None
+        The number of requests that may be made at once above the average rate; see
+        TokenBucket for the default.
+
+    max_in_flight : int, default None
+        The maximum number of concurrent requests, or None for no concurrency limit.
+    """
+
+    def __init__(
+        self,
+        rate: float = None,
+        burst: float = None,
+        max_in_flight: int = None,
+    ):
+        self.rate = rate
+        self.max_in_flight = max_in_flight
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.semaphore = None
+        if max_in_flight:
+            self.semaphore = threading.BoundedSemaphore(max_in_flight)
+
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.waiting = 0
+        self.requests = 0
+        self.queue_delay = 0.0
+        self.max_queue_delay = 0.0
+        self.total_queue_delay = 0.0
+
+    @contextmanager
+    def acquire(self):
+        """
+        Blocks until a request may be sent without exceeding the limits, holding a
+        concurrency slot until the context exits. Yields the number of seconds waited.
+        """
+        started = time.monotonic()
+        with self._lock:
+            self.waiting += 1
+
+        # Wait for a slot before a token so that tokens are not spent by requests that
+        # are still waiting for another request to finish.
+        slot, sent = False, False
+        try:
+            if self.semaphore is not None:
+                slot = self.semaphore.acquire()
+
+            if self.bucket is not None:
+                self.bucket.acquire()
+
+            waited = time.monotonic() - started
+            self._record(waited)
+            sent = True
+            yield waited
+        finally:
+            with self._lock:
+                if sent:
+                    self.in_flight -= 1
+                else:
+                    self.waiting -= 1
+            if slot:
+                self.semaphore.release()
+
+    def current_delay(self) -> float:
+        """
+        Returns the number of seconds that a request made now would wait for the rate
+        limit (not including waiting for a concurrency slot).
+        """
+        if self.bucket is None:
+            return 0.0
+        return self.bucket.delay()
+
+    def stats(self) -> dict:
+        """
+        Returns the queueing metrics of the limit; queue_delay is a moving average of
+        the number of seconds recent requests waited to be sent.
+        """
+        with self._lock:
+            return {
+                "in_flight": self.in_flight,
+                "waiting": self.waiting,
+                "requests": self.requests,
+                "queue_delay": self.queue_delay,
+                "max_queue_delay": self.max_queue_delay,
+                "total_queue_delay": self.total_queue_delay,
+                "current_delay": self.current_delay(),
+            }
+
+    def _record(self, waited: float) -> None:
+        with self._lock:
+            self.waiting -= 1
+            self.in_flight += 1
+            self.requests += 1
+            self.total_queue_delay += waited
+            self.max_queue_delay = max(self.max_queue_delay, waited)
+            if self.requests == 1:
+                self.queue_delay = waited
+            else:
+                self.queue_delay += QUEUE_DELAY_ALPHA * (waited - self.queue_delay)
+
+    def __repr__(self):
+        return f"<Limit rate={self.rate} max_in_flight={self.max_in_flight}>"
+
+
+class Governor(object):
+    """
+    A governor applies a separate Limit to each endpoint group. Requests in a group
+    that does not have a limit use the limit of the default group, if any, otherwise
+    they are not limited. A governor may be shared by several clients to limit their
+    combined requests to the same Envoy node.
+
+    Parameters
+    ----------
+    limits : dict, default None
+        A mapping of endpoint group names to a Limit or to the keyword arguments of a
+        Limit. Additional groups can be specified as keyword arguments, e.g.
+        Governor(send=Limit(rate=5), list=Limit(max_in_flight=4)).
+
+    classify : callable, default endpoint_group
+        A function that is passed the method and endpoint of a request and returns the
+        name of its endpoint group.
+    """
+
+    def __init__(self, limits: dict = None, classify=None, **groups):
+        self.classify = classify or endpoint_group
+        self.limits = {}
+
+        limits = dict(limits or {}, **groups)
+        for group, limit in limits.items():
+            if isinstance(limit, dict):
+                limit = Limit(**limit)
+            self.limits[group] = limit
+
+    def limit(self, method: str, endpoint: tuple) -> Limit | None:
+        """
+        Returns the limit that applies to the request or None if it is not limited.
+        """
+        group = self.classify(method, endpoint)
+        limit = self.limits.get(group, None)
+        if limit is None:
+            limit = self.limits.get(DEFAULT, None)
+        return limit
+
+    def acquire(self, method: str, endpoint: tuple):
+        """
+        Returns a context manager that blocks until the request may be sent and holds
+        the concurrency slot of its endpoint group until the request is complete.
+        """
+        limit = self.limit(method, endpoint)
+        if limit is None:
+            return nullcontext(0.0)
+        return limit.acquire()
+
+    def stats(self) -> dict:
+        """
+        Returns the queueing metrics of every endpoint group.
+        """
+        return {group: limit.stats() for group, limit in self.limits.items()}
+
+    def __repr__(self):
+        return f"<Governor {', '.join(self.limits)}>"
+
+
+def endpoint_group(method: str, endpoint: tuple) -> str:
+    """
+    Classifies a request as a transaction send (posting to a transaction send, accept,
+    reject, or repair route), a list (getting a collection resource such as the
+    transactions, including searches and the export), or a default request (e.g. the
+    status endpoint or the detail of a single record).
+    """
+    method = method.upper()
+    if method == "POST" and endpoint and endpoint[0] == "transactions":
+        if endpoint[-1] in SEND_ACTIONS:
+            return SEND
+
+    if method == "GET" and endpoint:
+        if len(endpoint) == 1 and endpoint[0] in COLLECTIONS:
+            return LIST
+        if len(endpoint) > 1 and endpoint[-1] in LIST_ACTIONS:
+            return LIST
+
+    return DEFAULT
+
+
+def get_governor(limits) -> Governor | None:
+    """
+    Returns the governor specified by a client's limits argument: either a Governor, a
+    Limit that is applied to all requests, a mapping of endpoint groups to limits, or
+    None to disable limits.
+    """
+    if limits is None:
+        return None
+    if isinstance(limits, Governor):
+        return limits
+    if isinstance(limits, Limit):
+        return Governor({DEFAULT: limits})
+    if isinstance(limits, dict):
+        return Governor(limits)
+    raise TypeError(f"cannot create a governor from {limits!r}")
@@ -0,0 +1,243 @@
+"""
+An in-memory collector of request metrics that is registered as a hook on one or more
+clients, and exports its histograms and counters in the Prometheus text format.
+"""
+
+import threading
+
+from bisect import bisect_left
+
+from envoy.hooks import ALL, REQUEST_END, AUTH_REFRESH, RETRY, ERROR
+
+
+# Default upper bounds of the latency histogram buckets in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# The phases of a request that are recorded in the phase histograms
+PHASES = ("connect", "ttfb", "body")
+
+
+class Histogram(object):
+    """
+    A histogram of observations with fixed bucket upper bounds.
+    """
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list:
+        """
+        Returns the cumulative count of observations less than or equal to each bucket
+        upper bound, ending with the count of all observations (+Inf).
+        """
+        total, counts = 0, []
+        for le, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            counts.append((le, total))
+        return counts
+
+    def quantile(self, q: float) -> float | None:
+        """
+        Returns an estimate of the quantile as the upper bound of the bucket that it
+        falls in (or None if there are no observations).
+        """
+        if not self.count:
+            return None
+
+        rank = q * self.count
+        for le, count in self.cumulative():
+            if count >= rank:
+                return le
+        return float("inf")
+
+    @property
+    def mean(self) -> float | None:
+        return self.sum / self.count if self.count else None
+
+
+class MetricsCollector(object):
+    """
+    Collects latency histograms and counters of the requests made by the clients it is
+    attached to, labeled by method, endpoint template, and status code.
+
+    Parameters
+    ----------
+    buckets : tuple of float, default DEFAULT_BUCKETS
+        The upper bounds of the latency histogram buckets in seconds.
+
+    namespace : str, default "envoy"
+        The prefix of the metric names in the Prometheus export.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, namespace="envoy"):
+        self.buckets = tuple(buckets)
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self.reset()
+
+    def attach(self, client) -> "MetricsCollector":
+        """
+        Register the collector to receive the events of the client.
+        """
+        client.hooks.on(ALL, self)
+        return self
+
+    def detach(self, client) -> None:
+        client.hooks.off(ALL, self)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.durations = {}
+            self.phases = {}
+            self.bytes_out = {}
+            self.bytes_in = {}
+            self.retries = {}
+            self.errors = {}
+            self.auth_refreshes = Histogram(self.buckets)
+
+    def __call__(self, event) -> None:
+        if event.type == REQUEST_END:
+            self._request_end(event)
+        elif event.type == RETRY:
+            with self._lock:
+                key = (event.method, event.endpoint, str(event.status))
+                self.retries[key] = self.retries.get(key, 0) + 1
+        elif event.type == ERROR:
+            with self._lock:
+                key = (event.method, event.endpoint, event.error.__class__.__name__)
+                self.errors[key] = self.errors.get(key, 0) + 1
+        elif event.type == AUTH_REFRESH:
+            with self._lock:
+                self.auth_refreshes.observe(event.duration or 0.0)
+
+    def _request_end(self, event) -> None:
+        route = (event.method, event.endpoint)
+        with self._lock:
+            key = route + (str(event.status),)
+            if key not in self.durations:
+                self.durations[key] = Histogram(self.buckets)
+            self.durations[key].observe(event.duration or 0.0)
+
+            for phase in PHASES:
+                if phase in event.timings:
+                    key = route + (phase,)
+                    if key not in self.phases:
+                        self.phases[key] = Histogram(self.buckets)
+                    self.phases[key].observe(event.timings[phase])
+
+            self.bytes_out[route] = self.bytes_out.get(route, 0) + event.bytes_out
+            self.bytes_in[route] = self.bytes_in.get(route, 0) + event.bytes_in
+
+    def to_prometheus(self) -> str:
+        """
+        Returns the metrics in the Prometheus text exposition format.
+        """
+        ns = self.namespace
+        lines = []
+
+        with self._lock:
+            route = ("method", "endpoint")
+            write_histogram(
+                lines,
+                f"{ns}_request_duration_seconds",
+                "Total time of requests to the Envoy node.",
+                route + ("status",),
+                self.durations,
+            )
+            write_histogram(
+                lines,
+                f"{ns}_request_phase_seconds",
+                "Time spent in each phase of requests to the Envoy node.",
+                route + ("phase",),
+                self.phases,
+            )
+            write_counter(
+                lines,
+                f"{ns}_request_sent_bytes_total",
+                "Bytes sent in request bodies.",
+                route,
+                self.bytes_out,
+            )
+            write_counter(
+                lines,
+                f"{ns}_request_received_bytes_total",
+                "Bytes received in response bodies.",
+                route,
+                self.bytes_in,
+            )
+            write_counter(
+                lines,
+                f"{ns}_request_retries_total",
+                "Requests retried after an error response.",
+                route + ("status",),
+                self.retries,
+            )
+            write_counter(
+                lines,
+                f"{ns}_request_errors_total",
+                "Requests that failed, by exception type.",
+                route + ("error",),
+                self.errors,
+            )
+            write_histogram(
+                lines,
+                f"{ns}_auth_refresh_seconds",
+                "Time spent refreshing the access token.",
+                (),
+                {(): self.auth_refreshes},
+            )
+
+        return "\n".join(lines) + "\n"
+
+
+def write_histogram(lines, name, help, labels, histograms) -> None:
+    lines.append(f"# HELP {name} {help}")
+    lines.append(f"# TYPE {name} histogram")
+    for key, histogram in sorted(histograms.items(), key=sort_key):
+        base = format_labels(labels, key)
+        for le, count in histogram.cumulative():
+            le = "+Inf" if le == float("inf") else repr(float(le))
+            bucket = join_labels(base, 'le="' + le + '"')
+            lines.append(f"{name}_bucket{bucket} {count}")
+        lines.append(f"{name}_sum{wrap_labels(base)} {histogram.sum!r}")
+        lines.append(f"{name}_count{wrap_labels(base)} {histogram.count}")
+
+
+def write_counter(lines, name, help, labels, counters) -> None:
+    lines.append(f"# HELP {name} {help}")
+    lines.append(f"# TYPE {name} counter")
+    for key, value in sorted(counters.items(), key=sort_key):
+        lines.append(f"{name}{wrap_labels(format_labels(labels, key))} {value}")
+
+
+def format_labels(labels, values) -> str:
+    return ",".join(
+        f'{label}="{escape(value)}"' for label, value in zip(labels, values)
+    )
+
+
+def join_labels(base: str, label: str) -> str:
+    return "{" + (base + "," if base else "") + label + "}"
+
+
+def wrap_labels(base: str) -> str:
+    return "{" + base + "}" if base else ""
+
+
+def escape(value) -> str:
+    value = "" if value is None else str(value)
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def sort_key(item):
+    return tuple("" if v is None else str(v) for v in item[0])
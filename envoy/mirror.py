@@ -0,0 +1,411 @@
+"""
+A local SQLite mirror of the transactions, accounts, and counterparties on an Envoy node
+so that read-heavy tools can query them by status, counterparty, or address without
+paging through the API. The mirror is kept up to date incrementally by comparing the
+modified and last_update timestamps of each record with the stored copy.
+"""
+
+import json
+import sqlite3
+import threading
+
+from datetime import datetime, timezone
+
+from envoy.records import Record
+
+
+# The collections that are mirrored and their indexed columns; every record is also
+# stored in full as JSON in the data column.
+COLLECTIONS = {
+    "transactions": (
+        "status",
+        "counterparty_id",
+        "originator_address",
+        "beneficiary_address",
+        "virtual_asset",
+        "archived",
+        "created",
+        "last_update",
+    ),
+    "accounts": ("customer_id", "travel_address", "created"),
+    "counterparties": ("name", "travel_address", "created"),
+}
+
+# Columns of each collection that are indexed for fast lookups
+INDEXES = {
+    "transactions": (
+        ("status",),
+        ("counterparty_id",),
+        ("originator_address",),
+        ("beneficiary_address",),
+        ("last_update",),
+    ),
+    "accounts": (("customer_id",), ("travel_address",)),
+    "counterparties": (("name",), ("travel_address",)),
+}
+
+# Number of changed records written to the mirror in each transaction
+WRITE_BATCH_SIZE = 1000
+
+# Timestamps that are compared to determine if the mirrored record is out of date
+VERSION_FIELDS = ("modified", "last_update")
+
+
+class Mirror(object):
+    """
+    A local copy of the collections of an Envoy node in an SQLite database. Call sync to
+    fetch the collections from the node; only records that were created or modified
+    since the last sync are written and records that no longer exist are removed. The
+    collections are then queried locally with the transactions, accounts, and
+    counterparties attributes.
+
+    The mirror can be shared between threads; writes are serialized with a lock.
+
+    Parameters
+    ----------
+    path : str, default ":memory:"
+        The path of the SQLite database, which is created if it does not exist.
+
+    client : Client, default None
+        The client used to sync the mirror if one is not passed to sync.
+    """
+
+    def __init__(self, path=":memory:", client=None):
+        self.path = path
+        self.client = client
+        self._lock = threading.RLock()
+
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_tables()
+
+        self.transactions = MirroredTransactions(self, "transactions")
+        self.accounts = MirroredAccounts(self, "accounts")
+        self.counterparties = MirroredCollection(self, "counterparties")
+
+    def _create_tables(self):
+        with self._lock, self.conn:
+            for name, columns in COLLECTIONS.items():
+                fields = ", ".join(f"{col} TEXT" for col in columns)
+                self.conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {name} ("
+                    f"id TEXT PRIMARY KEY, version TEXT, {fields}, data TEXT NOT NULL)"
+                )
+                for index in INDEXES[name]:
+                    self.conn.execute(
+                        f"CREATE INDEX IF NOT EXISTS {name}_{'_'.join(index)}_idx "
+                        f"ON {name} ({', '.join(index)})"
+                    )
+
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS crypto_addresses ("
+                "crypto_address TEXT NOT NULL, network TEXT, "
+                "account_id TEXT NOT NULL REFERENCES accounts (id) ON DELETE CASCADE)"
+            )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS crypto_addresses_address_idx "
+                "ON crypto_addresses (crypto_address)"
+            )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS crypto_addresses_account_idx "
+                "ON crypto_addresses (account_id)"
+            )
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS syncs ("
+                "collection TEXT PRIMARY KEY, synced TEXT)"
+            )
+
+    def sync(self, client=None, collections=None, params=None, prune=True) -> dict:
+        """
+        Fetch the collections from the Envoy node and update the mirror, returning the
+        number of records seen, inserted, updated, and deleted in each collection.
+
+        Parameters
+        ----------
+        client : Client, default None
+            The client to fetch the collections with; defaults to the mirror's client.
+
+        collections : list of str, default None
+            The names of the collections to sync; defaults to all collections.
+
+        params : dict, default None
+            Query parameters used when listing every collection.
+
+        prune : bool, default True
+            If True, delete mirrored records that were not returned by the node. This
+            is skipped if params are specified since only a subset is returned.
+        """
+        client = client or self.client
+        if client is None:
+            raise ValueError("a client is required to sync the mirror")
+
+        results = {}
+        for name in collections or COLLECTIONS:
+            if name not in COLLECTIONS:
+                raise ValueError(f"unknown mirror collection {name!r}")
+
+            resource = getattr(client, name)
+            records = resource.iter_all(params)
+            results[name] = self._sync_collection(name, records, prune and not params)
+        return results
+
+    def _sync_collection(self, name, records, prune) -> dict:
+        columns = COLLECTIONS[name]
+        counts = {"seen": 0, "inserted": 0, "updated": 0, "deleted": 0}
+
+        # The lock is only held while writing so the mirror can be read during a sync
+        with self._lock:
+            versions = dict(self.conn.execute(f"SELECT id, version FROM {name}"))
+
+        # A record can be returned on two pages if it moves while the node is paged
+        seen = set()
+
+        upserts, addresses = [], []
+        for record in records:
+            data = record.data if isinstance(record, Record) else record
+            rid = data["id"]
+            if rid in seen:
+                continue
+
+            seen.add(rid)
+            counts["seen"] += 1
+            version = record_version(data)
+
+            if rid in versions:
+                if versions.pop(rid) == version and version is not None:
+                    continue
+                counts["updated"] += 1
+            else:
+                counts["inserted"] += 1
+
+            row = [rid, version]
+            row.extend(column_value(data.get(col)) for col in columns)
+            row.append(json.dumps(data))
+            upserts.append(row)
+
+            if name == "accounts":
+                for addr in data.get("crypto_addresses") or ():
+                    addresses.append(
+                        (addr.get("crypto_address"), addr.get("network"), rid)
+                    )
+
+            if len(upserts) >= WRITE_BATCH_SIZE:
+                self._write(name, columns, upserts, addresses)
+                upserts, addresses = [], []
+
+        self._write(name, columns, upserts, addresses)
+
+        with self._lock, self.conn:
+            if prune and versions:
+                deleted = [(rid,) for rid in versions]
+                self.conn.executemany(f"DELETE FROM {name} WHERE id=?", deleted)
+                if name == "accounts":
+                    self.conn.executemany(
+                        "DELETE FROM crypto_addresses WHERE account_id=?", deleted
+                    )
+                counts["deleted"] = len(deleted)
+
+            self.conn.execute(
+                "INSERT OR REPLACE INTO syncs (collection, synced) VALUES (?, ?)",
+                (name, datetime.now(timezone.utc).isoformat()),
+            )
+        return counts
+
+    def _write(self, name, columns, upserts, addresses):
+        if not upserts:
+            return
+
+        fields = ", ".join(("id", "version") + columns + ("data",))
+        marks = ", ".join("?" * (len(columns) + 3))
+
+        with self._lock, self.conn:
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO {name} ({fields}) VALUES ({marks})", upserts
+            )
+
+            if name == "accounts":
+                self.conn.executemany(
+                    "DELETE FROM crypto_addresses WHERE account_id=?",
+                    [(row[0],) for row in upserts],
+                )
+                self.conn.executemany(
+                    "INSERT INTO crypto_addresses "
+                    "(crypto_address, network, account_id) VALUES (?, ?, ?)",
+                    addresses,
+                )
+
+    def last_synced(self, collection: str) -> datetime | None:
+        """
+        Returns when the collection was last synced, or None if it has not been synced.
+        """
+        rows = self.query("SELECT synced FROM syncs WHERE collection=?", (collection,))
+        return datetime.fromisoformat(rows[0][0]) if rows else None
+
+    def query(self, sql: str, params=()) -> list:
+        """
+        Execute a read-only SQL query against the mirror and return the rows.
+        """
+        with self._lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class MirroredCollection(object):
+    """
+    Read-only access to a collection in the mirror; records are returned as Records.
+    """
+
+    def __init__(self, mirror: Mirror, name: str):
+        self.mirror = mirror
+        self.name = name
+        self.columns = frozenset(("id",) + COLLECTIONS[name])
+
+    def get(self, id: str) -> Record | None:
+        """
+        Returns the record with the id or None if it is not in the mirror.
+        """
+        rows = self._select("WHERE id=?", (id,))
+        return rows[0] if rows else None
+
+    def filter(self, order_by: str = None, limit: int = None, **where) -> list:
+        """
+        Returns the records whose indexed columns equal the keyword arguments; a list
+        or tuple of values matches any of the values. For example:
+
+            mirror.transactions.filter(status=["review", "repair"], counterparty_id=id)
+        """
+        clause, params = self._where(where)
+        if order_by is not None:
+            desc = order_by.startswith("-")
+            column = self._column(order_by.lstrip("-"))
+            clause += f" ORDER BY {column}" + (" DESC" if desc else "")
+        if limit is not None:
+            clause += " LIMIT ?"
+            params.append(int(limit))
+        return self._select(clause, params)
+
+    def count(self, **where) -> int:
+        """
+        Returns the number of records whose indexed columns equal the keyword arguments.
+        """
+        clause, params = self._where(where)
+        sql = f"SELECT COUNT(*) FROM {self.name} {clause}"
+        return self.mirror.query(sql, params)[0][0]
+
+    def __len__(self):
+        return self.count()
+
+    def __iter__(self):
+        return iter(self._select("ORDER BY rowid", ()))
+
+    def __contains__(self, id):
+        return self.count(id=id) > 0
+
+    def _select(self, clause, params) -> list:
+        sql = f"SELECT data FROM {self.name} {clause}"
+        return [
+            Record(json.loads(row[0]), lazy=True)
+            for row in self.mirror.query(sql, params)
+        ]
+
+    def _where(self, where):
+        conditions, params = [], []
+        for key, value in where.items():
+            column = self._column(key)
+            if isinstance(value, (list, tuple, set, frozenset)):
+                value = list(value)
+                marks = ", ".join("?" * len(value))
+                conditions.append(f"{column} IN ({marks})")
+                params.extend(column_value(v) for v in value)
+            elif value is None:
+                conditions.append(f"{column} IS NULL")
+            else:
+                conditions.append(f"{column}=?")
+                params.append(column_value(value))
+
+        clause = "WHERE " + " AND ".join(conditions) if conditions else ""
+        return clause, params
+
+    def _column(self, key):
+        if key not in self.columns:
+            raise ValueError(
+                f"cannot query {self.name} by {key!r}, "
+                f"use one of {', '.join(sorted(self.columns))}"
+            )
+        return key
+
+
+class MirroredTransactions(MirroredCollection):
+
+    def by_address(self, address: str) -> list:
+        """
+        Returns the transactions with the address as the originator or beneficiary.
+        """
+        return self._select(
+            "WHERE originator_address=? OR beneficiary_address=? ORDER BY rowid",
+            (address, address),
+        )
+
+
+class MirroredAccounts(MirroredCollection):
+
+    def by_address(self, crypto_address: str) -> Record | None:
+        """
+        Returns the account that owns the crypto address, or None if it is not found.
+        """
+        return self.lookup([crypto_address]).get(crypto_address)
+
+    def lookup(self, crypto_addresses) -> dict:
+        """
+        Returns a dict of the accounts that own each of the crypto addresses that are
+        found in the mirror, keyed by crypto address.
+        """
+        results = {}
+        addresses = list(dict.fromkeys(crypto_addresses))
+
+        # Batch the addresses to stay below SQLite's maximum number of parameters
+        for i in range(0, len(addresses), 500):
+            batch = addresses[i : i + 500]
+            marks = ", ".join("?" * len(batch))
+            rows = self.mirror.query(
+                "SELECT crypto_addresses.crypto_address, accounts.data "
+                "FROM crypto_addresses JOIN accounts "
+                "ON accounts.id = crypto_addresses.account_id "
+                f"WHERE crypto_addresses.crypto_address IN ({marks})",
+                batch,
+            )
+            for address, data in rows:
+                results[address] = Record(json.loads(data), lazy=True)
+        return results
+
+
+def record_version(data: dict) -> str | None:
+    """
+    Returns the most recent of the modified and last_update timestamps of a record.
+    """
+    versions = [data[key] for key in VERSION_FIELDS if data.get(key)]
+    return max(versions) if versions else None
+
+
+def column_value(value):
+    """
+    Converts a value into the text stored in an indexed column.
+    """
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return str(value)
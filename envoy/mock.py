@@ -0,0 +1,679 @@
+"""
+An in-process stand-in for an Envoy node that is used for integration testing and
+benchmarking the client without access to a real node. The mock server issues JWT
+credentials, serves paginated transactions, accounts, and counterparties along with the
+transactions CSV export, and can inject latency and errors into its responses.
+
+The mock server implements only the subset of the Envoy API that is exercised by the
+tests and benchmarks; it is not a reference implementation of the Envoy node.
+"""
+
+import io
+import re
+import csv
+import jwt
+import json
+import hashlib
+import time
+import uuid
+import base64
+import random
+import socket
+import select
+import threading
+
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlsplit, parse_qsl
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from envoy import traddr
+
+
+# Secret used to sign the JWT credentials issued by the mock server
+MOCK_SIGNING_KEY = "pyenvoy-mock-envoy-node-signing-key"
+
+# Characters used to generate ULIDs for counterparties
+CROCKFORD = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+# Maximum number of seconds a stalled export waits for the client to disconnect
+MAX_STALL = 30.0
+
+TRANSACTION_STATUSES = (
+    "draft",
+    "pending",
+    "repair",
+    "review",
+    "rejected",
+    "accepted",
+    "completed",
+)
+
+EXPORT_FIELDS = (
+    "id",
+    "status",
+    "counterparty",
+    "counterparty_id",
+    "originator",
+    "originator_address",
+    "beneficiary",
+    "beneficiary_address",
+    "virtual_asset",
+    "amount",
+    "last_update",
+    "envelope_count",
+    "created",
+    "modified",
+)
+
+
+class MockEnvoy(object):
+    """
+    A mock Envoy node served over HTTP on localhost from a background thread. Use the
+    server as a context manager or call start and stop to manage it, then connect a
+    client using the url, client_id, and client_secret of the server (or call client
+    to create a connected client).
+
+    Parameters
+    ----------
+    transactions : int, default 1000
+        The number of transactions to generate.
+
+    accounts : int, default 100
+        The number of customer accounts to generate.
+
+    counterparties : int, default 50
+        The number of counterparties to generate.
+
+    page_size : int, default 100
+        The default number of records returned in each page of a list request.
+
+    latency : float, default 0.0
+        The number of seconds to wait before responding to each request.
+
+    error_rate : float, default 0.0
+        The probability that a request (other than authentication) fails with the
+        error_status rather than being handled.
+
+    error_status : int, default 503
+        The status code of injected errors.
+
+    export_failures : int, default 0
+        The number of transactions exports whose connection is dropped halfway through
+        sending the CSV file, e.g. to test resuming downloads.
+
+    export_stalls : int, default 0
+        The number of transactions exports that stop sending halfway through the CSV
+        file without closing the connection until the client disconnects, e.g. to test
+        resuming downloads after a read timeout.
+
+    access_lifetime : float, default 3600
+        The number of seconds issued access tokens are valid for.
+
+    refresh_lifetime : float, default 7200
+        The number of seconds issued refresh tokens are valid for.
+
+    seed : int, default 42
+        The seed of the random number generator used to generate the fixtures and to
+        inject errors so that runs are repeatable.
+    """
+
+    def __init__(
+        self,
+        transactions=1000,
+        accounts=100,
+        counterparties=50,
+        page_size=100,
+        latency=0.0,
+        error_rate=0.0,
+        error_status=503,
+        export_failures=0,
+        export_stalls=0,
+        access_lifetime=3600,
+        refresh_lifetime=7200,
+        seed=42,
+    ):
+        self.page_size = page_size
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.export_failures = export_failures
+        self.export_stalls = export_stalls
+        self.access_lifetime = access_lifetime
+        self.refresh_lifetime = refresh_lifetime
+
+        self.client_id = "mockenvoyclientid"
+        self.client_secret = "mock-envoy-client-secret"
+
+        self._rand = random.Random(seed)
+        self._lock = threading.Lock()
+        self._export = None
+        self._server = None
+        self._thread = None
+
+        self.requests = 0
+        self.errors = 0
+        self.authentications = 0
+        self.not_modified = 0
+        self.travel_address_requests = 0
+
+        self.data = {"counterparties": {}, "accounts": {}, "transactions": {}}
+        self._generate(transactions, accounts, counterparties)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def start(self) -> "MockEnvoy":
+        """
+        Start serving requests on a random port on localhost.
+        """
+        if self._server is not None:
+            return self
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), MockEnvoyHandler)
+        self._server.daemon_threads = True
+        self._server.envoy = self
+
+        # Poll frequently so that stopping the server does not block tests
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            kwargs={"poll_interval": 0.05},
+            name="mock-envoy",
+            daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Stop serving requests and close the listening socket.
+        """
+        if self._server is None:
+            return
+
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+        self._server, self._thread = None, None
+
+    @property
+    def url(self) -> str:
+        if self._server is None:
+            raise RuntimeError("the mock envoy server has not been started")
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def client(self, **kwargs):
+        """
+        Returns a client that is configured to connect to the mock server.
+        """
+        from envoy.client import Client
+
+        kwargs.setdefault("timeout", 10.0)
+        return Client(
+            url=self.url,
+            client_id=self.client_id,
+            client_secret=self.client_secret,
+            **kwargs,
+        )
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.requests = 0
+            self.errors = 0
+            self.authentications = 0
+            self.not_modified = 0
+            self.travel_address_requests = 0
+
+    def export_csv(self, params: dict = None) -> bytes:
+        """
+        Returns the transactions CSV export served by the mock, filtered by any query
+        parameters that match transaction fields exactly.
+        """
+        with self._lock:
+            if params:
+                return self._csv(
+                    r
+                    for r in self.data["transactions"].values()
+                    if all(str(r.get(k)) == v for k, v in params.items() if k in r)
+                )
+
+            if self._export is None:
+                self._export = self._csv(self.data["transactions"].values())
+            return self._export
+
+    def _csv(self, records) -> bytes:
+        buf = io.StringIO()
+        writer = csv.DictWriter(buf, fieldnames=EXPORT_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(records)
+        return buf.getvalue().encode("utf-8")
+
+    def drop_export(self) -> bool:
+        """
+        Returns True if the connection of the current export should be dropped.
+        """
+        with self._lock:
+            if self.export_failures > 0:
+                self.export_failures -= 1
+                return True
+        return False
+
+    def stall_export(self) -> bool:
+        """
+        Returns True if the current export should stall until the client disconnects.
+        """
+        with self._lock:
+            if self.export_stalls > 0:
+                self.export_stalls -= 1
+                return True
+        return False
+
+    def issue_credentials(self) -> dict:
+        """
+        Issues a new access and refresh token pair.
+        """
+        now = int(time.time())
+        claims = {"iss": "mock-envoy", "sub": self.client_id, "iat": now, "nbf": now}
+
+        access = dict(claims, exp=now + self.access_lifetime, scope="access")
+        refresh = dict(claims, exp=now + self.refresh_lifetime, scope="refresh")
+
+        with self._lock:
+            self.authentications += 1
+
+        return {
+            "access_token": jwt.encode(access, MOCK_SIGNING_KEY, algorithm="HS256"),
+            "refresh_token": jwt.encode(refresh, MOCK_SIGNING_KEY, algorithm="HS256"),
+        }
+
+    def verify(self, token: str, scope: str) -> bool:
+        """
+        Returns True if the token was issued by the mock for the scope and is valid.
+        """
+        try:
+            claims = jwt.decode(token, MOCK_SIGNING_KEY, algorithms=["HS256"])
+        except jwt.InvalidTokenError:
+            return False
+        return claims.get("scope") == scope
+
+    def inject_error(self) -> bool:
+        with self._lock:
+            self.requests += 1
+            if self.error_rate > 0 and self._rand.random() < self.error_rate:
+                self.errors += 1
+                return True
+        return False
+
+    def page(self, collection: str, params: dict) -> dict:
+        """
+        Returns a page of records from the collection, filtered by any query parameters
+        that match record fields exactly.
+        """
+        size = int(params.pop("page_size", self.page_size))
+        offset = decode_page_token(params.pop("next_page_token", ""))
+
+        with self._lock:
+            records = list(self.data[collection].values())
+
+        if params:
+            records = [
+                r
+                for r in records
+                if all(str(r.get(k)) == v for k, v in params.items() if k in r)
+            ]
+
+        items = records[offset : offset + size]
+        nxt = offset + size
+        token = encode_page_token(nxt) if nxt < len(records) else ""
+
+        return {
+            collection: items,
+            "page": {"page_size": size, "next_page_token": token},
+        }
+
+    def _generate(self, ntransactions, naccounts, ncounterparties):
+        rand = self._rand
+        epoch = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+        def ts(offset):
+            when = epoch + timedelta(seconds=offset)
+            return when.isoformat().replace("+00:00", "Z")
+
+        def uid():
+            return str(uuid.UUID(int=rand.getrandbits(128), version=4))
+
+        def ulid():
+            return "01" + "".join(rand.choice(CROCKFORD) for _ in range(24))
+
+        def address():
+            return "m" + "".join(rand.choice(CROCKFORD) for _ in range(33))
+
+        counterparties = self.data["counterparties"]
+        for i in range(ncounterparties):
+            cp = {
+                "id": ulid(),
+                "source": "gds",
+                "protocol": "trisa",
+                "endpoint": f"trisa.vasp{i}.example.com:443",
+                "name": f"VASP {i}",
+                "website": f"https://vasp{i}.example.com",
+                "country": rand.choice(["US", "DE", "SG", "GB", "CA"]),
+                "verified_on": ts(i),
+                "created": ts(i),
+                "modified": ts(i),
+            }
+            counterparties[cp["id"]] = cp
+
+        accounts = self.data["accounts"]
+        for i in range(naccounts):
+            acct = {
+                "id": ulid(),
+                "customer_id": str(100000 + i),
+                "first_name": f"Customer{i}",
+                "last_name": "Mock",
+                "crypto_addresses": [
+                    {
+                        "id": ulid(),
+                        "crypto_address": address(),
+                        "network": rand.choice(["BTC", "ETH", "LTC"]),
+                        "created": ts(i),
+                        "modified": ts(i),
+                    }
+                    for _ in range(rand.randint(1, 3))
+                ],
+                "created": ts(i),
+                "modified": ts(i),
+            }
+            accounts[acct["id"]] = acct
+
+        cps = list(counterparties.values()) or [{"id": ulid(), "name": "Unknown"}]
+        transactions = self.data["transactions"]
+        for i in range(ntransactions):
+            cp = rand.choice(cps)
+            tx = {
+                "id": uid(),
+                "source": rand.choice(["local", "remote"]),
+                "status": rand.choice(TRANSACTION_STATUSES),
+                "counterparty": cp["name"],
+                "counterparty_id": cp["id"],
+                "originator": f"Customer{rand.randrange(max(naccounts, 1))} Mock",
+                "originator_address": address(),
+                "beneficiary": "Ada Lovelace",
+                "beneficiary_address": address(),
+                "virtual_asset": rand.choice(["BTC", "ETH", "LTC"]),
+                "amount": round(rand.uniform(0.0001, 10.0), 8),
+                "archived": False,
+                "last_update": ts(i * 60 + 30),
+                "envelope_count": rand.randint(1, 4),
+                "created": ts(i * 60),
+                "modified": ts(i * 60 + 30),
+            }
+            transactions[tx["id"]] = tx
+
+
+class MockEnvoyHandler(BaseHTTPRequestHandler):
+    """
+    Routes requests to the mock Envoy node; the node is available on the server.
+    """
+
+    protocol_version = "HTTP/1.1"
+    server_version = "MockEnvoy"
+
+    # Buffer each response so it is sent at once on keep-alive connections
+    wbufsize = -1
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.dispatch("GET")
+
+    def do_POST(self):
+        self.dispatch("POST")
+
+    def do_PUT(self):
+        self.dispatch("PUT")
+
+    def do_DELETE(self):
+        self.dispatch("DELETE")
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def envoy(self) -> MockEnvoy:
+        return self.server.envoy
+
+    def dispatch(self, method: str):
+        url = urlsplit(self.path)
+        params = dict(parse_qsl(url.query))
+        parts = [p for p in url.path.split("/") if p]
+        body = self.read_body()
+
+        if self.envoy.latency > 0:
+            time.sleep(self.envoy.latency)
+
+        if not parts or parts[0] != "v1":
+            return self.reply(404, {"error": "resource not found"})
+        parts = parts[1:]
+
+        if parts == ["status"]:
+            return self.reply(200, {"status": "ok", "version": "mock"})
+
+        if method == "POST" and parts in (["authenticate"], ["reauthenticate"]):
+            return self.authenticate(parts[0], body)
+
+        if self.envoy.inject_error():
+            return self.reply(self.envoy.error_status, {"error": "injected error"})
+
+        auth = self.headers.get("Authorization", "")
+        if not auth.startswith("Bearer ") or not self.envoy.verify(auth[7:], "access"):
+            return self.reply(401, {"error": "authentication required"})
+
+        if method == "POST" and parts[:2] == ["utilities", "travel-address"]:
+            return self.travel_address(parts[2:], body)
+
+        if not parts or parts[0] not in self.envoy.data:
+            return self.reply(404, {"error": "resource not found"})
+
+        collection, rest = parts[0], parts[1:]
+        if method == "GET" and rest == ["export"] and collection == "transactions":
+            return self.reply_csv(self.envoy.export_csv(params))
+
+        if method == "GET" and rest == ["lookup"] and collection == "accounts":
+            return self.lookup(params.get("crypto_address", ""))
+
+        if method == "GET" and rest == ["search"] and collection == "counterparties":
+            return self.search(params.get("query", ""), int(params.get("limit", 10)))
+
+        if not rest:
+            if method == "GET":
+                return self.reply(200, self.envoy.page(collection, params))
+            if method == "POST":
+                return self.create(collection, body)
+            return self.reply(405, {"error": "method not allowed"})
+
+        records = self.envoy.data[collection]
+        if rest[0] not in records:
+            return self.reply(404, {"error": "resource not found"})
+
+        rid, action = rest[0], rest[1:]
+        if not action:
+            if method == "GET":
+                return self.reply(200, records[rid])
+            if method == "PUT":
+                return self.update(collection, rid, body)
+            if method == "DELETE":
+                with self.envoy._lock:
+                    del records[rid]
+                return self.reply(200, {"success": True})
+
+        if method == "POST" and collection == "transactions":
+            if action in (["archive"], ["unarchive"]):
+                with self.envoy._lock:
+                    records[rid]["archived"] = action[0] == "archive"
+                return self.reply(204)
+
+        return self.reply(404, {"error": "resource not found"})
+
+    def authenticate(self, endpoint: str, body):
+        if endpoint == "authenticate":
+            valid = (
+                isinstance(body, dict)
+                and body.get("client_id") == self.envoy.client_id
+                and body.get("client_secret") == self.envoy.client_secret
+            )
+        else:
+            valid = isinstance(body, dict) and self.envoy.verify(
+                body.get("refresh_token", ""), "refresh"
+            )
+
+        if not valid:
+            return self.reply(403, {"error": "invalid credentials"})
+        return self.reply(200, self.envoy.issue_credentials())
+
+    def lookup(self, crypto_address: str):
+        with self.envoy._lock:
+            for acct in self.envoy.data["accounts"].values():
+                for addr in acct["crypto_addresses"]:
+                    if addr["crypto_address"] == crypto_address:
+                        return self.reply(200, acct)
+        return self.reply(404, {"error": "resource not found"})
+
+    def search(self, query: str, limit: int):
+        query = query.lower()
+        with self.envoy._lock:
+            matches = [
+                cp
+                for cp in self.envoy.data["counterparties"].values()
+                if query in cp["name"].lower()
+            ]
+        return self.reply(200, {"counterparties": matches[:limit]})
+
+    def travel_address(self, action: list, body):
+        if not isinstance(body, dict):
+            return self.reply(400, {"error": "could not parse request"})
+
+        with self.envoy._lock:
+            self.envoy.travel_address_requests += 1
+
+        # The mock uses the local codec, so it cannot check compatibility with a node
+        try:
+            if action == ["encode"]:
+                return self.reply(200, {"encoded": traddr.encode(body["decoded"])})
+            if action == ["decode"]:
+                return self.reply(200, {"decoded": traddr.decode(body["encoded"])})
+        except (KeyError, ValueError) as e:
+            return self.reply(400, {"error": f"invalid travel address: {e}"})
+        return self.reply(404, {"error": "resource not found"})
+
+    def create(self, collection: str, body):
+        if not isinstance(body, dict):
+            return self.reply(400, {"error": "could not parse request"})
+
+        record = dict(body, id=str(uuid.uuid4()))
+        with self.envoy._lock:
+            self.envoy.data[collection][record["id"]] = record
+            self.envoy._export = None
+        return self.reply(201, record)
+
+    def update(self, collection: str, rid: str, body):
+        if not isinstance(body, dict) or body.get("id") != rid:
+            return self.reply(400, {"error": "could not parse request"})
+
+        with self.envoy._lock:
+            self.envoy.data[collection][rid] = dict(body)
+            self.envoy._export = None
+        return self.reply(200, body)
+
+    def read_body(self):
+        length = int(self.headers.get("Content-Length", 0) or 0)
+        if not length:
+            return None
+
+        data = self.rfile.read(length)
+        try:
+            return json.loads(data)
+        except ValueError:
+            return data
+
+    def reply(self, status: int, data=None):
+        if data is None:
+            self.send_response(status)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        body = json.dumps(data).encode("utf-8")
+
+        # Successful reads can be revalidated with a conditional request
+        etag = None
+        if self.command == "GET" and status == 200:
+            etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+            if self.headers.get("If-None-Match") == etag:
+                with self.envoy._lock:
+                    self.envoy.not_modified += 1
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+
+        self.send_response(status)
+        if etag is not None:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def reply_csv(self, data: bytes):
+        # Serve a single open-ended byte range (e.g. bytes=1024-) to resume downloads
+        status, start = 200, 0
+        match = re.match(r"^bytes=(\d+)-$", self.headers.get("Range", ""))
+        if match:
+            start = int(match.group(1))
+            if start >= len(data):
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(data)}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            status = 206
+
+        body = data[start:]
+        self.send_response(status)
+        self.send_header("Content-Type", "text/csv; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Accept-Ranges", "bytes")
+        if status == 206:
+            end = len(data) - 1
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(data)}")
+        self.end_headers()
+
+        if self.envoy.drop_export():
+            self.wfile.write(body[: len(body) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            self.connection.shutdown(socket.SHUT_RDWR)
+            return
+
+        if self.envoy.stall_export():
+            self.wfile.write(body[: len(body) // 2])
+            self.wfile.flush()
+
+            # The socket is readable once the client gives up and closes it
+            select.select([self.connection], [], [], MAX_STALL)
+            self.close_connection = True
+            return
+
+        self.wfile.write(body)
+
+
+def encode_page_token(offset: int) -> str:
+    return base64.urlsafe_b64encode(str(offset).encode("ascii")).decode("ascii")
+
+
+def decode_page_token(token: str) -> int:
+    if not token:
+        return 0
+    return int(base64.urlsafe_b64decode(token.encode("ascii")))
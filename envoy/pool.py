@@ -0,0 +1,272 @@
+"""
+A pool of clients for operating many Envoy nodes (e.g. one node per legal entity) from
+a single process. The clients of a pool share a connection pool and a background
+credential refresh thread, are routed to by node name, and can run the same call
+against every node concurrently, collecting the results and errors of each node.
+"""
+
+from requests.sessions import Session
+
+from envoy.batch import imap
+from envoy.client import Client
+from envoy.records import RecordList
+from envoy.adapters import TimedHTTPAdapter
+from envoy.refresh import RefreshScheduler
+from envoy.exceptions import ClientError, EnvoyError
+
+
+# Resources of the client that can be called across every node of a pool
+RESOURCES = (
+    "accounts",
+    "transactions",
+    "counterparties",
+    "users",
+    "apikeys",
+    "auditlogs",
+)
+
+
+class EnvoyPool(object):
+    """
+    Manages the clients of many Envoy nodes. Clients that are created by the pool share
+    a single requests session (and therefore connection pools that are keyed by host)
+    and a single RefreshScheduler thread for the background refresh of credentials.
+
+    Use pool[name] to route a request to a single node, or call a resource method on
+    the pool to call it on every node concurrently, e.g.
+    pool.transactions.list({"status": "review"}) returns a PoolResults of the page of
+    transactions of each node and the errors of the nodes whose request failed.
+
+    Parameters
+    ----------
+    nodes : dict, default None
+        A dict of node names to either the URL of the node, a dict of keyword arguments
+        for its Client (e.g. url, client_id, and client_secret), or a Client.
+
+    workers : int, default 8
+        The maximum number of nodes that are called concurrently.
+
+    pool_connections : int, default 32
+        The number of hosts whose connections are kept in the shared connection pool;
+        this should be at least the number of nodes.
+
+    pool_maxsize : int, default 16
+        The maximum number of connections kept open to each host.
+
+    max_retries : int, default 3
+        The number of times a failed connection is retried by the shared adapter.
+
+    scheduler : RefreshScheduler, default None
+        The scheduler that refreshes the credentials of the clients of the pool; by
+        default the pool creates a scheduler that is shared by its clients.
+
+    kwargs : dict
+        Additional keyword arguments are passed to every Client created by the pool,
+        e.g. auto_refresh=True or retry=True.
+    """
+
+    def __init__(
+        self,
+        nodes=None,
+        workers=8,
+        pool_connections=32,
+        pool_maxsize=16,
+        max_retries=3,
+        scheduler=None,
+        **kwargs,
+    ):
+        if workers < 1:
+            raise ValueError("at least one worker is required")
+
+        self.workers = workers
+        self.defaults = kwargs
+        self.scheduler = scheduler if scheduler is not None else RefreshScheduler()
+
+        self.session = Session()
+        self.adapter = TimedHTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=max_retries,
+        )
+        self.session.mount("http://", self.adapter)
+        self.session.mount("https://", self.adapter)
+
+        self.clients = {}
+        for name, node in (nodes or {}).items():
+            self.add(name, node)
+
+        for resource in RESOURCES:
+            setattr(self, resource, PoolResource(self, resource))
+
+    def add(self, name: str, node) -> Client:
+        """
+        Adds a node to the pool, returning its client. The node may be the URL of the
+        node, a dict of keyword arguments for its Client, or a Client (which does not
+        share the connection pool or scheduler of the pool).
+        """
+        if name in self.clients:
+            raise ClientError(f"node {name!r} is already in the pool")
+
+        if isinstance(node, str):
+            node = {"url": node}
+
+        if isinstance(node, dict):
+            kwargs = {**self.defaults, **node}
+            kwargs.setdefault("scheduler", self.scheduler)
+            node = Client(session=self.session, **kwargs)
+
+        self.clients[name] = node
+        return node
+
+    def remove(self, name: str) -> Client:
+        """
+        Removes the node from the pool and closes its client.
+        """
+        client = self.clients.pop(name)
+        client.close()
+        return client
+
+    @property
+    def names(self) -> list[str]:
+        return list(self.clients)
+
+    def map(self, func, nodes=None, workers=None) -> "PoolResults":
+        """
+        Calls func with the client of each node concurrently, returning a PoolResults
+        of the value returned for each node and the errors of the nodes that failed.
+
+        Parameters
+        ----------
+        func : callable
+            Called with the client of a node; any exception it raises is reported as
+            the error of the node rather than stopping the other calls.
+
+        nodes : list of str, default None
+            The names of the nodes to call; by default every node in the pool.
+
+        workers : int, default None
+            The maximum number of concurrent calls; by default the pool's workers.
+        """
+        names = list(nodes) if nodes is not None else self.names
+        for name in names:
+            if name not in self.clients:
+                raise ClientError(f"node {name!r} is not in the pool")
+
+        workers = min(workers or self.workers, max(len(names), 1))
+        results = PoolResults()
+        for result in imap(lambda name: func(self.clients[name]), names, workers):
+            if result.ok:
+                results[result.item] = result.value
+            else:
+                results.errors[result.item] = result.error
+        return results
+
+    def status(self, nodes=None) -> "PoolResults":
+        return self.map(lambda client: client.status(), nodes=nodes)
+
+    def close(self) -> None:
+        """
+        Closes the clients of every node and the shared connection pool.
+        """
+        for client in self.clients.values():
+            client.close()
+        self.session.close()
+
+    def __getitem__(self, name) -> Client:
+        try:
+            return self.clients[name]
+        except KeyError:
+            raise ClientError(f"node {name!r} is not in the pool")
+
+    def __contains__(self, name):
+        return name in self.clients
+
+    def __iter__(self):
+        return iter(self.clients)
+
+    def __len__(self):
+        return len(self.clients)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __repr__(self):
+        return f"<EnvoyPool nodes={self.names!r}>"
+
+
+class PoolResource(object):
+    """
+    Calls a method of a resource (e.g. transactions) on every node of a pool; any
+    method of the resource can be called with the same arguments as on a client.
+    """
+
+    def __init__(self, pool: EnvoyPool, name: str):
+        self.pool = pool
+        self.name = name
+
+    def __getattr__(self, method):
+        if method.startswith("_"):
+            raise AttributeError(method)
+
+        def call(*args, nodes=None, **kwargs):
+            def func(client):
+                return getattr(getattr(client, self.name), method)(*args, **kwargs)
+
+            return self.pool.map(func, nodes=nodes)
+
+        call.__name__ = method
+        return call
+
+
+class PoolResults(dict):
+    """
+    The value returned by each node of a pool that was called successfully, keyed by
+    node name, and the errors of the nodes that failed in the errors attribute.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(PoolResults, self).__init__(*args, **kwargs)
+        self.errors = {}
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    def records(self):
+        """
+        Yields (node, record) for every record in the results of every node, e.g. the
+        records of the pages returned by a list across the pool. Values that are not
+        lists of records (e.g. the Record returned by a detail or the status of a node)
+        are yielded whole and nodes that returned None are skipped.
+        """
+        for name, value in self.items():
+            if value is None:
+                continue
+
+            if isinstance(value, (RecordList, list, tuple)):
+                for record in value:
+                    yield name, record
+            else:
+                yield name, value
+
+    def merged(self) -> list:
+        """
+        Returns the records of every node in a single list, in node order.
+        """
+        return [record for _, record in self.records()]
+
+    def raise_for_errors(self) -> "PoolResults":
+        """
+        Raises an EnvoyError that describes the errors of every node that failed, or
+        returns the results if every node succeeded.
+        """
+        if self.errors:
+            failed = ", ".join(f"{name}: {err}" for name, err in self.errors.items())
+            raise EnvoyError(f"{len(self.errors)} node(s) failed: {failed}")
+        return self
+
+    def __repr__(self):
+        return f"<PoolResults ok={list(self)!r} errors={list(self.errors)!r}>"
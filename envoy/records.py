@@ -7,16 +7,36 @@ import json
 from collections.abc import Mapping, Sequence
 
 
+# Page query key used to request the next page of a paginated list
+NextPageToken = "next_page_token"
+
+
 class Record(Mapping):
     """
     A record provides access to data returned from the Envoy server along with helper
     methods for inspecting nested data and resources.
+
+    By default the data is copied into the record. A lazy record instead keeps a
+    reference to the data without copying it, which is how records are created from
+    server payloads; nested dicts and lists are wrapped on first access and the wrapped
+    children are cached so that repeated access does not allocate new records.
+
+    Records use __slots__ to keep the per-record memory overhead small when iterating
+    over large lists; subclasses should also define __slots__ to remain compact.
     """
 
-    def __init__(self, data=None, /, parent=None, **kwargs):
-        self.data = {}
+    __slots__ = ("data", "parent", "_lazy", "_children")
+
+    def __init__(self, data=None, /, parent=None, lazy=False, **kwargs):
         self.parent = parent
+        self._lazy = lazy and not kwargs and isinstance(data, dict)
+        self._children = None
+
+        if self._lazy:
+            self.data = data
+            return
 
+        self.data = {}
         if data is not None:
             self.data.update(data)
         if kwargs:
@@ -31,11 +51,11 @@ class Record(Mapping):
         may override this method to return different or particular types based on key.
         """
         if isinstance(item, dict):
-            return Record(item, parent=self)
+            return Record(item, parent=self, lazy=self._lazy)
 
         if isinstance(item, list):
             if any([isinstance(sub, dict) for sub in item]):
-                return RecordList(item, parent=self)
+                return RecordList(item, parent=self, lazy=self._lazy)
 
         return item
 
@@ -43,8 +63,16 @@ class Record(Mapping):
         return len(self.data)
 
     def __getitem__(self, key):
+        if self._children is not None and key in self._children:
+            return self._children[key]
+
         if key in self.data:
-            return self.cast(key, self.data[key])
+            item = self.cast(key, self.data[key])
+            if self._lazy and isinstance(item, (Record, RecordList)):
+                if self._children is None:
+                    self._children = {}
+                self._children[key] = item
+            return item
         raise KeyError(key)
 
     def __iter__(self):
@@ -69,31 +97,27 @@ class Record(Mapping):
 
     def __ior__(self, other):
         if isinstance(other, Record):
-            self.data |= other.data
+            other = other.data
+
+        if self._lazy:
+            # Do not modify the data that the lazy record references
+            self.data = self.data | other
+            self._children = None
         else:
             self.data |= other
         return self
 
     def __copy__(self):
-        inst = self.__class__.__new__(self.__class__)
-        inst.__dict__.update(self.__dict__)
-        # Create a copy and avoid triggering descriptors
-        inst.__dict__["data"] = self.__dict__["data"].copy()
+        inst = _copy_attributes(self)
+        inst.data = self.data.copy()
+        inst._lazy = False
+        inst._children = None
         return inst
 
     def copy(self):
         if self.__class__ is Record:
             return Record(self.data.copy())
-        import copy
-
-        data = self.data
-        try:
-            self.data = {}
-            c = copy.copy(self)
-        finally:
-            self.data = data
-        c.update(self)
-        return c
+        return self.__copy__()
 
     def items(self):
         for key in self:
@@ -109,14 +133,21 @@ class Record(Mapping):
 class RecordList(Sequence):
     """
     A record list provides access to a sequence of data returned from an Envoy API
-    request along with helper methods for inspecting subrecords.
+    request along with helper methods for inspecting subrecords. Like records, a lazy
+    record list references the list without copying it and caches wrapped items.
     """
 
-    def __init__(self, initlist=None, parent=None):
+    __slots__ = ("data", "parent", "_lazy", "_children")
+
+    def __init__(self, initlist=None, parent=None, lazy=False):
         self.data = []
         self.parent = parent
+        self._lazy = lazy and isinstance(initlist, list)
+        self._children = None
 
-        if initlist is not None:
+        if self._lazy:
+            self.data = initlist
+        elif initlist is not None:
             if isinstance(initlist, type(self.data)):
                 self.data[:] = initlist[:]
             elif isinstance(initlist, RecordList):
@@ -130,11 +161,11 @@ class RecordList(Sequence):
         may override this method to return different or particular types.
         """
         if isinstance(item, dict):
-            return Record(item, parent=self)
+            return Record(item, parent=self, lazy=self._lazy)
 
         if isinstance(item, list):
             if any([isinstance(sub, dict) for sub in item]):
-                return RecordList(item, parent=self)
+                return RecordList(item, parent=self, lazy=self._lazy)
 
         return item
 
@@ -147,14 +178,30 @@ class RecordList(Sequence):
     def __getitem__(self, i):
         if isinstance(i, slice):
             return self.__class__(self.data[i])
-        else:
+
+        if not self._lazy:
             return self.cast(self.data[i])
 
+        if i < 0:
+            i += len(self.data)
+            if i < 0:
+                raise IndexError("list index out of range")
+
+        if self._children is not None and i in self._children:
+            return self._children[i]
+
+        item = self.cast(self.data[i])
+        if isinstance(item, (Record, RecordList)):
+            if self._children is None:
+                self._children = {}
+            self._children[i] = item
+        return item
+
     def __copy__(self):
-        inst = self.__class__.__new__(self.__class__)
-        inst.__dict__.update(self.__dict__)
-        # Create a copy and avoid triggering descriptors
-        inst.__dict__["data"] = self.__dict__["data"][:]
+        inst = _copy_attributes(self)
+        inst.data = self.data[:]
+        inst._lazy = False
+        inst._children = None
         return inst
 
     def copy(self):
@@ -169,19 +216,31 @@ class PaginatedRecords(RecordList):
     CollectionKey = None
     PageKey = "page"
 
-    def __init__(self, data, parent=None):
+    def __init__(self, data, parent=None, lazy=False):
         if self.CollectionKey is None:
             # expecting only a "page" field and the collections field, e.g. "accounts"
             collection_key = self._collection_key(data)
         else:
             collection_key = self.CollectionKey
 
-        collection = data.pop(collection_key, None)
-        super(PaginatedRecords, self).__init__(collection, parent=parent)
+        collection = data.get(collection_key, None)
+        super(PaginatedRecords, self).__init__(collection, parent=parent, lazy=lazy)
 
-        self.page = data.pop(self.PageKey, {})
+        self.page = data.get(self.PageKey, None) or {}
         for key, val in data.items():
-            setattr(self, key, val)
+            if key != collection_key and key != self.PageKey:
+                setattr(self, key, val)
+
+    @property
+    def next_page_token(self):
+        """
+        Returns the token to request the next page of results or None if this is the
+        last page of results.
+        """
+        return self.page.get(NextPageToken, None) or None
+
+    def has_next_page(self) -> bool:
+        return self.next_page_token is not None
 
     def _collection_key(self, data):
         for key in data.keys():
@@ -192,3 +251,20 @@ class PaginatedRecords(RecordList):
                 return key
 
         return "collection"
+
+
+def _copy_attributes(obj):
+    """
+    Creates a new instance of the object's class without calling __init__ and copies
+    the object's slots and instance dictionary (if any) onto the new instance.
+    """
+    inst = obj.__class__.__new__(obj.__class__)
+    for cls in type(obj).__mro__:
+        slots = getattr(cls, "__slots__", ())
+        for name in (slots,) if isinstance(slots, str) else slots:
+            if name not in ("__dict__", "__weakref__") and hasattr(obj, name):
+                object.__setattr__(inst, name, getattr(obj, name))
+
+    if hasattr(obj, "__dict__"):
+        inst.__dict__.update(obj.__dict__)
+    return inst
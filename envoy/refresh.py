@@ -0,0 +1,111 @@
+"""
+Background renewal of client credentials so that access tokens are refreshed shortly
+before they expire rather than on the request path when they have already expired.
+"""
+
+import time
+import heapq
+import weakref
+import logging
+import itertools
+import threading
+
+
+# Setup debug logging for pyenvoy
+logger = logging.getLogger("envoy")
+
+# The default scheduler shared by all clients that do not specify their own
+_default_scheduler = None
+_default_scheduler_lock = threading.Lock()
+
+
+class RefreshScheduler(object):
+    """
+    A refresh scheduler runs a single daemon thread that calls the refresh method of
+    clients at the time they have requested. A scheduler may be shared by any number of
+    clients; each client has at most one refresh scheduled at a time. Clients are held
+    by weak reference so that scheduling a refresh does not keep a client alive.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._queue = []
+        self._jobs = {}
+        self._counter = itertools.count()
+        self._thread = None
+
+    def schedule(self, client, delay: float) -> None:
+        """
+        Schedule the client's _background_refresh method to be called in delay seconds,
+        replacing any refresh that was previously scheduled for the client.
+        """
+        deadline = time.monotonic() + max(delay, 0.0)
+        with self._cond:
+            self._cancel(client)
+            key = id(client)
+            job = [deadline, next(self._counter), weakref.ref(client), True, key]
+            self._jobs[key] = job
+            heapq.heappush(self._queue, job)
+
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="envoy-refresh", daemon=True
+                )
+                self._thread.start()
+            self._cond.notify()
+
+    def cancel(self, client) -> None:
+        """
+        Cancel the refresh scheduled for the client, if any.
+        """
+        with self._cond:
+            self._cancel(client)
+
+    def scheduled(self, client) -> float | None:
+        """
+        Returns the number of seconds until the client's next refresh or None if no
+        refresh is scheduled for the client.
+        """
+        with self._cond:
+            job = self._jobs.get(id(client))
+            if job is None:
+                return None
+            return job[0] - time.monotonic()
+
+    def _cancel(self, client) -> None:
+        job = self._jobs.pop(id(client), None)
+        if job is not None:
+            job[3] = False
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue or self._queue[0][0] > time.monotonic():
+                    timeout = None
+                    if self._queue:
+                        timeout = self._queue[0][0] - time.monotonic()
+                    self._cond.wait(timeout)
+
+                _, _, ref, active, key = job = heapq.heappop(self._queue)
+                if self._jobs.get(key) is job:
+                    del self._jobs[key]
+                client = ref()
+
+            if not active or client is None:
+                continue
+
+            try:
+                client._background_refresh()
+            except Exception:
+                logger.exception("background credential refresh failed")
+
+
+def default_scheduler() -> RefreshScheduler:
+    """
+    Returns the refresh scheduler that is shared by all clients by default.
+    """
+    global _default_scheduler
+    with _default_scheduler_lock:
+        if _default_scheduler is None:
+            _default_scheduler = RefreshScheduler()
+        return _default_scheduler
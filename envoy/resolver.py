@@ -0,0 +1,287 @@
+"""
+A local index of the crypto addresses of customer accounts so that accounts can be
+looked up by address without a round trip to the Envoy node for every address.
+"""
+
+import time
+import threading
+
+from envoy.batch import imap
+from envoy.accounts import Account
+from envoy.exceptions import NotFound
+from envoy.mirror import record_version
+
+
+class AddressResolver(object):
+    """
+    Resolves crypto addresses to the customer accounts that own them using an index
+    built from a full scan of the accounts on the Envoy node. The index is kept in
+    memory or, if a mirror is specified, in the mirror's SQLite database. It is
+    refreshed every refresh_interval seconds by paging through all of the accounts
+    again (the API cannot list only the accounts modified since a timestamp); only the
+    index writes are incremental, since only accounts whose modified timestamp has
+    changed are re-indexed.
+
+    Addresses that are not in the index are looked up with the API (unless fallback is
+    False) and the account that is found is added to the index. Assign the resolver to
+    the accounts resource of the client to use it for Accounts.lookup:
+
+        client.accounts.resolver = AddressResolver(client)
+
+    Parameters
+    ----------
+    client : Client
+        The client used to scan the accounts and look up addresses on a miss.
+
+    mirror : Mirror, default None
+        Store the index in the accounts of a mirror rather than in memory; refreshing
+        the resolver syncs the accounts of the mirror.
+
+    refresh_interval : float, default 300.0
+        The number of seconds after which the index is refreshed on the next lookup.
+        If None, the index is only refreshed by calling refresh.
+
+    fallback : bool, default True
+        Look up addresses that are not in the index with the API.
+
+    negative_ttl : float, default None
+        The number of seconds to remember addresses that were not found by the API so
+        that repeated lookups of unknown addresses are not sent to the node.
+    """
+
+    def __init__(
+        self,
+        client,
+        mirror=None,
+        refresh_interval=300.0,
+        fallback=True,
+        negative_ttl=None,
+    ):
+        self.client = client
+        self.mirror = mirror
+        self.refresh_interval = refresh_interval
+        self.fallback = fallback
+        self.negative_ttl = negative_ttl
+
+        self._index = {}
+        self._accounts = {}
+        self._unknown = {}
+        self._lock = threading.Lock()
+        self._refreshing = threading.Lock()
+        self.refreshed = None
+
+        self.hits = 0
+        self.misses = 0
+        self.remote = 0
+
+    def refresh(self) -> dict:
+        """
+        Page through all of the accounts on the Envoy node and update the index with
+        the accounts that have been created, modified, or deleted since the last
+        refresh. Returns the number of accounts seen, inserted, updated, and deleted.
+        """
+        with self._refreshing:
+            return self._refresh()
+
+    def _refresh(self) -> dict:
+        # Must be called while holding the refreshing lock
+        if self.mirror is not None:
+            counts = self.mirror.sync(self.client, collections=["accounts"])
+            counts = counts["accounts"]
+        else:
+            counts = self._scan()
+
+        with self._lock:
+            self._unknown.clear()
+        self.refreshed = time.monotonic()
+        return counts
+
+    def _scan(self) -> dict:
+        counts = {"seen": 0, "inserted": 0, "updated": 0, "deleted": 0}
+        seen = set()
+
+        for account in self.client.accounts.iter_all():
+            data = account.data
+            version = record_version(data)
+            seen.add(data["id"])
+            counts["seen"] += 1
+
+            current = self._accounts.get(data["id"])
+            if current is not None:
+                if current[0] == version and version is not None:
+                    continue
+                counts["updated"] += 1
+            else:
+                counts["inserted"] += 1
+            self._add(data)
+
+        with self._lock:
+            for rid in set(self._accounts) - seen:
+                self._remove(rid)
+                counts["deleted"] += 1
+        return counts
+
+    def _add(self, data: dict) -> None:
+        addresses = [
+            addr["crypto_address"]
+            for addr in data.get("crypto_addresses") or ()
+            if addr.get("crypto_address")
+        ]
+
+        with self._lock:
+            self._remove(data["id"])
+            self._accounts[data["id"]] = (record_version(data), addresses)
+            for address in addresses:
+                self._index[address] = data
+                self._unknown.pop(address, None)
+
+    def _remove(self, rid: str) -> None:
+        # Must be called while holding the lock
+        _, addresses = self._accounts.pop(rid, (None, ()))
+        for address in addresses:
+            if address in self._index and self._index[address]["id"] == rid:
+                del self._index[address]
+
+    def resolve(self, crypto_address: str) -> Account | None:
+        """
+        Returns the account that owns the crypto address from the index without
+        making any requests to the Envoy node, or None if it is not in the index.
+        """
+        if self.mirror is not None:
+            record = self.mirror.accounts.by_address(crypto_address)
+            data = record.data if record is not None else None
+        else:
+            data = self._index.get(crypto_address)
+
+        if data is None:
+            return None
+        return Account(data, parent=self.client.accounts, lazy=True)
+
+    def lookup(self, crypto_address: str) -> Account:
+        """
+        Returns the account that owns the crypto address, looking it up with the API
+        if it is not in the index. Raises NotFound if there is no such account.
+        """
+        self._maybe_refresh()
+        account = self.resolve(crypto_address)
+        if account is not None:
+            self._count(hits=1)
+            return account
+
+        self._count(misses=1)
+        return self._lookup_remote(crypto_address)
+
+    def lookup_many(self, crypto_addresses, workers: int = 8) -> dict:
+        """
+        Returns a dict of the account that owns each of the crypto addresses or None
+        if the address is not owned by an account. Addresses that are not in the index
+        are looked up with the API concurrently.
+        """
+        self._maybe_refresh()
+        addresses = list(dict.fromkeys(crypto_addresses))
+
+        if self.mirror is not None:
+            found = self.mirror.accounts.lookup(addresses)
+            results = {
+                addr: (
+                    Account(found[addr].data, parent=self.client.accounts, lazy=True)
+                    if addr in found
+                    else None
+                )
+                for addr in addresses
+            }
+        else:
+            results = {addr: self.resolve(addr) for addr in addresses}
+
+        missing = [addr for addr, account in results.items() if account is None]
+        self._count(hits=len(results) - len(missing), misses=len(missing))
+
+        for result in imap(self._lookup_remote, missing, workers=workers):
+            if result.ok:
+                results[result.item] = result.value
+            elif not isinstance(result.error, NotFound):
+                raise result.error
+        return results
+
+    def _lookup_remote(self, crypto_address: str) -> Account:
+        if not self.fallback or self._is_unknown(crypto_address):
+            raise NotFound(f"no account found for crypto address {crypto_address}")
+
+        self._count(remote=1)
+        try:
+            account = self.client.accounts._lookup(crypto_address)
+        except NotFound:
+            if self.negative_ttl:
+                with self._lock:
+                    expires = time.monotonic() + self.negative_ttl
+                    self._unknown[crypto_address] = expires
+            raise
+
+        # The mirror is only updated when it is synced
+        if self.mirror is None:
+            self._add(account.data)
+        return account
+
+    def _count(self, hits=0, misses=0, remote=0) -> None:
+        # The counters are updated by every thread that looks up addresses
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+            self.remote += remote
+
+    def _is_unknown(self, crypto_address: str) -> bool:
+        expires = self._unknown.get(crypto_address)
+        if expires is None:
+            return False
+        if expires > time.monotonic():
+            return True
+
+        with self._lock:
+            self._unknown.pop(crypto_address, None)
+        return False
+
+    def _maybe_refresh(self) -> None:
+        if self.refreshed is None:
+            # Block until the index has been built for the first time
+            with self._refreshing:
+                if self.refreshed is None:
+                    self._refresh()
+            return
+
+        if not self._is_stale():
+            return
+
+        # Only one thread refreshes the index; the others use the current index
+        if self._refreshing.acquire(blocking=False):
+            try:
+                if self._is_stale():
+                    self._refresh()
+            finally:
+                self._refreshing.release()
+
+    def _is_stale(self) -> bool:
+        if self.refresh_interval is None:
+            return False
+        return time.monotonic() - self.refreshed >= self.refresh_interval
+
+    def stats(self) -> dict:
+        """
+        Returns the number of indexed accounts and addresses and the number of lookups
+        that were resolved by the index or sent to the API.
+        """
+        if self.mirror is not None:
+            accounts = self.mirror.accounts.count()
+        else:
+            accounts = len(self._accounts)
+
+        with self._lock:
+            counts = {"hits": self.hits, "misses": self.misses, "remote": self.remote}
+        return {"accounts": accounts, "addresses": len(self), **counts}
+
+    def __len__(self):
+        if self.mirror is not None:
+            return self.mirror.query("SELECT COUNT(*) FROM crypto_addresses")[0][0]
+        return len(self._index)
+
+    def __contains__(self, crypto_address):
+        return self.resolve(crypto_address) is not None
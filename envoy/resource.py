@@ -4,9 +4,12 @@ serviced by the API. The basic functionality is list, create, detail, update, an
 delete. Most interactions with the Envoy API are via a resource object.
 """
 
+from concurrent.futures import ThreadPoolExecutor
+
 from envoy import client
+from envoy.batch import imap
 from envoy.exceptions import ValidationError
-from envoy.records import Record, PaginatedRecords
+from envoy.records import Record, PaginatedRecords, NextPageToken
 
 
 class Resource(object):
@@ -33,8 +36,51 @@ class Resource(object):
                 require_authentication=True,
             ),
             parent=self,
+            lazy=True,
         )
 
+    def iter_all(self, params: dict = None, prefetch: bool = True):
+        """
+        Lazily iterate over every record in the collection, following the next page
+        token of each page until the last page has been returned.
+
+        Parameters
+        ----------
+        params : dict, default None
+            A dictionary of query parameters to attach to the URL of every page.
+
+        prefetch : bool, default True
+            If True, the next page is requested in a background thread while the
+            records of the current page are being consumed so that a full scan is not
+            bounded by the sum of the round trip times of every page.
+        """
+        params = dict(params or {})
+        executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+
+        try:
+            seen = set()
+            page = self.list(params)
+
+            while True:
+                token, future = page.next_page_token, None
+                if token is not None and token not in seen:
+                    seen.add(token)
+                    params[NextPageToken] = token
+                    if executor is not None:
+                        future = executor.submit(self.list, dict(params))
+                else:
+                    token = None
+
+                yield from page
+
+                if token is None:
+                    return
+
+                page = future.result() if future is not None else self.list(params)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+
     def create(self, data: dict, params: dict = None) -> dict:
         return self.RecordType(
             self.client.post(
@@ -44,6 +90,7 @@ class Resource(object):
                 require_authentication=True,
             ),
             parent=self,
+            lazy=True,
         )
 
     def detail(self, rid: str, params: dict = None) -> dict:
@@ -55,6 +102,7 @@ class Resource(object):
                 require_authentication=True,
             ),
             parent=self,
+            lazy=True,
         )
 
     def update(self, data: dict, params: dict = None) -> dict:
@@ -70,6 +118,7 @@ class Resource(object):
                 require_authentication=True,
             ),
             parent=self,
+            lazy=True,
         )
 
     def delete(self, rid: str, params: dict = None) -> dict | None:
@@ -80,6 +129,51 @@ class Resource(object):
             require_authentication=True,
         )
 
+    def bulk_create(self, items, params: dict = None, workers: int = 8):
+        """
+        Create every record in items, keeping up to workers requests in flight on the
+        client's connection pool. Returns an iterator of envoy.batch.Result objects in
+        the same order as the items; the value of each result is the created record and
+        a failed create is reported as the error of its result rather than raised.
+
+        Parameters
+        ----------
+        items : iterable of dict
+            The data of the records to create; consumed lazily so that large imports do
+            not have to be held in memory.
+
+        params : dict, default None
+            A dictionary of query parameters to attach to the URL of every request.
+
+        workers : int, default 8
+            The maximum number of concurrent requests. This should be no more than the
+            pool_maxsize of the client, otherwise connections are discarded and opened
+            again rather than reused.
+        """
+        return imap(lambda data: self.create(data, params=params), items, workers)
+
+    def bulk_update(self, items, params: dict = None, workers: int = 8):
+        """
+        Update every record in items (which must have an ID), keeping up to workers
+        requests in flight. Returns an iterator of envoy.batch.Result objects in the
+        same order as the items; see bulk_create for details.
+        """
+        return imap(lambda data: self.update(data, params=params), items, workers)
+
+    def bulk_delete(self, items, params: dict = None, workers: int = 8):
+        """
+        Delete every record in items, which may either be IDs or records that have an
+        ID, keeping up to workers requests in flight. Returns an iterator of
+        envoy.batch.Result objects in the same order as the items; see bulk_create
+        for details.
+        """
+
+        def delete(item):
+            rid = item if isinstance(item, str) else item["id"]
+            return self.delete(rid, params=params)
+
+        return imap(delete, items, workers)
+
     def _endpoint(self):
         endpoint = self.endpoint
         if isinstance(endpoint, str):
@@ -0,0 +1,181 @@
+"""
+Retry policies that determine if and when a request that failed because the Envoy node
+is overloaded or temporarily unavailable should be retried.
+"""
+
+import math
+import time
+import random
+
+from email.utils import parsedate_to_datetime
+
+
+# Status codes that indicate the node is temporarily unable to handle the request
+RETRY_STATUSES = frozenset([429, 502, 503, 504])
+
+# Methods that can be safely repeated without changing the result of the request
+IDEMPOTENT_METHODS = frozenset(["GET", "HEAD", "OPTIONS", "PUT", "DELETE"])
+
+# Status codes that indicate the request was rejected without being processed, so the
+# request can be retried even if its method is not idempotent.
+REJECTED_STATUSES = frozenset([429])
+
+
+class RetryPolicy(object):
+    """
+    A retry policy describes which failed requests are retried and how long the client
+    waits between attempts. Requests that fail with one of the retry statuses are
+    retried if the method is idempotent or if the status indicates the node rejected
+    the request without processing it (e.g. 429 Too Many Requests).
+
+    The client waits for the number of seconds in the Retry-After header of the
+    response if it is present, otherwise it backs off exponentially with full jitter so
+    that many clients retrying at the same time do not overload the node again.
+
+    Parameters
+    ----------
+    total : int, default 3
+        The maximum number of times a request is retried.
+
+    statuses : iterable of int, default (429, 502, 503, 504)
+        The response status codes that are retried.
+
+    methods : iterable of str, default (GET, HEAD, OPTIONS, PUT, DELETE)
+        The idempotent methods that are retried on any of the retry statuses.
+
+    backoff : float, default 0.5
+        The base number of seconds to wait; the wait before the nth retry is chosen
+        uniformly at random between 0 and backoff * 2**n seconds.
+
+    max_backoff : float, default 30.0
+        The maximum number of seconds to wait between attempts, including waits
+        requested by the Retry-After header.
+
+    deadline : float, default 60.0
+        The total number of seconds from the first attempt after which the request is
+        no longer retried. If None, only the total number of retries is limited.
+
+    respect_retry_after : bool, default True
+        If True, the Retry-After header of the response is used as the wait before the
+        next attempt instead of the exponential backoff.
+
+    jitter : bool, default True
+        If False, the full exponential backoff is used rather than a random fraction.
+    """
+
+    def __init__(
+        self,
+        total=3,
+        statuses=RETRY_STATUSES,
+        methods=IDEMPOTENT_METHODS,
+        backoff=0.5,
+        max_backoff=30.0,
+        deadline=60.0,
+        respect_retry_after=True,
+        jitter=True,
+    ):
+        self.total = total
+        self.statuses = frozenset(statuses)
+        self.methods = frozenset(m.upper() for m in methods)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.deadline = deadline
+        self.respect_retry_after = respect_retry_after
+        self.jitter = jitter
+
+    def is_retryable(self, method: str, status: int) -> bool:
+        """
+        Returns True if a response with the status to a request with the method should
+        be retried (ignoring the number of attempts and the deadline).
+        """
+        if status not in self.statuses:
+            return False
+        return method.upper() in self.methods or status in REJECTED_STATUSES
+
+    def next_delay(
+        self, method: str, rep, attempt: int, elapsed: float
+    ) -> float | None:
+        """
+        Returns the number of seconds to wait before retrying the request or None if
+        the request should not be retried.
+
+        Parameters
+        ----------
+        method : str
+            The HTTP method of the request.
+
+        rep : Response
+            The response to the request; must have a status_code and headers.
+
+        attempt : int
+            The number of retries that have already been made for the request.
+
+        elapsed : float
+            The number of seconds since the first attempt of the request was made.
+        """
+        if attempt >= self.total or not self.is_retryable(method, rep.status_code):
+            return None
+
+        delay = None
+        if self.respect_retry_after:
+            delay = parse_retry_after(rep.headers.get("Retry-After"))
+            if delay is not None:
+                delay = min(delay, self.max_backoff)
+
+        if delay is None:
+            delay = min(self.max_backoff, self.backoff * (2**attempt))
+            if self.jitter:
+                delay = random.uniform(0, delay)
+
+        if self.deadline is not None and elapsed + delay > self.deadline:
+            return None
+        return delay
+
+    def __repr__(self):
+        return f"<RetryPolicy total={self.total} deadline={self.deadline}>"
+
+
+def get_retry_policy(retry) -> RetryPolicy | None:
+    """
+    Returns the retry policy specified by a client's retry argument: either a policy,
+    True for the default policy, the maximum number of retries, or None/False to
+    disable retries.
+    """
+    if retry is None or retry is False:
+        return None
+    if retry is True:
+        return RetryPolicy()
+    if isinstance(retry, int):
+        return RetryPolicy(total=retry)
+    if isinstance(retry, RetryPolicy):
+        return retry
+    raise TypeError(f"cannot create a retry policy from {retry!r}")
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """
+    Parses the Retry-After header, which is either a number of seconds or an HTTP date,
+    returning the number of seconds to wait or None if the header cannot be parsed or
+    is not a finite number of seconds.
+    """
+    if not value:
+        return None
+
+    value = value.strip()
+    try:
+        seconds = float(value)
+    except ValueError:
+        pass
+    else:
+        if not math.isfinite(seconds):
+            return None
+        return max(seconds, 0.0)
+
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    if when is None:
+        return None
+    return max(when.timestamp() - time.time(), 0.0)
@@ -0,0 +1,122 @@
+"""
+A local implementation of the travel address encoding used by Envoy nodes. A travel
+address is the prefix "ta" followed by the Base58Check encoding (with a four byte double
+SHA-256 checksum and no version byte) of the URI of an account on a TRISA node, e.g.
+"trisa.example.com:443/accounts/01HV6RV08YNR2GH8MEEFCV4NKN?mode=trisa&t=i".
+
+Encoding and decoding locally avoids a round trip to the node for what is a
+deterministic string transformation; the URI is encoded exactly as it is given.
+"""
+
+from hashlib import sha256
+
+
+# Prefix that identifies travel addresses
+PREFIX = "ta"
+
+# The Bitcoin Base58 alphabet
+ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+DIGITS = {char: i for i, char in enumerate(ALPHABET)}
+
+# Encoding converts two Base58 digits at a time using a table of every digit pair
+BASE2 = 58 * 58
+PAIRS = [a + b for a in ALPHABET for b in ALPHABET]
+
+CHECKSUM_SIZE = 4
+
+
+def encode(uri: str) -> str:
+    """
+    Encodes the URI of an account as a travel address.
+    """
+    data = uri.encode("utf-8")
+    return PREFIX + b58encode(data + checksum(data))
+
+
+def decode(travel_address: str) -> str:
+    """
+    Decodes a travel address into the URI of the account, raising a ValueError if the
+    travel address is malformed or its checksum does not match.
+    """
+    if not isinstance(travel_address, str) or not travel_address.startswith(PREFIX):
+        raise ValueError(f"{travel_address!r} is not a travel address")
+
+    raw = b58decode(travel_address[len(PREFIX) :])
+    data, check = raw[:-CHECKSUM_SIZE], raw[-CHECKSUM_SIZE:]
+    if len(raw) <= CHECKSUM_SIZE or checksum(data) != check:
+        raise ValueError(f"invalid checksum for travel address {travel_address!r}")
+
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError:
+        raise ValueError(f"travel address {travel_address!r} is not a valid uri")
+
+
+def encode_many(uris) -> list:
+    """
+    Encodes each of the URIs as a travel address.
+    """
+    return [encode(uri) for uri in uris]
+
+
+def decode_many(travel_addresses, strict: bool = True) -> list:
+    """
+    Decodes each of the travel addresses into a URI. If strict is False, None is
+    returned for travel addresses that are malformed rather than raising a ValueError.
+    """
+    if strict:
+        return [decode(ta) for ta in travel_addresses]
+
+    uris = []
+    for ta in travel_addresses:
+        try:
+            uris.append(decode(ta))
+        except ValueError:
+            uris.append(None)
+    return uris
+
+
+def is_valid(travel_address: str) -> bool:
+    """
+    Returns True if the travel address is well formed and its checksum matches.
+    """
+    try:
+        decode(travel_address)
+    except ValueError:
+        return False
+    return True
+
+
+def checksum(data: bytes) -> bytes:
+    return sha256(sha256(data).digest()).digest()[:CHECKSUM_SIZE]
+
+
+def b58encode(data: bytes) -> str:
+    """
+    Encodes bytes with the Base58 alphabet, preserving leading zero bytes as 1s.
+    """
+    n = int.from_bytes(data, "big")
+    digits = []
+    while n:
+        n, pair = divmod(n, BASE2)
+        digits.append(PAIRS[pair])
+    digits.reverse()
+
+    # Pairs may add a leading zero digit, which is replaced by the padding of zeros
+    zeros = len(data) - len(data.lstrip(b"\0"))
+    return "1" * zeros + "".join(digits).lstrip("1")
+
+
+def b58decode(encoded: str) -> bytes:
+    """
+    Decodes a Base58 string into bytes, raising a ValueError on invalid characters.
+    """
+    n = 0
+    try:
+        for char in encoded:
+            n = n * 58 + DIGITS[char]
+    except KeyError as e:
+        raise ValueError(f"invalid base58 character {e.args[0]!r}")
+
+    zeros = len(encoded) - len(encoded.lstrip("1"))
+    return b"\0" * zeros + n.to_bytes((n.bit_length() + 7) // 8, "big")
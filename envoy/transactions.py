@@ -2,13 +2,17 @@
 Resource that manages the transactions the Envoy node is managing.
 """
 
-from typing import TextIO
+import os
+
+from typing import BinaryIO, TextIO
+from contextlib import contextmanager
 
 from envoy import client
+from envoy import columnar
+from envoy import download
 from envoy.resource import Resource
 from envoy.exceptions import ReadOnlyEndpoint
 from envoy.records import Record, PaginatedRecords
-from envoy.exceptions import AuthenticationError, ServerError, ClientError
 
 
 CHUNK_SIZE = 1024 * 64
@@ -21,15 +25,23 @@ CHUNK_SIZE = 1024 * 64
 
 class Transaction(Record):
 
-    def __init__(self, data=None, **kwargs):
-        super(Transaction, self).__init__(data, **kwargs)
-        self.secure_envelopes = SecureEnvelopes(self, self.parent.client)
+    __slots__ = ("_secure_envelopes",)
+
+    @property
+    def secure_envelopes(self) -> "SecureEnvelopes":
+        # The nested resource is only created when it is first accessed
+        try:
+            return self._secure_envelopes
+        except AttributeError:
+            self._secure_envelopes = SecureEnvelopes(self, self.parent.client)
+            return self._secure_envelopes
 
     def send(self, envelope) -> dict:
         ep = self._make_endpoint("send")
         return Record(
             self.parent.client.post(envelope, *ep, require_authentication=True),
             parent=self,
+            lazy=True,
         )
 
     def latest_payload(self, params=None) -> dict:
@@ -37,6 +49,7 @@ class Transaction(Record):
         return Record(
             self.parent.client.get(*ep, params=params, require_authentication=True),
             parent=self,
+            lazy=True,
         )
 
     def accept_preview(self, params=None) -> dict:
@@ -44,6 +57,7 @@ class Transaction(Record):
         return Record(
             self.parent.client.get(*ep, params=params, require_authentication=True),
             parent=self,
+            lazy=True,
         )
 
     def accept(self, envelope) -> dict:
@@ -51,6 +65,7 @@ class Transaction(Record):
         return Record(
             self.parent.client.post(envelope, *ep, require_authentication=True),
             parent=self,
+            lazy=True,
         )
 
     def reject(self, rejection) -> dict:
@@ -58,6 +73,7 @@ class Transaction(Record):
         return Record(
             self.parent.client.post(rejection, *ep, require_authentication=True),
             parent=self,
+            lazy=True,
         )
 
     def repair_preview(self, params=None) -> dict:
@@ -65,6 +81,7 @@ class Transaction(Record):
         return Record(
             self.parent.client.get(*ep, params=params, require_authentication=True),
             parent=self,
+            lazy=True,
         )
 
     def repair(self, envelope) -> dict:
@@ -72,6 +89,7 @@ class Transaction(Record):
         return Record(
             self.parent.client.post(envelope, *ep, require_authentication=True),
             parent=self,
+            lazy=True,
         )
 
     def archive(self) -> None:
@@ -91,17 +109,18 @@ class PaginatedTransactions(PaginatedRecords):
     CollectionKey = "transactions"
 
     def cast(self, item):
-        return Transaction(item, parent=self.parent)
+        return Transaction(item, parent=self.parent, lazy=self._lazy)
 
 
 class SecureEnvelope(Record):
-    pass
+
+    __slots__ = ()
 
 
 class PaginatedSecureEnvelopes(PaginatedRecords):
 
     def cast(self, item):
-        return SecureEnvelope(item)
+        return SecureEnvelope(item, lazy=self._lazy)
 
     def _collection_key(self, data):
         if "is_decrypted" in data:
@@ -135,6 +154,7 @@ class Transactions(Resource):
                 require_authentication=True,
             ),
             parent=self,
+            lazy=True,
         )
 
     def send_prepared(self, prepared):
@@ -146,6 +166,7 @@ class Transactions(Resource):
                 require_authentication=True,
             ),
             parent=self,
+            lazy=True,
         )
 
     def archive(self):
@@ -157,6 +178,7 @@ class Transactions(Resource):
                 require_authentication=True,
             ),
             parent=self,
+            lazy=True,
         )
 
     def export(self, f: TextIO, params: dict = None):
@@ -173,31 +195,201 @@ class Transactions(Resource):
         params : dict, default None
             A dictionary of query parameters to attach to the URL.
         """
-        self.client._pre_flight(require_authentication=True)
+        with self._export_reply(params) as reply:
+            content = reply.iter_content(chunk_size=CHUNK_SIZE, decode_unicode=True)
+            for chunk in content:
+                if chunk:
+                    f.write(chunk)
+
+    def export_batches(
+        self,
+        params: dict = None,
+        decimal: bool = False,
+        types: dict = None,
+        block_size: int = columnar.BLOCK_SIZE,
+    ):
+        """
+        Export the transactions as a stream of pyarrow record batches, parsing the CSV
+        file incrementally as it is downloaded. Amounts are floats (or decimals),
+        timestamps are UTC timestamps, and the status is dictionary encoded. Requires
+        the pyarrow package.
+
+        Parameters
+        ----------
+        params : dict, default None
+            A dictionary of query parameters to attach to the URL.
+
+        decimal : bool, default False
+            If True, amounts are parsed as decimals rather than floats.
+
+        types : dict, default None
+            Arrow types of columns that override the types inferred from their names.
+
+        block_size : int, default 1 MiB
+            The number of bytes of CSV data parsed into each record batch.
+        """
+        with self._export_reply(params) as reply:
+            yield from columnar.read_batches(
+                reply.raw, types=types, decimal=decimal, block_size=block_size
+            )
+
+    def export_table(
+        self,
+        f: str | BinaryIO,
+        params: dict = None,
+        format: str = None,
+        compression: str = "snappy",
+        decimal: bool = False,
+        types: dict = None,
+        block_size: int = columnar.BLOCK_SIZE,
+        row_group_size: int = columnar.ROW_GROUP_SIZE,
+    ) -> int:
+        """
+        Export the transactions to a Parquet file or an Arrow IPC stream, converting
+        the CSV file as it is downloaded so that memory use is bounded by the row group
+        size. Returns the number of rows written. Requires the pyarrow package.
+
+        Parameters
+        ----------
+        f : str or binary file-like object
+            The path or file to write the table to.
+
+        format : str, default None
+            Either "parquet" or "arrow"; if None it is inferred from the extension of
+            the path (.parquet, .arrow, or .arrows), defaulting to parquet.
+
+        compression : str, default "snappy"
+            The compression codec of the Parquet columns or Arrow buffers.
+
+        row_group_size : int, default 131072
+            The number of rows in each Parquet row group.
+
+        See export_batches for the other parameters.
+        """
+        with self._export_reply(params) as reply:
+            reader = columnar.read_batches(
+                reply.raw, types=types, decimal=decimal, block_size=block_size
+            )
+            return columnar.write_table(
+                reader,
+                f,
+                format=format,
+                compression=compression,
+                row_group_size=row_group_size,
+            )
+
+    @contextmanager
+    def _export_reply(self, params: dict = None):
+        """
+        Performs a streaming request for the transactions CSV file, yielding the reply
+        once it has been checked for errors.
+        """
+        headers = self.client._pre_flight(require_authentication=True)
         uri = self.client._make_endpoint("transactions", "export")
-        self.client._request_headers["Accept"] = "text/csv"
+        headers["Accept"] = "text/csv"
 
         kwargs = {
             "params": params,
-            "headers": self.client._request_headers,
+            "headers": headers,
             "timeout": self.client.timeout,
             "stream": True,
         }
 
         # Perform a streaming download
-        with self.client.session.get(uri, **kwargs) as reply:
-            if reply.status_code != 200:
-                if reply.status_code == 401 or reply.status_code == 403:
-                    raise AuthenticationError("authentication failed")
-                elif 400 <= reply.status_code < 500:
-                    raise ClientError(reply.content)
-                else:
-                    raise ServerError(reply.content)
+        limit = self.client._limit("GET", ("transactions", "export"))
+        with limit, self.client.session.get(uri, **kwargs) as reply:
+            download.check_reply(reply)
+            # Allow the raw response to be read as a file, which must not be closed by
+            # urllib3 as soon as the whole body has been read.
+            reply.raw.decode_content = True
+            reply.raw.auto_close = False
+            yield reply
+
+    def download(
+        self,
+        f: str | BinaryIO,
+        params: dict = None,
+        compression: str = None,
+        windows: list = None,
+        workers: int = 4,
+        max_attempts: int = 5,
+    ) -> int:
+        """
+        Download the transactions CSV file as raw bytes, optionally compressing it on
+        the fly. Unlike export, the CSV data is not decoded, and the download resumes
+        from the last byte received if the connection is dropped. Returns the number of
+        (uncompressed) bytes written.
 
-            content = reply.iter_content(chunk_size=CHUNK_SIZE, decode_unicode=True)
-            for chunk in content:
-                if chunk:
-                    f.write(chunk)
+        Parameters
+        ----------
+        f : str or binary file-like object
+            The path of the file to write or a file opened in binary mode. A path is
+            written to a temporary file first and only replaced when the download is
+            complete.
+
+        params : dict, default None
+            A dictionary of query parameters to attach to the URL.
+
+        compression : str, default None
+            Either "gzip" or "zstd" (which requires the zstandard package). If None and
+            f is a path, the compression is inferred from its extension (.gz or .zst).
+
+        windows : list of dict, default None
+            Split the export into windows of query parameters (e.g. date ranges) that
+            are merged with params and downloaded in parallel, then written in order
+            with the CSV header only included once.
+
+        workers : int, default 4
+            The maximum number of windows to download at the same time.
+
+        max_attempts : int, default 5
+            The number of times each download is attempted before giving up.
+        """
+        if not isinstance(f, (str, os.PathLike)):
+            return self._download(
+                f, params, compression, windows, workers, max_attempts
+            )
+
+        if compression is None:
+            compression = download.compression_for(f)
+
+        part = f"{f}.part"
+        try:
+            with open(part, "wb") as fobj:
+                written = self._download(
+                    fobj, params, compression, windows, workers, max_attempts
+                )
+        except BaseException:
+            if os.path.exists(part):
+                os.unlink(part)
+            raise
+
+        os.replace(part, f)
+        return written
+
+    def _download(self, f, params, compression, windows, workers, max_attempts):
+        endpoint = ("transactions", "export")
+        with download.compressed_writer(f, compression) as w:
+            if windows is None:
+                return download.download(
+                    self.client,
+                    endpoint,
+                    w,
+                    params=params,
+                    accept="text/csv",
+                    max_attempts=max_attempts,
+                )
+
+            return download.download_windows(
+                self.client,
+                endpoint,
+                w,
+                windows,
+                params=params,
+                accept="text/csv",
+                workers=workers,
+                max_attempts=max_attempts,
+            )
 
 
 class SecureEnvelopes(Resource):
@@ -7,7 +7,8 @@ from envoy.records import Record, PaginatedRecords
 
 
 class User(Record):
-    pass
+
+    __slots__ = ()
 
 
 class PaginatedUsers(PaginatedRecords):
@@ -15,7 +16,7 @@ class PaginatedUsers(PaginatedRecords):
     CollectionKey = "users"
 
     def cast(self, item):
-        return User(item)
+        return User(item, lazy=self._lazy)
 
 
 class Users(Resource):
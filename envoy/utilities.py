@@ -3,6 +3,8 @@ Utilities endpoints provided as helpers by the Envoy node
 """
 
 from envoy import client
+from envoy import traddr
+from envoy import ivms101
 
 
 class Utilities(object):
@@ -14,16 +16,22 @@ class Utilities(object):
 
 class TravelAddresses(object):
     """
-    Accesses the travel address encode and decode utilities on the Envoy node.
+    Encodes and decodes travel addresses. Travel addresses are encoded and decoded
+    locally with envoy.traddr unless remote is True, in which case the travel address
+    utilities on the Envoy node are used. Travel addresses that cannot be decoded
+    locally are sent to the node, which reports why they are invalid.
     """
 
     def __init__(self, client: "client.Client"):
         self.client = client
 
-    def encode(self, rawuri: str) -> str:
+    def encode(self, rawuri: str, remote: bool = False) -> str:
         """
         Encodes a raw URI as a travel address.
         """
+        if not remote:
+            return traddr.encode(rawuri)
+
         data = {"decoded": rawuri}
         reply = self.client.post(
             data,
@@ -34,10 +42,16 @@ class TravelAddresses(object):
         )
         return reply["encoded"]
 
-    def decode(self, travel_address: str) -> str:
+    def decode(self, travel_address: str, remote: bool = False) -> str:
         """
-        Encodes a raw URI as a travel address.
+        Decodes a travel address into a raw URI.
         """
+        if not remote:
+            try:
+                return traddr.decode(travel_address)
+            except ValueError:
+                pass
+
         data = {"encoded": travel_address}
         reply = self.client.post(
             data,
@@ -48,16 +62,51 @@ class TravelAddresses(object):
         )
         return reply["decoded"]
 
+    def encode_many(self, rawuris) -> list[str]:
+        """
+        Encodes each of the raw URIs as a travel address without any requests.
+        """
+        return traddr.encode_many(rawuris)
+
+    def decode_many(self, travel_addresses) -> list[str]:
+        """
+        Decodes each of the travel addresses into a raw URI; only travel addresses that
+        cannot be decoded locally are sent to the node.
+        """
+        travel_addresses = list(travel_addresses)
+        uris = traddr.decode_many(travel_addresses, strict=False)
+        for i, uri in enumerate(uris):
+            if uri is None:
+                uris[i] = self.decode(travel_addresses[i], remote=True)
+        return uris
+
+    def verify(self, rawuris) -> list[tuple]:
+        """
+        Checks the local travel address encoding against the Envoy node for a sample of
+        raw URIs, returning (rawuri, local, remote) for every URI that was encoded or
+        decoded differently (an empty list if the implementations agree). This is only
+        meaningful against a real node; the mock node uses the local codec itself.
+        """
+        mismatches = []
+        for rawuri in rawuris:
+            local = traddr.encode(rawuri)
+            remote = self.encode(rawuri, remote=True)
+            if local != remote or traddr.decode(remote) != rawuri:
+                mismatches.append((rawuri, local, remote))
+        return mismatches
+
 
 class IVMS101Validator(object):
     """
-    Accesses the IVMS101 validator utility on the Envoy node.
+    Accesses the IVMS101 validator utility on the Envoy node. Payloads can also be
+    validated locally with envoy.ivms101 so that only valid payloads are sent to the
+    node for the final cross-protocol normalization.
     """
 
     def __init__(self, client: "client.Client"):
         self.client = client
 
-    def validate(self, data: dict) -> dict:
+    def validate(self, data: dict, check: bool = False) -> dict:
         """Validates an arbitrary JSON payload as IVMS101 and returns the
         cross-protocol compatible JSON formatted IVMS101.
 
@@ -66,11 +115,17 @@ class IVMS101Validator(object):
         data : dict
             the IVMS101 object to validate
 
+        check : bool, default False
+            validate the identity payload locally first, raising a ValidationError
+            without a request to the node if it is invalid
+
         Returns
         -------
         dict
             cross-protocol compatible IVMS101 object
         """
+        if check:
+            ivms101.check(data)
 
         return self.client.post(
             data,
@@ -78,3 +133,19 @@ class IVMS101Validator(object):
             "ivms101-validator",
             require_authentication=True,
         )
+
+    def errors(self, data: dict, kind: str = "identity") -> list[dict]:
+        """
+        Validates an IVMS101 record locally and returns its errors (an empty list if
+        the record is valid) without a request to the node.
+        """
+        return ivms101.validate(data, kind)
+
+    def errors_many(
+        self, records, kind: str = "identity", workers: int = None
+    ) -> list[list[dict]]:
+        """
+        Validates each of the IVMS101 records locally in a pool of processes and
+        returns the errors of each record in the same order as the records.
+        """
+        return ivms101.validate_many(records, kind, workers=workers)
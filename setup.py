@@ -51,6 +51,8 @@ PKG_DESCRIBE = "README.md"
 EXCLUDES = [
     "tests",
     "tests.*",
+    "benchmarks",
+    "benchmarks.*",
     "bin",
     "docs",
     "docs.*",
@@ -129,6 +131,10 @@ if __name__ == "__main__":
             ],
         },
         "install_requires": list(get_requires()),
+        "extras_require": {
+            "aio": ["httpx>=0.27.0"],
+            "arrow": ["pyarrow>=14.0.0"],
+        },
         "python_requires": ">=3.10, <4",
     }
 
@@ -1,5 +1,168 @@
+import jwt
+import json
+import time
 import pytest
 import random
+import threading
+
+from envoy.mock import MockEnvoy
+
+
+# Signing key for JWT tokens issued by tests; the client does not verify signatures
+SIGNING_KEY = "a-test-signing-key-that-is-at-least-32-bytes"
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "mock_envoy(**kwargs): arguments of the MockEnvoy of the mock_envoy fixture",
+    )
+
+
+@pytest.fixture
+def mock_envoy_factory():
+    """
+    Returns a function that starts a MockEnvoy with the specified keyword arguments;
+    every server that it started is stopped when the test completes.
+    """
+    servers = []
+
+    def start(**kwargs):
+        server = MockEnvoy(**kwargs).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
+
+
+@pytest.fixture
+def mock_envoy(request, mock_envoy_factory):
+    """
+    A MockEnvoy server configured by the keyword arguments of the closest mock_envoy
+    marker of the test, e.g. @pytest.mark.mock_envoy(transactions=500).
+    """
+    marker = request.node.get_closest_marker("mock_envoy")
+    return mock_envoy_factory(**(marker.kwargs if marker is not None else {}))
+
+
+@pytest.fixture
+def envoy_client(mock_envoy):
+    """
+    A client that is connected to the mock_envoy server.
+    """
+    with mock_envoy.client() as client:
+        yield client
+
+
+class FakeReply(object):
+    """
+    A response of the FakeSession with the JSON data of the body; by default the
+    body is a status for successful replies and an error for all others.
+    """
+
+    def __init__(self, status_code=200, data=None, headers=None):
+        if data is None:
+            if status_code < 400:
+                data = {"status": "ok"}
+            else:
+                data = {"error": f"status {status_code}"}
+
+        self.status_code = status_code
+        self.headers = {"content-type": "application/json", **(headers or {})}
+        self.content = json.dumps(data).encode("utf-8")
+
+    def close(self):
+        pass
+
+
+class FakeSession(object):
+    """
+    Stands in for the requests session of a client, recording every request. Each
+    request is answered with the next of the replies and then with a successful
+    status once the replies are exhausted; if replies is a function, it is called
+    with the method, uri, and keyword arguments of the request instead. A reply is
+    a FakeReply, a status code, or the JSON data of a successful reply. Requests
+    take delay seconds and the peak number of concurrent requests is recorded.
+    """
+
+    def __init__(self, replies=None, delay=0.0):
+        if callable(replies):
+            self.respond = replies
+        else:
+            replies = list(replies or [])
+            self.respond = lambda *args, **kwargs: (
+                replies.pop(0) if replies else FakeReply()
+            )
+
+        self.delay = delay
+        self.requests = []
+        self.active = self.peak = 0
+        self.lock = threading.Lock()
+
+    @property
+    def calls(self):
+        return len(self.requests)
+
+    def request(self, method, uri, **kwargs):
+        with self.lock:
+            self.requests.append((method, uri, kwargs))
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+
+        try:
+            if self.delay:
+                time.sleep(self.delay)
+            reply = self.respond(method, uri, **kwargs)
+        finally:
+            with self.lock:
+                self.active -= 1
+
+        if isinstance(reply, FakeReply):
+            return reply
+        if isinstance(reply, int):
+            return FakeReply(reply)
+        return FakeReply(data=reply)
+
+
+@pytest.fixture
+def fake_reply():
+    """
+    Returns a function that creates a FakeReply with the specified status code, JSON
+    data, and headers.
+    """
+    return FakeReply
+
+
+@pytest.fixture
+def fake_session():
+    """
+    Returns a function that creates a FakeSession with the specified replies and
+    delay; assign it to the session of a client to answer its requests.
+    """
+    return FakeSession
+
+
+@pytest.fixture(scope="session")
+def make_token():
+    """
+    Returns a function that issues a signed JWT token that expires in lifetime seconds
+    and is valid after delay seconds.
+    """
+
+    def make_token(lifetime=3600, delay=0, **claims):
+        now = int(time.time())
+        claims = {
+            "sub": "test",
+            "iat": now,
+            "nbf": now + delay,
+            "exp": now + lifetime,
+            **claims,
+        }
+        return jwt.encode(claims, SIGNING_KEY, algorithm="HS256")
+
+    return make_token
 
 
 @pytest.fixture(scope="module")
@@ -84,7 +247,7 @@ def transaction(transactions):
 
 @pytest.fixture(scope="module")
 def accounts():
-    [
+    return [
         {
             "id": "01HV6RV08YNR2GH8MEEFCV4NKN",
             "customer_id": "27166869",
@@ -0,0 +1,323 @@
+"""
+Test the envoy.aio package including the AsyncClient and its resources.
+"""
+
+import pytest
+import asyncio
+
+httpx = pytest.importorskip("httpx")
+
+from envoy.aio import AsyncClient, connect  # noqa: E402
+from envoy.aio.transactions import Transaction, PaginatedTransactions  # noqa: E402
+from envoy.retry import get_retry_policy  # noqa: E402
+from envoy.exceptions import (  # noqa: E402
+    AuthenticationError,
+    ClientError,
+    NotFound,
+    ServerError,
+)
+
+
+def mock_client(handler, **kwargs):
+    return AsyncClient(
+        "https://envoy.test",
+        client_id="id",
+        client_secret="secret",
+        transport=httpx.MockTransport(handler),
+        **kwargs,
+    )
+
+
+def test_async_list_transactions(transactions, make_token):
+    def handler(request):
+        if request.url.path == "/v1/authenticate":
+            tokens = {"access_token": make_token(), "refresh_token": make_token()}
+            return httpx.Response(200, json=tokens)
+
+        assert request.headers["Authorization"].startswith("Bearer ")
+        assert request.url.path == "/v1/transactions"
+        assert request.url.params["status"] == "review"
+        return httpx.Response(200, json={"page": {}, "transactions": transactions})
+
+    async def run():
+        async with mock_client(handler) as client:
+            return await client.transactions.list({"status": "review"})
+
+    records = asyncio.run(run())
+    assert isinstance(records, PaginatedTransactions)
+    assert len(records) == len(transactions)
+    for record in records:
+        assert isinstance(record, Transaction)
+
+
+def test_async_single_flight_authentication(make_token):
+    calls = {"authenticate": 0, "status": 0}
+
+    def handler(request):
+        if request.url.path == "/v1/authenticate":
+            calls["authenticate"] += 1
+            tokens = {"access_token": make_token(), "refresh_token": make_token()}
+            return httpx.Response(200, json=tokens)
+
+        calls["status"] += 1
+        return httpx.Response(200, json={"status": "ok"})
+
+    async def run():
+        async with mock_client(handler) as client:
+            gets = [client.get("status") for _ in range(50)]
+            return await asyncio.gather(*gets)
+
+    replies = asyncio.run(run())
+    assert len(replies) == 50
+    assert calls["authenticate"] == 1
+    assert calls["status"] == 50
+
+
+def test_async_retry():
+    statuses = [503, 429]
+
+    def handler(request):
+        if statuses:
+            return httpx.Response(statuses.pop(0), headers={"Retry-After": "0"})
+        return httpx.Response(200, json={"status": "ok"})
+
+    async def run():
+        async with mock_client(handler) as client:
+            client.retry = get_retry_policy(True)
+            return await client.status()
+
+    assert asyncio.run(run()) == {"status": "ok"}
+    assert statuses == []
+
+
+def test_async_travel_addresses(accounts, make_token):
+    requests = []
+
+    def handler(request):
+        requests.append(request.url.path)
+        if request.url.path == "/v1/authenticate":
+            tokens = {"access_token": make_token(), "refresh_token": make_token()}
+            return httpx.Response(200, json=tokens)
+        return httpx.Response(400, json={"error": "invalid travel address"})
+
+    async def run():
+        async with mock_client(handler) as client:
+            ta = client.utilities.travel_addresses
+            uris = await ta.decode_many(a["travel_address"] for a in accounts)
+            assert ta.encode_many(uris) == [a["travel_address"] for a in accounts]
+            assert await ta.encode(uris[0]) == accounts[0]["travel_address"]
+
+            with pytest.raises(ClientError):
+                await ta.decode("tanotvalid")
+
+    # Only the travel address that cannot be decoded locally is sent to the node
+    asyncio.run(run())
+    assert requests == ["/v1/authenticate", "/v1/utilities/travel-address/decode"]
+
+
+def paged_handler(make_token, pages=4, size=3, requests=None):
+    """
+    Returns a handler that serves the transactions in pages of size records, recording
+    the next page token and Authorization header of every request for a page.
+    """
+    tokens = {"access_token": make_token(), "refresh_token": make_token()}
+
+    def handler(request):
+        if request.url.path == "/v1/authenticate":
+            return httpx.Response(200, json=tokens)
+
+        assert request.url.params["status"] == "review"
+        token = request.url.params.get("next_page_token")
+        if requests is not None:
+            requests.append((token, request.headers["Authorization"]))
+
+        i = int(token[4:]) if token else 0
+        nxt = f"page{i+1}" if i + 1 < pages else ""
+        txns = [{"id": str(i * size + j)} for j in range(size)]
+        return httpx.Response(
+            200, json={"page": {"next_page_token": nxt}, "transactions": txns}
+        )
+
+    return handler
+
+
+@pytest.mark.parametrize("prefetch", [True, False])
+def test_async_iter_all(make_token, prefetch):
+    requests = []
+    handler = paged_handler(make_token, requests=requests)
+
+    async def run():
+        records, requested = [], []
+        async with mock_client(handler) as client:
+            pages = client.transactions.iter_all({"status": "review"}, prefetch)
+            async for record in pages:
+                # Let the prefetch task run before the next record is consumed
+                await asyncio.sleep(0)
+                records.append(record)
+                requested.append(len(requests))
+        return records, requested
+
+    records, requested = asyncio.run(run())
+    assert [r["id"] for r in records] == [str(i) for i in range(12)]
+    assert all(isinstance(r, Transaction) for r in records)
+    assert [token for token, _ in requests] == [None, "page1", "page2", "page3"]
+
+    # Each request carries its own authorization header, including the prefetches
+    assert all(auth.startswith("Bearer ") for _, auth in requests)
+
+    if prefetch:
+        # The next page is requested while the records of the current page are read
+        assert requested[:3] == [2, 2, 2]
+    else:
+        assert requested[:3] == [1, 1, 1]
+
+
+def test_async_iter_all_break(make_token):
+    requests = []
+    handler = paged_handler(make_token, requests=requests)
+
+    async def run():
+        async with mock_client(handler) as client:
+            pages = client.transactions.iter_all({"status": "review"})
+            async for record in pages:
+                if record["id"] == "4":
+                    break
+            await pages.aclose()
+
+            await asyncio.sleep(0.01)
+
+    # The prefetch of page2 is cancelled (it may or may not have been sent) and no
+    # further pages are requested after the iterator is closed
+    asyncio.run(run())
+    tokens = [token for token, _ in requests]
+    assert tokens[:2] == [None, "page1"]
+    assert "page3" not in tokens
+
+
+class Node(object):
+    """
+    A mock node that issues access tokens with the specified lifetime and counts the
+    authentication requests that it receives.
+    """
+
+    def __init__(self, make_token, lifetime=3600, reject_refresh=False):
+        self.make_token = make_token
+        self.lifetime = lifetime
+        self.reject_refresh = reject_refresh
+        self.calls = {"authenticate": 0, "reauthenticate": 0}
+
+    def __call__(self, request):
+        endpoint = request.url.path.rsplit("/", 1)[-1]
+        if endpoint in self.calls:
+            self.calls[endpoint] += 1
+            if endpoint == "reauthenticate" and self.reject_refresh:
+                return httpx.Response(401, json={"error": "refresh token expired"})
+
+            tokens = {
+                "access_token": self.make_token(lifetime=self.lifetime),
+                "refresh_token": self.make_token(),
+            }
+            return httpx.Response(200, json=tokens)
+
+        if request.url.path == "/v1/missing":
+            return httpx.Response(404, json={"error": "resource not found"})
+        if request.url.path == "/v1/broken":
+            return httpx.Response(500, json={"error": "internal server error"})
+        return httpx.Response(200, json={"status": "ok"})
+
+
+@pytest.mark.parametrize(
+    "reject_refresh, expected",
+    [
+        (False, {"authenticate": 1, "reauthenticate": 1}),
+        (True, {"authenticate": 2, "reauthenticate": 1}),
+    ],
+)
+def test_async_token_refresh(make_token, reject_refresh, expected):
+    # Access tokens expire immediately so the second request must renew them
+    node = Node(make_token, lifetime=-10, reject_refresh=reject_refresh)
+
+    async def run():
+        async with mock_client(node) as client:
+            await client.get("transactions")
+            await client.get("transactions")
+
+    asyncio.run(run())
+    assert node.calls == expected
+
+
+def test_async_errors(make_token):
+    async def run():
+        async with mock_client(Node(make_token)) as client:
+            with pytest.raises(NotFound):
+                await client.get("missing")
+            with pytest.raises(ServerError):
+                await client.get("broken")
+
+        # The node rejects the api keys of the client
+        unauthorized = httpx.Response(401, json={"error": "invalid credentials"})
+        async with mock_client(lambda request: unauthorized) as client:
+            with pytest.raises(AuthenticationError):
+                await client.get("transactions")
+
+    asyncio.run(run())
+
+
+def test_async_connect(make_token):
+    node = Node(make_token)
+
+    async def run():
+        client = await connect(
+            "https://envoy.test",
+            client_id="id",
+            client_secret="secret",
+            transport=httpx.MockTransport(node),
+            max_connections=4,
+        )
+        async with client:
+            assert client.is_authenticated()
+            return await client.status()
+
+    assert asyncio.run(run()) == {"status": "ok"}
+    assert node.calls["authenticate"] == 1
+
+
+def unauthorized(request):
+    return httpx.Response(401, json={"error": "invalid credentials"})
+
+
+def unreachable(request):
+    raise httpx.ConnectError("connection refused", request=request)
+
+
+@pytest.mark.parametrize(
+    "handler, exception",
+    [
+        (unauthorized, AuthenticationError),
+        (unreachable, httpx.ConnectError),
+    ],
+)
+def test_async_connect_failure(monkeypatch, handler, exception):
+    # The client is closed if it cannot be authorized when connecting
+    closed = []
+    close = AsyncClient.close
+
+    async def track(self):
+        closed.append(self)
+        await close(self)
+
+    monkeypatch.setattr(AsyncClient, "close", track)
+
+    async def run():
+        await connect(
+            "https://envoy.test",
+            client_id="id",
+            client_secret="secret",
+            transport=httpx.MockTransport(handler),
+        )
+
+    with pytest.raises(exception):
+        asyncio.run(run())
+
+    assert len(closed) == 1
+    assert closed[0].session.is_closed
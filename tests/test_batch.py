@@ -0,0 +1,72 @@
+"""
+Tests for the envoy.batch module
+"""
+
+import time
+import pytest
+import threading
+
+from envoy.batch import imap
+
+
+class TestImap(object):
+
+    def test_ordered(self):
+        def slow(i):
+            time.sleep(0.001 * (10 - i))
+            return i * 2
+
+        results = list(imap(slow, range(10), workers=4))
+        assert [r.index for r in results] == list(range(10))
+        assert [r.value for r in results] == [i * 2 for i in range(10)]
+        assert all(r.ok for r in results)
+
+    def test_unordered(self):
+        results = list(imap(lambda i: i, range(20), workers=4, ordered=False))
+        assert sorted(r.value for r in results) == list(range(20))
+
+    @pytest.mark.parametrize("ordered", [True, False])
+    def test_errors(self, ordered):
+        def fail(i):
+            if i % 3 == 0:
+                raise ValueError(f"bad item {i}")
+            return i
+
+        results = sorted(
+            imap(fail, range(9), workers=3, ordered=ordered), key=lambda r: r.index
+        )
+        assert len(results) == 9
+
+        failed = [r for r in results if not r.ok]
+        assert [r.item for r in failed] == [0, 3, 6]
+        assert all(isinstance(r.error, ValueError) and r.value is None for r in failed)
+
+    @pytest.mark.parametrize("ordered", [True, False])
+    def test_bounded(self, ordered):
+        lock = threading.Lock()
+        state = {"active": 0, "peak": 0, "consumed": 0}
+
+        def items():
+            for i in range(50):
+                state["consumed"] += 1
+                yield i
+
+        def work(i):
+            with lock:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            time.sleep(0.001)
+            with lock:
+                state["active"] -= 1
+            return i
+
+        results = imap(work, items(), workers=5, ordered=ordered)
+        next(results)
+        assert state["consumed"] <= 6
+
+        assert len(list(results)) == 49
+        assert state["peak"] <= 5
+
+    def test_workers(self):
+        with pytest.raises(ValueError):
+            list(imap(lambda i: i, range(3), workers=0))
@@ -0,0 +1,232 @@
+"""
+Tests for the TTL cache in envoy.cache and cached counterparty lookups
+"""
+
+import pytest
+
+from envoy import cache
+from envoy.cache import TTLCache, ResponseCache, get_response_cache
+from envoy.counterparties import Counterparty
+
+
+class FakeClock(object):
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache.time, "monotonic", clock)
+    return clock
+
+
+class TestTTLCache(object):
+
+    def test_get_set(self):
+        c = TTLCache(maxsize=4)
+        assert c.get("a") is None
+        c.set("a", 1)
+        c.set("b", None)
+        assert c.get("a") == 1
+        assert c.get("b", "default") is None
+        assert "b" in c
+        assert c.stats()["hits"] == 2
+        assert c.stats()["misses"] == 1
+
+    def test_lru_eviction(self):
+        c = TTLCache(maxsize=2)
+        c.set("a", 1)
+        c.set("b", 2)
+        c.get("a")
+        c.set("c", 3)
+
+        assert "a" in c and "c" in c
+        assert "b" not in c
+        assert c.stats()["evictions"] == 1
+        assert len(c) == 2
+
+    def test_expiration(self, clock):
+        c = TTLCache(ttl=10)
+        c.set("a", 1)
+        clock.now += 9
+        assert c.get("a") == 1
+
+        clock.now += 2
+        assert "a" not in c
+        assert c.get("a") is None
+        assert c.stats()["expirations"] == 1
+        assert len(c) == 0
+
+    def test_no_ttl(self, clock):
+        c = TTLCache(ttl=None)
+        c.set("a", 1)
+        clock.now += 1e9
+        assert c.get("a") == 1
+
+    def test_get_or_set(self):
+        c = TTLCache()
+        calls = []
+        assert c.get_or_set("a", lambda: calls.append(1) or "x") == "x"
+        assert c.get_or_set("a", lambda: calls.append(1) or "y") == "x"
+        assert calls == [1]
+
+        def fail():
+            raise ValueError("not cached")
+
+        with pytest.raises(ValueError):
+            c.get_or_set("b", fail)
+        assert "b" not in c
+
+    def test_invalidate(self):
+        c = TTLCache()
+        c.set("a", 1)
+        c.set("b", 2)
+        assert c.invalidate("a")
+        assert not c.invalidate("a")
+        c.clear()
+        assert len(c) == 0
+
+    def test_maxsize(self):
+        with pytest.raises(ValueError):
+            TTLCache(maxsize=0)
+
+
+@pytest.mark.mock_envoy(transactions=10, accounts=5, counterparties=20)
+class TestCounterpartiesCache(object):
+
+    @pytest.fixture(autouse=True)
+    def cache(self, envoy_client):
+        envoy_client.counterparties.cache = TTLCache(maxsize=64, ttl=60)
+
+    def test_cached_detail(self, mock_envoy, envoy_client):
+        cpid = next(iter(mock_envoy.data["counterparties"]))
+        first = envoy_client.counterparties.detail(cpid)
+        requests = mock_envoy.requests
+
+        second = envoy_client.counterparties.detail(cpid)
+        assert isinstance(second, Counterparty)
+        assert second.parent is envoy_client.counterparties
+        assert dict(second) == dict(first)
+        assert mock_envoy.requests == requests
+        assert envoy_client.counterparties.cache.stats()["hits"] == 1
+
+    def test_cached_search(self, mock_envoy, envoy_client):
+        first = envoy_client.counterparties.search("VASP 1", limit=1)
+        requests = mock_envoy.requests
+        second = envoy_client.counterparties.search("VASP 1", limit=1)
+        assert second["id"] == first["id"]
+        assert mock_envoy.requests == requests
+
+        envoy_client.counterparties.search("VASP 1", limit=5)
+        assert mock_envoy.requests == requests + 1
+
+    def test_cached_copies(self, mock_envoy, envoy_client):
+        # Modifying the data of a record must not modify the cached reply
+        cpid = next(iter(mock_envoy.data["counterparties"]))
+        record = envoy_client.counterparties.detail(cpid)
+        name = record["name"]
+        record.data["name"] = "Modified VASP"
+        assert envoy_client.counterparties.detail(cpid)["name"] == name
+
+        results = envoy_client.counterparties.search("VASP", limit=5)
+        ids = [result["id"] for result in results]
+        results[0].data["id"] = "modified"
+        results = envoy_client.counterparties.search("VASP", limit=5)
+        assert [result["id"] for result in results] == ids
+        assert envoy_client.counterparties.cache.stats()["hits"] == 2
+
+    def test_invalidate_on_write(self, mock_envoy, envoy_client):
+        cpid = next(iter(mock_envoy.data["counterparties"]))
+        record = envoy_client.counterparties.detail(cpid)
+        envoy_client.counterparties.search("VASP")
+
+        data = dict(record, name="Renamed VASP")
+        envoy_client.counterparties.update(data)
+        assert len(envoy_client.counterparties.cache) == 0
+        assert envoy_client.counterparties.detail(cpid)["name"] == "Renamed VASP"
+
+    def test_disabled(self, mock_envoy, envoy_client):
+        envoy_client.counterparties.cache = None
+        cpid = next(iter(mock_envoy.data["counterparties"]))
+        envoy_client.counterparties.detail(cpid)
+        requests = mock_envoy.requests
+        envoy_client.counterparties.detail(cpid)
+        assert mock_envoy.requests == requests + 1
+
+
+@pytest.mark.mock_envoy(transactions=10, accounts=5, counterparties=5)
+class TestResponseCache(object):
+
+    @pytest.fixture(autouse=True)
+    def cache(self, envoy_client):
+        envoy_client.response_cache = ResponseCache()
+
+    def test_get_response_cache(self):
+        assert get_response_cache(None) is None
+        assert get_response_cache(False) is None
+        assert isinstance(get_response_cache(True), ResponseCache)
+        assert get_response_cache(12)._cache.maxsize == 12
+
+        cache = ResponseCache()
+        assert get_response_cache(cache) is cache
+
+        with pytest.raises(TypeError):
+            get_response_cache("yes")
+
+    def test_conditional_get(self, mock_envoy, envoy_client):
+        txid = next(iter(mock_envoy.data["transactions"]))
+        first = envoy_client.transactions.detail(txid)
+        assert mock_envoy.not_modified == 0
+        assert len(envoy_client.response_cache) == 1
+
+        second = envoy_client.transactions.detail(txid)
+        assert mock_envoy.not_modified == 1
+        assert dict(second) == dict(first)
+        assert envoy_client.response_cache.stats()["not_modified"] == 1
+
+        # A changed resource is returned in full and replaces the cached response
+        mock_envoy.data["transactions"][txid]["status"] = "rejected"
+        third = envoy_client.transactions.detail(txid)
+        assert third["status"] == "rejected"
+        assert mock_envoy.not_modified == 1
+
+        assert envoy_client.transactions.detail(txid)["status"] == "rejected"
+        assert mock_envoy.not_modified == 2
+
+    def test_cached_copies(self, mock_envoy, envoy_client):
+        # Modifying returned data must not modify the cached response
+        txid = next(iter(mock_envoy.data["transactions"]))
+        status = mock_envoy.data["transactions"][txid]["status"]
+        envoy_client.transactions.detail(txid).data["status"] = "modified"
+
+        revalidated = envoy_client.transactions.detail(txid)
+        assert revalidated["status"] == status
+        revalidated.data["status"] = "modified"
+
+        assert envoy_client.transactions.detail(txid)["status"] == status
+        assert mock_envoy.not_modified == 2
+
+    def test_params(self, mock_envoy, envoy_client):
+        envoy_client.transactions.list({"status": "review"})
+        envoy_client.transactions.list({"status": "draft"})
+        assert len(envoy_client.response_cache) == 2
+
+        envoy_client.transactions.list({"status": "review"})
+        assert mock_envoy.not_modified == 1
+
+    def test_status(self, mock_envoy, envoy_client):
+        envoy_client.status()
+        assert envoy_client.status()["status"] == "ok"
+        assert mock_envoy.not_modified == 1
+
+    def test_disabled(self, mock_envoy):
+        with mock_envoy.client() as envoy_client:
+            assert envoy_client.response_cache is None
+            envoy_client.status()
+            envoy_client.status()
+        assert mock_envoy.not_modified == 0
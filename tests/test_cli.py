@@ -0,0 +1,113 @@
+"""
+Tests for the envoy command line interface against the mock Envoy node
+"""
+
+import sys
+import pytest
+
+from envoy.cli import cleanup
+from envoy.__main__ import main
+
+
+pytestmark = pytest.mark.mock_envoy(transactions=600, accounts=5, counterparties=3)
+
+
+@pytest.fixture
+def envoy(mock_envoy, monkeypatch):
+    """
+    Returns a function that runs the envoy CLI with the specified command arguments
+    against the mock Envoy node.
+    """
+
+    def run(*args):
+        argv = [
+            "envoy",
+            "-u",
+            mock_envoy.url,
+            "-c",
+            mock_envoy.client_id,
+            "-s",
+            mock_envoy.client_secret,
+            *args,
+        ]
+        monkeypatch.setattr(sys, "argv", argv)
+        main()
+
+    return run
+
+
+def selected(mock_envoy, name="VASP 1", status="review"):
+    return [
+        tx
+        for tx in mock_envoy.data["transactions"].values()
+        if tx["counterparty"] == name and tx["status"] == status
+    ]
+
+
+class TestCleanup(object):
+
+    def test_archive(self, envoy, mock_envoy, capsys):
+        txns = selected(mock_envoy)
+        assert len(txns) > 1
+
+        envoy("cleanup", "-c", "VASP 1", "--workers", "4", "--yes")
+        assert all(tx["archived"] for tx in txns)
+        assert sum(
+            tx["archived"] for tx in mock_envoy.data["transactions"].values()
+        ) == len(txns)
+
+        err = capsys.readouterr().err
+        assert f"archived {len(txns)}/{len(txns)} transactions (0 failed" in err
+        assert "tx/s)" in err
+
+    def test_delete(self, envoy, mock_envoy):
+        txns = selected(mock_envoy, status="pending")
+        cpid = txns[0]["counterparty_id"]
+
+        envoy("cleanup", "-c", cpid, "-s", "pending", "--delete", "--yes")
+        remaining = mock_envoy.data["transactions"]
+        assert not any(tx["id"] in remaining for tx in txns)
+        assert len(remaining) == 600 - len(txns)
+
+    def test_dry_run(self, envoy, mock_envoy, capsys):
+        txns = selected(mock_envoy)
+        envoy("cleanup", "-c", "VASP 1", "--dry-run", "--yes")
+
+        out = capsys.readouterr().out
+        assert out.count("dry run: archive transfer") == len(txns)
+        assert not any(tx["archived"] for tx in txns)
+
+    def test_failures(self, envoy, mock_envoy, monkeypatch, capsys):
+        # Inject errors only once the transactions have been listed
+        original = cleanup.imap
+
+        def imap(*args, **kwargs):
+            mock_envoy.error_rate = 0.5
+            return original(*args, **kwargs)
+
+        monkeypatch.setattr(cleanup, "imap", imap)
+        monkeypatch.setattr(cleanup, "PROGRESS_INTERVAL", 0.0)
+        txns = selected(mock_envoy)
+
+        with pytest.raises(SystemExit):
+            envoy("cleanup", "-c", "VASP 1", "-w", "8", "-y")
+
+        err = capsys.readouterr().err
+        failed = mock_envoy.errors
+        assert 0 < failed < len(txns)
+        assert f"{failed} of {len(txns)} transactions could not be archived" in err
+        assert err.count("could not archive transfer") == failed
+        assert sum(not tx["archived"] for tx in txns) == failed
+
+    @pytest.mark.parametrize(
+        "args, message",
+        [
+            (("-c", "VASP 1", "-w", "0", "-y"), "at least one worker is required"),
+            (("-c", "No Such VASP", "-y"), "counterparty 'No Such VASP' not found"),
+            (("-c", "01" + "0" * 24, "-y"), "not found"),
+        ],
+    )
+    def test_errors(self, envoy, capsys, args, message):
+        with pytest.raises(SystemExit):
+            envoy("cleanup", *args)
+        assert message in capsys.readouterr().err
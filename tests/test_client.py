@@ -2,9 +2,12 @@
 Test the envoy.client module including the Client class and related helper functions.
 """
 
+import time
+import logging
 import pytest
 
 from envoy.client import *
+from concurrent.futures import ThreadPoolExecutor
 
 
 @pytest.mark.parametrize(
@@ -60,3 +63,94 @@ def test_parse_url_host(arg, expected):
 def test_parse_content_type(mime, expected):
     actual, _ = parse_content_type(mime)
     assert actual == expected
+
+
+def test_request_headers():
+    """
+    The headers of each request are local to the request so that concurrent requests,
+    e.g. the prefetch of the next page of a list, do not share them.
+    """
+    client = Client("https://envoy.test")
+    headers = client._pre_flight(require_authentication=False)
+    headers["Accept"] = "text/csv"
+
+    assert client._pre_flight(require_authentication=False) is not headers
+    assert client._pre_flight(require_authentication=False)["Accept"] == ACCEPT
+
+
+def test_single_flight_authentication(make_token, fake_session):
+    """
+    Many threads sharing a client should only authenticate once.
+    """
+    token = make_token()
+
+    def respond(method, uri, **kwargs):
+        if method == "POST":
+            time.sleep(0.05)
+            return {"access_token": token, "refresh_token": token}
+        return {"status": "ok"}
+
+    client = Client("https://envoy.test", client_id="id", client_secret="secret")
+    client.session = fake_session(respond)
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        replies = list(executor.map(lambda _: client.get("status"), range(64)))
+
+    assert len(replies) == 64
+    requests = client.session.requests
+    assert [method for method, _, _ in requests].count("POST") == 1
+    assert {
+        kwargs["headers"]["Authorization"]
+        for method, _, kwargs in requests
+        if method == "GET"
+    } == {f"Bearer {token}"}
+
+
+def test_credential_store_reuse(tmp_path, make_token, fake_session):
+    """
+    Clients sharing a credential store should reuse each other's tokens.
+    """
+    access, refresh = make_token(), make_token()
+    tokens = {"access_token": access, "refresh_token": refresh}
+
+    path = str(tmp_path / "credentials.json")
+    for i in range(3):
+        client = Client(
+            "https://envoy.test",
+            client_id="id",
+            client_secret="secret",
+            credential_store=path,
+        )
+        client.session = fake_session(lambda *args, **kwargs: tokens)
+
+        headers = client._pre_flight(require_authentication=True)
+        assert headers["Authorization"] == f"Bearer {access}"
+        assert client.session.calls == (1 if i == 0 else 0)
+
+
+@pytest.mark.parametrize("log_payloads", [True, False])
+def test_debug_logging(caplog, log_payloads, fake_session):
+    """
+    Requests should only be formatted for logging when debug logging is enabled.
+    """
+
+    class Payload(dict):
+        def __repr__(self):
+            raise AssertionError("payload should not be formatted")
+
+    client = Client("https://envoy.test", log_payloads=log_payloads)
+    client.session = fake_session()
+
+    with caplog.at_level(logging.INFO, logger="envoy"):
+        client.post(Payload(secret="sauce"), "status", require_authentication=False)
+    assert len(caplog.records) == 0
+
+    if log_payloads:
+        return
+
+    with caplog.at_level(logging.DEBUG, logger="envoy"):
+        client.post(Payload(secret="sauce"), "status", require_authentication=False)
+
+    messages = [record.getMessage() for record in caplog.records]
+    assert "with 18 byte payload" in messages[0]
+    assert "200 response with 16 byte payload" in messages[1]
@@ -0,0 +1,63 @@
+"""
+Tests for the envoy.codec module
+"""
+
+import pytest
+
+from envoy.codec import CODECS, JSONCodec, get_codec
+from envoy.records import Record, RecordList
+
+
+def installed_codecs():
+    codecs = []
+    for name, cls in CODECS.items():
+        try:
+            cls()
+        except ImportError:
+            continue
+        codecs.append(name)
+    return codecs
+
+
+@pytest.fixture(params=installed_codecs())
+def codec(request):
+    return get_codec(request.param)
+
+
+def test_codec_roundtrip(codec, transactions):
+    data = {"transactions": transactions, "name": "Zoë", "count": 4, "ok": True}
+    encoded = codec.dumps(data)
+
+    assert isinstance(encoded, bytes)
+    assert codec.loads(encoded) == data
+    assert codec.loads(encoded.decode("utf-8")) == data
+
+
+def test_codec_records(codec, transaction):
+    data = {"record": Record(transaction), "list": RecordList([transaction])}
+    assert codec.loads(codec.dumps(data)) == {
+        "record": transaction,
+        "list": [transaction],
+    }
+    assert codec.loads(codec.dumps(Record(transaction))) == transaction
+
+
+def test_codec_decode_error(codec):
+    with pytest.raises(ValueError):
+        codec.loads(b"{not json")
+
+
+def test_codec_encode_error(codec):
+    with pytest.raises(TypeError):
+        codec.dumps({"object": object()})
+
+
+def test_get_codec():
+    assert get_codec().name == installed_codecs()[0]
+    assert get_codec("json").name == "json"
+
+    codec = JSONCodec()
+    assert get_codec(codec) is codec
+
+    with pytest.raises(ValueError):
+        get_codec("notacodec")
@@ -0,0 +1,94 @@
+"""
+Tests for streaming columnar exports in envoy.columnar
+"""
+
+import io
+import csv
+import pytest
+
+from decimal import Decimal
+from envoy import columnar
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+pytestmark = pytest.mark.mock_envoy(transactions=600, accounts=20, counterparties=10)
+
+
+def expected_rows(mock_envoy, params=None):
+    text = mock_envoy.export_csv(params).decode("utf-8")
+    return list(csv.DictReader(io.StringIO(text)))
+
+
+class TestColumnar(object):
+
+    def test_column_types(self):
+        types = columnar.column_types(
+            ["id", "amount", "created", "sent_at", "envelope_count", "status"]
+        )
+        assert types["id"] == pa.string()
+        assert types["amount"] == pa.float64()
+        assert types["created"] == pa.timestamp("us", tz="UTC")
+        assert types["sent_at"] == pa.timestamp("us", tz="UTC")
+        assert types["envelope_count"] == pa.int64()
+        assert pa.types.is_dictionary(types["status"])
+
+        types = columnar.column_types(["amount"], decimal=True)
+        assert pa.types.is_decimal(types["amount"])
+
+    def test_export_batches(self, mock_envoy, envoy_client):
+        batches = list(envoy_client.transactions.export_batches(block_size=16 * 1024))
+        assert len(batches) > 1
+
+        table = pa.Table.from_batches(batches)
+        expected = expected_rows(mock_envoy)
+        assert table.num_rows == len(expected)
+        assert table.column_names == list(expected[0].keys())
+        assert pa.types.is_dictionary(table.schema.field("status").type)
+        assert pa.types.is_timestamp(table.schema.field("created").type)
+
+        rows = table.to_pylist()
+        for row, exp in zip(rows, expected):
+            assert row["id"] == exp["id"]
+            assert row["status"] == exp["status"]
+            assert row["amount"] == float(exp["amount"])
+            assert row["envelope_count"] == int(exp["envelope_count"])
+            assert row["created"].isoformat().replace("+00:00", "Z") == exp["created"]
+
+    def test_export_parquet(self, mock_envoy, envoy_client, tmp_path):
+        path = tmp_path / "transactions.parquet"
+        rows = envoy_client.transactions.export_table(
+            path, decimal=True, block_size=16 * 1024, row_group_size=250
+        )
+        expected = expected_rows(mock_envoy)
+        assert rows == len(expected)
+
+        meta = pq.ParquetFile(path).metadata
+        assert meta.num_rows == rows
+        assert meta.num_row_groups > 1
+
+        table = pq.read_table(path)
+        assert table.column("amount").to_pylist()[0] == Decimal(expected[0]["amount"])
+
+    def test_export_arrow(self, mock_envoy, envoy_client):
+        f = io.BytesIO()
+        params = {"status": "review"}
+        rows = envoy_client.transactions.export_table(
+            f, params=params, format="arrow", block_size=4096
+        )
+        expected = expected_rows(mock_envoy, params)
+        assert rows == len(expected)
+
+        table = pa.ipc.open_stream(f.getvalue()).read_all()
+        assert table.column("id").to_pylist() == [r["id"] for r in expected]
+        assert set(table.column("status").to_pylist()) == {"review"}
+
+    def test_empty(self):
+        reader = columnar.read_batches(io.BytesIO(b""))
+        assert reader.read_all().num_rows == 0
+
+    def test_unknown_format(self):
+        reader = columnar.read_batches(io.BytesIO(b"id\n1\n"))
+        with pytest.raises(ValueError):
+            columnar.write_table(reader, io.BytesIO(), format="orc")
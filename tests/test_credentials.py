@@ -0,0 +1,106 @@
+"""
+Tests for the envoy.credentials module
+"""
+
+import os
+import time
+import pytest
+
+from envoy.credentials import Credentials, CredentialStore, Token
+
+
+def test_token_claims(make_token):
+    token = Token(make_token(lifetime=3600))
+    claims = token.claims()
+
+    assert token.exp == claims["exp"]
+    assert token.nbf == claims["nbf"]
+    assert not token.is_expired()
+    assert not token.is_not_before()
+    assert 3590 < token.expires_in() <= 3600
+
+
+def test_token_expired(make_token):
+    token = Token(make_token(lifetime=-10))
+    assert token.is_expired()
+    assert token.expires_in() < 0
+
+
+def test_token_not_before(make_token):
+    token = Token(make_token(delay=600))
+    assert token.is_not_before()
+
+
+@pytest.mark.parametrize("leeway,expired", [(0.0, False), (5.0, False), (60.0, True)])
+def test_token_leeway(make_token, leeway, expired):
+    token = Token(make_token(lifetime=30), leeway=leeway)
+    assert token.is_expired() is expired
+
+
+def test_token_leeway_not_before(make_token):
+    assert not Token(make_token(delay=-5)).is_not_before()
+    assert Token(make_token(delay=-5), leeway=30.0).is_not_before()
+
+
+def test_token_without_claims():
+    token = Token("")
+    assert token.is_expired()
+    assert token.is_not_before()
+    assert token.expires_in() is None
+
+
+def test_token_monotonic_clock(make_token, monkeypatch):
+    token = Token(make_token(lifetime=60))
+
+    # Jumping the wall clock forward does not expire the token
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 3600)
+    assert not token.is_expired()
+
+
+def test_credentials(make_token):
+    creds = Credentials(make_token(lifetime=60), make_token(lifetime=120, delay=30))
+    assert creds.is_authenticated()
+    assert not creds.is_refreshable()
+
+    creds = Credentials(make_token(lifetime=-1), make_token(lifetime=120, delay=-30))
+    assert not creds.is_authenticated()
+    assert creds.is_refreshable()
+
+
+def test_credential_store(tmp_path, make_token):
+    store = CredentialStore(str(tmp_path / "cache" / "credentials.json"))
+    assert store.load("envoy.test", "client") is None
+
+    access, refresh = make_token(lifetime=60), make_token(lifetime=120)
+    store.save("envoy.test", "client", Credentials(access, refresh))
+    assert os.stat(store.path).st_mode & 0o777 == 0o600
+
+    creds = store.load("envoy.test", "client")
+    assert str(creds.access_token) == access
+    assert str(creds.refresh_token) == refresh
+    assert store.load("envoy.test", "other") is None
+    assert store.load("other.test", "client") is None
+
+    store.clear("envoy.test", "client")
+    assert store.load("envoy.test", "client") is None
+
+
+def test_credential_store_prunes_expired(tmp_path, make_token):
+    store = CredentialStore(str(tmp_path / "credentials.json"))
+    expired = Credentials(make_token(lifetime=-60), make_token(lifetime=-30))
+    valid = Credentials(make_token(lifetime=60), make_token(lifetime=120))
+
+    store.save("envoy.test", "expired", expired)
+    assert store.load("envoy.test", "expired") is None
+
+    store.save("envoy.test", "a", valid)
+    store.save("envoy.test", "b", valid)
+    assert store.load("envoy.test", "a") is not None
+    assert store.load("envoy.test", "b") is not None
+
+
+def test_credential_store_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "creds.json")
+    monkeypatch.setenv("ENVOY_CREDENTIALS_CACHE", path)
+    assert CredentialStore().path == path
@@ -0,0 +1,180 @@
+"""
+Tests for resumable raw downloads of the transactions export in envoy.download
+"""
+
+import io
+import sys
+import time
+import gzip
+import pytest
+
+from envoy import download
+from envoy.mock import TRANSACTION_STATUSES
+from envoy.exceptions import ClientError
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+pytestmark = pytest.mark.mock_envoy(transactions=500, accounts=20, counterparties=10)
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(download, "RESUME_BACKOFF", 0.0)
+
+
+class TestDownload(object):
+
+    def test_download(self, mock_envoy, envoy_client):
+        f = io.BytesIO()
+        assert envoy_client.transactions.download(f) == len(mock_envoy.export_csv())
+        assert f.getvalue() == mock_envoy.export_csv()
+
+    def test_resume(self, mock_envoy, envoy_client):
+        mock_envoy.export_failures = 2
+        f = io.BytesIO()
+        envoy_client.transactions.download(f)
+        assert f.getvalue() == mock_envoy.export_csv()
+        assert mock_envoy.export_failures == 0
+
+    def test_resume_stall(self, mock_envoy, envoy_client):
+        # The node stops sending the export halfway through until the read times out
+        envoy_client.timeout = 0.2
+        mock_envoy.export_stalls = 1
+        f = io.BytesIO()
+        envoy_client.transactions.download(f)
+        assert f.getvalue() == mock_envoy.export_csv()
+        assert mock_envoy.export_stalls == 0
+
+    def test_resume_timeout(self, mock_envoy, envoy_client, monkeypatch):
+        # The node does not respond to the resumed request within the timeout
+        session, ranges = envoy_client.session, []
+        get = session.get
+
+        def slow(uri, headers=None, **kwargs):
+            ranges.append(headers.get("Range"))
+            if len(ranges) == 2:
+                raise download.Timeout("read timed out")
+            return get(uri, headers=headers, **kwargs)
+
+        monkeypatch.setattr(session, "get", slow)
+        monkeypatch.setattr(download, "CHUNK_SIZE", 1024)
+        mock_envoy.export_failures = 1
+
+        f = io.BytesIO()
+        envoy_client.transactions.download(f)
+        assert f.getvalue() == mock_envoy.export_csv()
+        assert len(ranges) == 3 and ranges[1] == ranges[2] is not None
+
+    @pytest.mark.parametrize("offset", [-100, 100])
+    def test_resume_offset(self, mock_envoy, envoy_client, monkeypatch, offset):
+        # The node resumes the download at a different byte than was requested
+        session, ranges = envoy_client.session, []
+        get = session.get
+
+        def misaligned(uri, headers=None, **kwargs):
+            if "Range" in headers:
+                start = int(headers["Range"][6:-1]) + offset
+                headers["Range"] = f"bytes={start}-"
+            ranges.append(headers.get("Range"))
+            return get(uri, headers=headers, **kwargs)
+
+        monkeypatch.setattr(session, "get", misaligned)
+        monkeypatch.setattr(download, "CHUNK_SIZE", 1024)
+        mock_envoy.export_failures = 1
+
+        f = io.BytesIO()
+        envoy_client.transactions.download(f)
+        assert f.getvalue() == mock_envoy.export_csv()
+
+        # Overlapping ranges are skipped, gaps restart the download without a range
+        if offset < 0:
+            assert len(ranges) == 2 and ranges[1] is not None
+        else:
+            assert len(ranges) == 3 and ranges[2] is None
+
+    def test_content_range_start(self):
+        assert download.content_range_start("bytes 100-199/200") == 100
+        assert download.content_range_start("bytes 0-9/*") == 0
+        assert download.content_range_start("bytes */200") is None
+        assert download.content_range_start("items 1-2/3") is None
+        assert download.content_range_start(None) is None
+
+    def test_max_attempts(self, mock_envoy, envoy_client):
+        mock_envoy.export_failures = 3
+        with pytest.raises(download.ChunkedEncodingError):
+            envoy_client.transactions.download(io.BytesIO(), max_attempts=2)
+
+    def test_error(self, envoy_client):
+        with pytest.raises(ClientError):
+            download.download(envoy_client, ("missing", "export"), io.BytesIO())
+
+    def test_gzip(self, mock_envoy, envoy_client, tmp_path):
+        path = tmp_path / "transactions.csv.gz"
+        envoy_client.transactions.download(str(path))
+        assert gzip.decompress(path.read_bytes()) == mock_envoy.export_csv()
+        assert not (tmp_path / "transactions.csv.gz.part").exists()
+
+    @pytest.mark.skipif(zstandard is None, reason="requires zstandard")
+    def test_zstd(self, mock_envoy, envoy_client, tmp_path):
+        path = tmp_path / "transactions.csv.zst"
+        mock_envoy.export_failures = 1
+        envoy_client.transactions.download(path)
+        data = zstandard.ZstdDecompressor().stream_reader(path.read_bytes()).read()
+        assert data == mock_envoy.export_csv()
+
+    def test_windows(self, mock_envoy, envoy_client, tmp_path):
+        path = tmp_path / "transactions.csv"
+        windows = [{"status": status} for status in TRANSACTION_STATUSES]
+        mock_envoy.export_failures = 2
+        envoy_client.transactions.download(path, windows=windows, workers=3)
+
+        lines = path.read_bytes().splitlines(keepends=True)
+        header = mock_envoy.export_csv().splitlines(keepends=True)[0]
+        assert lines[0] == header
+        assert lines.count(header) == 1
+
+        expected = [header]
+        for window in windows:
+            expected.extend(mock_envoy.export_csv(window).splitlines(keepends=True)[1:])
+        assert lines == expected
+        assert sorted(lines[1:]) == sorted(mock_envoy.export_csv().splitlines(True)[1:])
+        assert list(tmp_path.iterdir()) == [path]
+
+    def test_windows_failure(self, envoy_client, tmp_path, monkeypatch):
+        fetch, mkstemp = download.download, download.tempfile.mkstemp
+
+        def failing(client, endpoint, f, params=None, **kwargs):
+            if params["status"] == "draft":
+                raise ClientError("window failed")
+            return fetch(client, endpoint, f, params=params, **kwargs)
+
+        def slow_mkstemp(*args, **kwargs):
+            # The other windows create their parts after the first window has failed
+            if sys._getframe(1).f_locals["window"]["status"] != "draft":
+                time.sleep(0.2)
+            return mkstemp(*args, **kwargs)
+
+        monkeypatch.setattr(download, "download", failing)
+        monkeypatch.setattr(download.tempfile, "mkstemp", slow_mkstemp)
+        path = tmp_path / "transactions.csv"
+        windows = [{"status": status} for status in TRANSACTION_STATUSES]
+
+        with pytest.raises(ClientError):
+            envoy_client.transactions.download(path, windows=windows, workers=3)
+
+        # No parts are created by windows that were still running when it failed
+        time.sleep(0.5)
+        assert list(tmp_path.iterdir()) == []
+
+    def test_compression_for(self):
+        assert download.compression_for("export.csv.gz") == "gzip"
+        assert download.compression_for("export.csv.ZST") == "zstd"
+        assert download.compression_for("export.csv") is None
+
+    def test_unknown_compression(self):
+        with pytest.raises(ValueError):
+            download.compressed_writer(io.BytesIO(), "lz4")
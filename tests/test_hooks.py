@@ -0,0 +1,134 @@
+"""
+Tests for the envoy.hooks and envoy.metrics modules and instrumenting the client
+"""
+
+import pytest
+
+from envoy.exceptions import NotFound
+from envoy.metrics import Histogram, MetricsCollector
+from envoy.hooks import Hooks, Event, ALL, endpoint_template
+
+
+@pytest.mark.parametrize(
+    "endpoint,expected",
+    [
+        (("transactions",), "transactions"),
+        ("status", "status"),
+        (
+            ("transactions", "1617520d-8d27-422e-ba59-b36a5701ede6", "accept"),
+            "transactions/{id}/accept",
+        ),
+        (
+            ("counterparties", "01HTQXPSY42TS08TYMH2R4K37K", "contacts"),
+            "counterparties/{id}/contacts",
+        ),
+        (("users", "42"), "users/{id}"),
+        (("transactions", "send-prepared"), "transactions/send-prepared"),
+        (("accounts", "lookup"), "accounts/lookup"),
+    ],
+)
+def test_endpoint_template(endpoint, expected):
+    assert endpoint_template(endpoint) == expected
+
+
+def test_hooks():
+    hooks = Hooks()
+    assert not hooks
+
+    seen = []
+
+    @hooks.on("request_end")
+    def on_end(event):
+        seen.append(("end", event.method))
+
+    def broken(event):
+        raise RuntimeError("hooks should not break requests")
+
+    hooks.on(ALL, broken)
+    hooks.on(ALL, lambda event: seen.append(("all", event.type)))
+    assert hooks
+
+    hooks.emit(Event("request_end", "GET"))
+    hooks.emit(Event("retry", "GET"))
+    assert seen == [("end", "GET"), ("all", "request_end"), ("all", "retry")]
+
+    hooks.off("request_end", on_end)
+    hooks.emit(Event("request_end", "GET"))
+    assert seen[-1] == ("all", "request_end")
+
+    with pytest.raises(ValueError):
+        hooks.on("request_middle", on_end)
+
+
+def test_histogram():
+    histogram = Histogram((0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value)
+
+    assert histogram.cumulative() == [(0.1, 2), (1.0, 3), (float("inf"), 4)]
+    assert histogram.quantile(0.5) == 0.1
+    assert histogram.quantile(0.75) == 1.0
+    assert histogram.mean == pytest.approx(0.6625)
+    assert Histogram().quantile(0.5) is None
+
+
+@pytest.mark.mock_envoy(transactions=20, accounts=5, counterparties=5)
+class TestClientEvents(object):
+
+    def test_request_events(self, mock_envoy):
+        events = []
+        with mock_envoy.client() as client:
+            client.hooks.on(ALL, events.append)
+            rid = next(iter(mock_envoy.data["transactions"]))
+            client.transactions.detail(rid)
+
+        types = [event.type for event in events]
+        assert types == [
+            "request_start",
+            "request_end",
+            "auth_refresh",
+            "request_start",
+            "request_end",
+        ]
+
+        auth, refresh, end = events[1], events[2], events[4]
+        assert auth.endpoint == "authenticate" and auth.method == "POST"
+        assert auth.bytes_out > 0 and auth.bytes_in > 0
+        assert refresh.duration > 0
+
+        assert end.endpoint == "transactions/{id}"
+        assert end.status == 200
+        assert end.bytes_in > 0 and end.bytes_out == 0
+        assert set(end.timings) == {"connect", "ttfb", "body", "total"}
+        assert end.timings["connect"] == 0
+        assert auth.timings["connect"] > 0
+        assert end.duration >= end.timings["ttfb"]
+
+    def test_metrics(self, mock_envoy):
+        with mock_envoy.client() as client:
+            metrics = MetricsCollector(buckets=(0.5, 10.0)).attach(client)
+            for tx in client.transactions.iter_all(prefetch=False):
+                client.transactions.detail(tx["id"])
+
+            with pytest.raises(NotFound):
+                client.accounts.detail("01HTQXPSY42TS08TYMH2R4K37K")
+
+        assert metrics.durations[("GET", "transactions/{id}", "200")].count == 20
+        assert metrics.errors[("GET", "accounts/{id}", "NotFound")] == 1
+        assert metrics.auth_refreshes.count == 1
+
+        text = metrics.to_prometheus()
+        assert "# TYPE envoy_request_duration_seconds histogram" in text
+        detail = 'method="GET",endpoint="transactions/{id}"'
+        ok = f'{detail},status="200"'
+        assert f"envoy_request_duration_seconds_count{{{ok}}} 20" in text
+        assert f'envoy_request_duration_seconds_bucket{{{ok},le="+Inf"}} 20' in text
+        assert f'envoy_request_phase_seconds_count{{{detail},phase="ttfb"}} 20' in text
+
+        missing = 'method="GET",endpoint="accounts/{id}",error="NotFound"'
+        assert f"envoy_request_errors_total{{{missing}}} 1" in text
+        assert "envoy_auth_refresh_seconds_count 1" in text
+        assert text.endswith("\n")
+
+        metrics.reset()
+        assert metrics.durations == {}
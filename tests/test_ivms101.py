@@ -0,0 +1,229 @@
+"""
+Tests for the local IVMS101 validator in envoy.ivms101
+"""
+
+import copy
+import pytest
+
+from envoy import ivms101
+from envoy.utilities import IVMS101Validator
+from envoy.exceptions import ValidationError
+
+
+LEGAL_NAME = "LEGAL_PERSON_NAME_TYPE_CODE_LEGL"
+
+IDENTITY = {
+    "originator": {
+        "originatorPersons": [
+            {
+                "naturalPerson": {
+                    "name": {
+                        "nameIdentifier": [
+                            {
+                                "primaryIdentifier": "Bird",
+                                "secondaryIdentifier": "Rebecca",
+                                "nameIdentifierType": "LEGL",
+                            }
+                        ]
+                    },
+                    "geographicAddress": [
+                        {
+                            "addressType": "HOME",
+                            "addressLine": ["12 Main St", "Springfield"],
+                            "country": "US",
+                        }
+                    ],
+                    "dateAndPlaceOfBirth": {
+                        "dateOfBirth": "1984-02-11",
+                        "placeOfBirth": "Springfield",
+                    },
+                    "countryOfResidence": "US",
+                }
+            }
+        ],
+        "accountNumber": ["1MfNiLpqMx8oK8aDZhGiBUZ4qNjmaRVKbe"],
+    },
+    "beneficiary": {
+        "beneficiaryPersons": [
+            {
+                "legalPerson": {
+                    "name": {
+                        "nameIdentifier": [
+                            {
+                                "legalPersonName": "Acme Holdings",
+                                "legalPersonNameIdentifierType": LEGAL_NAME,
+                            }
+                        ]
+                    },
+                    "nationalIdentification": {
+                        "nationalIdentifier": "5493001KJTIIGC8Y1R12",
+                        "nationalIdentifierType": "LEIX",
+                    },
+                    "countryOfRegistration": "GB",
+                }
+            }
+        ],
+    },
+}
+
+
+def fields(errors):
+    return {error["field"] for error in errors}
+
+
+class TestIVMS101(object):
+
+    def test_valid(self):
+        assert ivms101.validate(IDENTITY) == []
+        assert ivms101.is_valid(IDENTITY)
+        ivms101.check(IDENTITY)
+
+    def test_required(self):
+        data = copy.deepcopy(IDENTITY)
+        del data["beneficiary"]
+        person = data["originator"]["originatorPersons"][0]["naturalPerson"]
+        del person["name"]["nameIdentifier"][0]["primaryIdentifier"]
+
+        path = "originator.originatorPersons[0].naturalPerson.name.nameIdentifier[0]"
+        assert fields(ivms101.validate(data)) == {
+            "beneficiary",
+            path + ".primaryIdentifier",
+        }
+
+    def test_structure(self):
+        data = copy.deepcopy(IDENTITY)
+        data["originator"]["accountNumber"] = "not a list"
+        data["originator"]["originatorPersons"][0]["naturalPerson"]["nickname"] = "Bec"
+
+        assert fields(ivms101.validate(data)) == {
+            "originator.accountNumber",
+            "originator.originatorPersons[0].naturalPerson.nickname",
+        }
+        assert ivms101.validate([], kind="person")[0]["error"] == "must be an object"
+
+    def test_codes(self):
+        data = copy.deepcopy(IDENTITY)
+        person = data["originator"]["originatorPersons"][0]["naturalPerson"]
+        person["geographicAddress"][0]["addressType"] = "WORK"
+        person["geographicAddress"][0]["country"] = "UK"
+        person["countryOfResidence"] = "ADDRESS_TYPE_CODE_HOME"
+
+        errors = ivms101.validate(data)
+        assert len(errors) == 3
+        assert "not one of BIZZ, GEOG, HOME" in errors[0]["error"]
+        assert "ISO 3166" in errors[1]["error"]
+
+    def test_constraints(self):
+        person = {
+            "naturalPerson": {
+                "name": {
+                    "nameIdentifier": [
+                        {"primaryIdentifier": "Bird", "nameIdentifierType": "ALIA"}
+                    ]
+                },
+                "dateAndPlaceOfBirth": {
+                    "dateOfBirth": "2999-01-01",
+                    "placeOfBirth": "Mars",
+                },
+            },
+        }
+        errors = ivms101.validate(person, kind="person")
+        assert errors[0]["error"] == "a legal name (LEGL) is required"
+        assert errors[1]["error"] == "must be in the past"
+
+        person["naturalPerson"]["dateAndPlaceOfBirth"]["dateOfBirth"] = "1990-01-01"
+        assert len(ivms101.validate(person, kind="person")) == 1
+
+        natural = IDENTITY["originator"]["originatorPersons"][0]["naturalPerson"]
+        legal = IDENTITY["beneficiary"]["beneficiaryPersons"][0]["legalPerson"]
+        both = {"naturalPerson": natural, "legalPerson": legal}
+        assert "either" in ivms101.validate(both, kind="person")[-1]["error"]
+        assert "either" in ivms101.validate({}, kind="person")[0]["error"]
+
+    def test_originator_information(self):
+        data = copy.deepcopy(IDENTITY)
+        person = data["originator"]["originatorPersons"][0]["naturalPerson"]
+        del person["geographicAddress"]
+        del person["dateAndPlaceOfBirth"]
+
+        errors = ivms101.validate(data)
+        assert fields(errors) == {"originator.originatorPersons[0].naturalPerson"}
+
+        # Only the originator has to be identified by more than a name
+        beneficiary = data["beneficiary"]["beneficiaryPersons"][0]
+        data["originator"]["originatorPersons"] = [beneficiary]
+        assert ivms101.validate(data) == []
+
+    @pytest.mark.parametrize(
+        "address, valid",
+        [
+            ({"addressType": "GEOG", "country": "DE"}, False),
+            (
+                {"addressType": "GEOG", "country": "DE", "streetName": "Hauptstr."},
+                False,
+            ),
+            (
+                {
+                    "addressType": "GEOG",
+                    "country": "DE",
+                    "streetName": "Hauptstr.",
+                    "buildingNumber": "4",
+                },
+                True,
+            ),
+            ({"addressType": "BIZZ", "country": "DE", "addressLine": ["x"] * 8}, False),
+        ],
+    )
+    def test_address(self, address, valid):
+        assert ivms101.is_valid(address, kind="address") == valid
+
+    def test_national_identification(self):
+        legal = copy.deepcopy(IDENTITY["beneficiary"]["beneficiaryPersons"][0])
+        ident = legal["legalPerson"]["nationalIdentification"]
+        assert ivms101.is_valid(legal, kind="person")
+
+        ident["nationalIdentifier"] = "5493001KJTIIGC8Y1R13"
+        ident["registrationAuthority"] = "RA000589"
+        assert len(ivms101.validate(legal, kind="person")) == 2
+
+        ident["nationalIdentifierType"] = "CCPT"
+        errors = ivms101.validate(legal, kind="person")
+        assert (
+            errors[0]["error"] == "CCPT is not a valid national identifier of a "
+            "legal person"
+        )
+
+    def test_lei(self):
+        assert ivms101.is_lei("5493001KJTIIGC8Y1R12")
+        assert not ivms101.is_lei("5493001KJTIIGC8Y1R13")
+        assert not ivms101.is_lei("5493001KJTIIGC8Y1R1")
+        assert not ivms101.is_lei(None)
+
+    def test_check(self):
+        with pytest.raises(ValidationError, match="beneficiary: is required"):
+            ivms101.check({"originator": IDENTITY["originator"]})
+        with pytest.raises(ValueError):
+            ivms101.validate(IDENTITY, kind="payment")
+
+    def test_compiled_schema_cache(self):
+        assert ivms101.compile_schema("address") is ivms101.compile_schema("address")
+
+    def test_validate_many(self):
+        invalid = copy.deepcopy(IDENTITY)
+        del invalid["originator"]
+        records = [IDENTITY, invalid] * 8
+
+        serial = ivms101.validate_many(records, workers=1)
+        assert [bool(errors) for errors in serial] == [False, True] * 8
+
+        parallel = ivms101.validate_many(records, workers=2, chunksize=3)
+        assert parallel == serial
+
+    def test_validator_check(self):
+        # The payload is rejected locally without a request to the node
+        validator = IVMS101Validator(client=None)
+        with pytest.raises(ValidationError):
+            validator.validate({}, check=True)
+
+        assert validator.errors(IDENTITY) == []
+        assert validator.errors_many([IDENTITY, {}], workers=1)[1]
@@ -0,0 +1,121 @@
+"""
+Tests for the envoy.limits module and limiting requests in the client
+"""
+
+import time
+import pytest
+import threading
+
+from envoy.client import Client
+from envoy.batch import imap
+from envoy.limits import TokenBucket, Limit, Governor, endpoint_group, get_governor
+
+
+class TestTokenBucket(object):
+
+    def test_burst(self):
+        bucket = TokenBucket(rate=10, burst=3)
+        assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+        assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+        assert bucket.reserve() == pytest.approx(0.2, abs=0.01)
+        assert bucket.delay() == pytest.approx(0.3, abs=0.01)
+
+    def test_rate(self):
+        bucket = TokenBucket(rate=200, burst=1)
+        started = time.monotonic()
+        for _ in range(11):
+            bucket.acquire()
+        assert time.monotonic() - started >= 0.045
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            TokenBucket(rate=0)
+
+
+class TestLimit(object):
+
+    def test_max_in_flight(self):
+        limit = Limit(max_in_flight=3)
+        lock = threading.Lock()
+        state = {"active": 0, "peak": 0}
+
+        def work(i):
+            with limit.acquire():
+                with lock:
+                    state["active"] += 1
+                    state["peak"] = max(state["peak"], state["active"])
+                time.sleep(0.005)
+                with lock:
+                    state["active"] -= 1
+
+        assert all(r.ok for r in imap(work, range(20), workers=8))
+        assert state["peak"] == 3
+
+        stats = limit.stats()
+        assert stats["requests"] == 20
+        assert stats["in_flight"] == 0 and stats["waiting"] == 0
+        assert stats["max_queue_delay"] > 0
+
+    def test_queue_delay(self):
+        limit = Limit(rate=100, burst=1)
+        for _ in range(5):
+            with limit.acquire():
+                pass
+
+        stats = limit.stats()
+        assert stats["queue_delay"] > 0
+        assert stats["total_queue_delay"] >= 0.03
+        assert stats["current_delay"] >= 0
+
+
+@pytest.mark.parametrize(
+    "method,endpoint,expected",
+    [
+        ("POST", ("transactions", "1234", "send"), "send"),
+        ("POST", ("transactions", "send-prepared"), "send"),
+        ("POST", ("transactions", "1234", "accept"), "send"),
+        ("GET", ("transactions", "1234", "accept"), "default"),
+        ("GET", ("transactions",), "list"),
+        ("GET", ("auditlogs",), "list"),
+        ("GET", ("status",), "default"),
+        ("GET", ("transactions", "export"), "list"),
+        ("GET", ("counterparties", "search"), "list"),
+        ("GET", ("transactions", "1234", "secure-envelopes"), "list"),
+        ("GET", ("transactions", "1234"), "default"),
+        ("POST", ("accounts",), "default"),
+    ],
+)
+def test_endpoint_group(method, endpoint, expected):
+    assert endpoint_group(method, endpoint) == expected
+
+
+def test_governor():
+    send, default = Limit(rate=1), Limit(max_in_flight=2)
+    governor = Governor({"send": send}, default=default)
+    assert governor.limit("POST", ("transactions", "1", "send")) is send
+    assert governor.limit("GET", ("transactions",)) is default
+
+    governor = Governor(list={"max_in_flight": 2})
+    assert governor.limit("GET", ("transactions",)).max_in_flight == 2
+    assert governor.limit("GET", ("transactions", "1")) is None
+    assert set(governor.stats()) == {"list"}
+
+    assert get_governor(None) is None
+    assert get_governor(governor) is governor
+    assert get_governor(default).limits == {"default": default}
+    with pytest.raises(TypeError):
+        get_governor(5)
+
+
+def test_client_limits(fake_session):
+    client = Client("https://envoy.test", limits={"list": Limit(max_in_flight=2)})
+    client.session = fake_session(delay=0.005)
+
+    results = imap(
+        lambda _: client.get("transactions", require_authentication=False),
+        range(12),
+        workers=6,
+    )
+    assert all(r.ok for r in results)
+    assert client.session.peak == 2
+    assert client.limits.stats()["list"]["requests"] == 12
@@ -0,0 +1,140 @@
+"""
+Tests for the local SQLite mirror in envoy.mirror
+"""
+
+import pytest
+
+from envoy.mirror import Mirror
+
+
+pytestmark = pytest.mark.mock_envoy(transactions=300, accounts=25, counterparties=10)
+
+
+@pytest.fixture
+def mirror(envoy_client):
+    with Mirror(client=envoy_client) as mirror:
+        yield mirror
+
+
+class TestMirror(object):
+
+    def test_sync(self, mock_envoy, mirror):
+        results = mirror.sync()
+        assert results["transactions"] == {
+            "seen": 300,
+            "inserted": 300,
+            "updated": 0,
+            "deleted": 0,
+        }
+        assert len(mirror.transactions) == 300
+        assert len(mirror.accounts) == 25
+        assert len(mirror.counterparties) == 10
+
+        tx = next(iter(mock_envoy.data["transactions"].values()))
+        assert dict(mirror.transactions.get(tx["id"]).data) == tx
+        assert tx["id"] in mirror.transactions
+        assert mirror.transactions.get("missing") is None
+        assert mirror.last_synced("transactions") is not None
+
+    def test_incremental_sync(self, mock_envoy, mirror):
+        mirror.sync()
+        assert mirror.sync()["transactions"] == {
+            "seen": 300,
+            "inserted": 0,
+            "updated": 0,
+            "deleted": 0,
+        }
+
+        txns = list(mock_envoy.data["transactions"].values())
+        txns[0].update(status="rejected", modified="2030-01-01T00:00:00Z")
+        del mock_envoy.data["transactions"][txns[1]["id"]]
+
+        results = mirror.sync(collections=["transactions"])
+        assert results["transactions"] == {
+            "seen": 299,
+            "inserted": 0,
+            "updated": 1,
+            "deleted": 1,
+        }
+        assert mirror.transactions.get(txns[0]["id"])["status"] == "rejected"
+        assert txns[1]["id"] not in mirror.transactions
+
+    def test_duplicate_records(self, mock_envoy, mirror, monkeypatch):
+        # Records that move between pages during a sync are returned twice
+        txns = list(mock_envoy.data["transactions"].values())
+        pages = txns[:150] + txns[100:]
+        resource = mirror.client.transactions
+        monkeypatch.setattr(resource, "iter_all", lambda params=None: iter(pages))
+
+        results = mirror.sync(collections=["transactions"])
+        assert results["transactions"] == {
+            "seen": 300,
+            "inserted": 300,
+            "updated": 0,
+            "deleted": 0,
+        }
+        assert len(mirror.transactions) == 300
+
+        txns[120].update(status="rejected", modified="2030-01-01T00:00:00Z")
+        results = mirror.sync(collections=["transactions"])
+        assert results["transactions"] == {
+            "seen": 300,
+            "inserted": 0,
+            "updated": 1,
+            "deleted": 0,
+        }
+
+    def test_filter(self, mock_envoy, mirror):
+        mirror.sync(collections=["transactions"])
+        txns = list(mock_envoy.data["transactions"].values())
+
+        review = mirror.transactions.filter(status="review")
+        assert [t["id"] for t in review] == [
+            t["id"] for t in txns if t["status"] == "review"
+        ]
+
+        statuses = ("review", "repair")
+        assert mirror.transactions.count(status=statuses) == len(
+            [t for t in txns if t["status"] in statuses]
+        )
+
+        cpid = txns[0]["counterparty_id"]
+        rows = mirror.transactions.filter(
+            counterparty_id=cpid, order_by="-last_update", limit=3
+        )
+        assert 0 < len(rows) <= 3
+        assert all(r["counterparty_id"] == cpid for r in rows)
+        assert [r["last_update"] for r in rows] == sorted(
+            (r["last_update"] for r in rows), reverse=True
+        )
+
+        with pytest.raises(ValueError):
+            mirror.transactions.filter(amount=1)
+
+    def test_addresses(self, mock_envoy, mirror):
+        mirror.sync()
+        tx = next(iter(mock_envoy.data["transactions"].values()))
+        found = mirror.transactions.by_address(tx["beneficiary_address"])
+        assert tx["id"] in [t["id"] for t in found]
+
+        accounts = list(mock_envoy.data["accounts"].values())
+        addresses = [
+            addr["crypto_address"]
+            for acct in accounts
+            for addr in acct["crypto_addresses"]
+        ]
+        assert mirror.accounts.by_address(addresses[0])["id"] == accounts[0]["id"]
+        assert mirror.accounts.by_address("unknown") is None
+
+        found = mirror.accounts.lookup(addresses + ["unknown"])
+        assert set(found) == set(addresses)
+
+    def test_persistent(self, envoy_client, tmp_path):
+        path = str(tmp_path / "mirror.db")
+        with Mirror(path, client=envoy_client) as mirror:
+            mirror.sync(collections=["counterparties"])
+
+        with Mirror(path) as mirror:
+            assert len(mirror.counterparties) == 10
+            with pytest.raises(ValueError):
+                mirror.sync()
@@ -0,0 +1,73 @@
+"""
+Integration tests of the client against the mock Envoy node in envoy.mock
+"""
+
+import io
+import csv
+import pytest
+
+from envoy.transactions import Transaction
+from envoy.exceptions import NotFound, ServerError
+
+
+pytestmark = pytest.mark.mock_envoy(
+    transactions=250, accounts=20, counterparties=10, page_size=40
+)
+
+
+class TestMockEnvoy(object):
+
+    def test_status(self, envoy_client):
+        assert envoy_client.prefix == "http"
+        assert envoy_client.status()["status"] == "ok"
+
+    def test_authentication(self, mock_envoy, envoy_client):
+        assert not envoy_client.is_authenticated()
+        page = envoy_client.transactions.list()
+        assert envoy_client.is_authenticated()
+        assert len(page) == 40
+
+        # Credentials are reused for subsequent requests
+        count = mock_envoy.authentications
+        envoy_client.accounts.list()
+        assert mock_envoy.authentications == count
+
+    def test_iter_all(self, mock_envoy, envoy_client):
+        transactions = list(envoy_client.transactions.iter_all())
+        assert len(transactions) == 250
+        assert len({tx["id"] for tx in transactions}) == 250
+        assert all(isinstance(tx, Transaction) for tx in transactions)
+
+        review = list(envoy_client.transactions.iter_all({"status": "review"}))
+        assert 0 < len(review) < 250
+        assert all(tx["status"] == "review" for tx in review)
+
+    def test_detail_and_lookup(self, mock_envoy, envoy_client):
+        account = next(iter(mock_envoy.data["accounts"].values()))
+        assert envoy_client.accounts.detail(account["id"])["id"] == account["id"]
+
+        address = account["crypto_addresses"][0]["crypto_address"]
+        assert envoy_client.accounts.lookup(address)["id"] == account["id"]
+
+        with pytest.raises(NotFound):
+            envoy_client.accounts.lookup("notanaddress")
+
+    def test_search(self, envoy_client):
+        results = envoy_client.counterparties.search("vasp 1", limit=1)
+        assert results["name"] == "VASP 1"
+
+    def test_export(self, mock_envoy, envoy_client):
+        f = io.StringIO()
+        envoy_client.transactions.export(f)
+        assert f.getvalue().encode("utf-8") == mock_envoy.export_csv()
+
+        rows = list(csv.DictReader(io.StringIO(f.getvalue())))
+        assert len(rows) == len(mock_envoy.data["transactions"])
+
+    @pytest.mark.mock_envoy(transactions=10, error_rate=1.0, error_status=503)
+    def test_errors(self, mock_envoy):
+        with mock_envoy.client(max_retries=0) as envoy_client:
+            assert envoy_client.status()["status"] == "ok"
+            with pytest.raises(ServerError):
+                envoy_client.transactions.list()
+            assert mock_envoy.errors == 1
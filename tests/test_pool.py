@@ -0,0 +1,131 @@
+"""
+Tests for the multi-node client pool in envoy.pool
+"""
+
+import pytest
+
+from envoy.client import Client
+from envoy.pool import EnvoyPool, PoolResults
+from envoy.exceptions import AuthenticationError, ClientError, EnvoyError
+
+
+@pytest.fixture
+def nodes(mock_envoy_factory):
+    return {
+        f"node{i}": mock_envoy_factory(
+            transactions=5 * (i + 1), accounts=3, counterparties=2
+        )
+        for i in range(3)
+    }
+
+
+def node_config(server):
+    return {
+        "url": server.url,
+        "client_id": server.client_id,
+        "client_secret": server.client_secret,
+    }
+
+
+@pytest.fixture
+def pool(nodes):
+    config = {name: node_config(server) for name, server in nodes.items()}
+    with EnvoyPool(config, timeout=10.0) as pool:
+        yield pool
+
+
+class TestEnvoyPool(object):
+
+    def test_shared(self, pool):
+        assert len(pool) == 3
+        for name in pool:
+            client = pool[name]
+            assert client.session is pool.session
+            assert client.adapter is pool.adapter
+            assert client.scheduler is pool.scheduler
+
+    def test_route(self, pool, nodes):
+        txns = pool["node1"].transactions.list()
+        assert len(txns) == 10
+        assert nodes["node1"].requests > 0
+        assert nodes["node0"].requests == 0
+
+        with pytest.raises(ClientError):
+            pool["missing"]
+
+    def test_fan_out(self, pool, nodes):
+        results = pool.transactions.list()
+        assert results.ok
+        assert {name: len(page) for name, page in results.items()} == {
+            "node0": 5,
+            "node1": 10,
+            "node2": 15,
+        }
+
+        merged = results.merged()
+        assert len(merged) == 30
+        ids = {name: set(server.data["transactions"]) for name, server in nodes.items()}
+        for name, record in results.records():
+            assert record["id"] in ids[name]
+
+        # The connections to every node are kept in the shared pool
+        assert len(pool.adapter.poolmanager.pools) == 3
+
+    def test_subset(self, pool, nodes):
+        results = pool.accounts.list(nodes=["node2"])
+        assert list(results) == ["node2"]
+        assert nodes["node0"].requests == 0
+
+        with pytest.raises(ClientError):
+            pool.map(lambda client: None, nodes=["missing"])
+
+    def test_errors(self, pool, nodes):
+        config = node_config(nodes["node0"])
+        config["client_secret"] = "wrong"
+        pool.add("bad", config)
+
+        results = pool.counterparties.list()
+        assert not results.ok
+        assert set(results) == {"node0", "node1", "node2"}
+        assert isinstance(results.errors["bad"], AuthenticationError)
+
+        with pytest.raises(EnvoyError, match="bad"):
+            results.raise_for_errors()
+
+    def test_add_remove(self, pool, nodes):
+        with pytest.raises(ClientError):
+            pool.add("node0", nodes["node0"].url)
+
+        client = nodes["node0"].client()
+        assert pool.add("own", client) is client
+        assert pool.status(nodes=["own"])["own"]["status"] == "ok"
+
+        assert pool.remove("own") is client
+        assert "own" not in pool
+
+        # Closing a client in the pool does not close the shared session
+        pool.remove("node1")
+        assert pool.transactions.list().ok
+
+    def test_results(self):
+        results = PoolResults(a=[1, 2], b=None, c={"id": 3})
+        assert results.merged() == [1, 2, {"id": 3}]
+        assert results.raise_for_errors() is results
+
+    def test_merged_records(self, pool, nodes):
+        # Mappings such as the status or the detail of a record are not iterated
+        statuses = pool.status().merged()
+        assert [status["status"] for status in statuses] == ["ok"] * 3
+
+        tx = next(iter(nodes["node1"].data["transactions"].values()))
+        results = pool.transactions.detail(tx["id"], nodes=["node1"])
+        assert [(name, record["id"]) for name, record in results.records()] == [
+            ("node1", tx["id"])
+        ]
+
+    def test_shared_session_client(self, nodes):
+        with EnvoyPool() as pool:
+            client = Client(session=pool.session, **node_config(nodes["node0"]))
+            assert client.adapter is pool.adapter
+            client.close()
+            assert len(client.transactions.list()) == 5
@@ -2,6 +2,8 @@
 Tests for the envoy.records module
 """
 
+import pytest
+
 from envoy.records import *
 
 
@@ -80,3 +82,96 @@ def test_record_of_record_lists():
     assert isinstance(record["nested"], Record)
     assert isinstance(record["nested"]["people"], RecordList)
     assert isinstance(record["nested"]["fruits"], list)
+
+
+def test_lazy_record(transaction):
+    payload = {"transaction": dict(transaction), "tags": [{"name": "a"}, {"name": "b"}]}
+    record = Record(payload, lazy=True)
+
+    # The lazy record references the payload rather than copying it
+    assert record.data is payload
+    assert record["transaction"].data is payload["transaction"]
+    assert record["tags"].data is payload["tags"]
+
+    # Nested records are wrapped once and then cached
+    assert record["transaction"] is record["transaction"]
+    assert record["tags"] is record["tags"]
+    assert record["tags"][0] is record["tags"][0]
+    assert record["tags"][-1] is record["tags"][1]
+    assert record["tags"][1]["name"] == "b"
+
+
+def test_lazy_record_update():
+    payload = {"nested": {"a": 1}, "b": 2}
+    record = Record(payload, lazy=True)
+    nested = record["nested"]
+
+    record |= {"nested": {"a": 3}}
+    assert payload == {"nested": {"a": 1}, "b": 2}
+    assert record["nested"] is not nested
+    assert record["nested"]["a"] == 3
+
+
+def test_record_copies():
+    payload = {"nested": {"a": 1}}
+    record = Record(payload)
+    assert record.data is not payload
+    assert record["nested"] is not record["nested"]
+
+    # Lazy mode is not available when keyword data is specified
+    record = Record(payload, lazy=True, b=2)
+    assert record.data is not payload
+    assert record["b"] == 2
+
+
+@pytest.mark.parametrize("lazy", [True, False])
+def test_record_list_index(lazy):
+    records = RecordList([{"a": 1}, {"a": 2}, {"a": 3}], lazy=lazy)
+    assert records[-1]["a"] == 3
+    assert records[-3]["a"] == 1
+
+    for i in (-4, -5, 3):
+        with pytest.raises(IndexError):
+            records[i]
+
+
+def test_paginated_records_do_not_modify_data(transactions):
+    payload = {"transactions": transactions, "page": {"page_size": 4}, "count": 4}
+    records = PaginatedRecords(payload, lazy=True)
+
+    assert records.data is transactions
+    assert records.page == {"page_size": 4}
+    assert records.count == 4
+    assert set(payload.keys()) == {"transactions", "page", "count"}
+
+
+def test_compact_records(transactions):
+    from envoy.client import Client
+    from envoy.transactions import PaginatedTransactions, Transaction
+
+    client = Client("https://envoy.test")
+    page = PaginatedTransactions(
+        {"transactions": transactions}, parent=client.transactions, lazy=True
+    )
+
+    for tx in page:
+        assert isinstance(tx, Transaction)
+        assert not hasattr(tx, "__dict__")
+
+        # The nested resource is created when it is first accessed
+        assert not hasattr(tx, "_secure_envelopes")
+        envelopes = tx.secure_envelopes
+        assert envelopes is tx.secure_envelopes
+        assert envelopes.endpoint == ("transactions", tx["id"], "secure-envelopes")
+
+
+def test_record_copy(transaction):
+    from envoy.transactions import Transaction
+
+    record = Transaction(transaction, parent="parent", lazy=True)
+    clone = record.copy()
+
+    assert isinstance(clone, Transaction)
+    assert clone.parent == "parent"
+    assert clone.data == record.data
+    assert clone.data is not record.data
@@ -0,0 +1,53 @@
+"""
+Tests for the envoy.refresh module
+"""
+
+import time
+import threading
+
+from envoy.refresh import RefreshScheduler
+
+
+class MockClient(object):
+
+    def __init__(self):
+        self.refreshed = threading.Event()
+        self.calls = 0
+
+    def _background_refresh(self):
+        self.calls += 1
+        self.refreshed.set()
+
+
+def test_schedule_refresh():
+    scheduler = RefreshScheduler()
+    client = MockClient()
+
+    scheduler.schedule(client, 0.05)
+    assert 0 < scheduler.scheduled(client) <= 0.05
+    assert client.refreshed.wait(2.0)
+    assert client.calls == 1
+    assert scheduler.scheduled(client) is None
+
+
+def test_reschedule_refresh():
+    scheduler = RefreshScheduler()
+    client = MockClient()
+
+    scheduler.schedule(client, 10.0)
+    scheduler.schedule(client, 0.01)
+    assert client.refreshed.wait(2.0)
+
+    time.sleep(0.05)
+    assert client.calls == 1
+
+
+def test_cancel_refresh():
+    scheduler = RefreshScheduler()
+    client = MockClient()
+
+    scheduler.schedule(client, 0.05)
+    scheduler.cancel(client)
+    assert scheduler.scheduled(client) is None
+    assert not client.refreshed.wait(0.2)
+    assert client.calls == 0
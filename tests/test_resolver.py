@@ -0,0 +1,144 @@
+"""
+Tests for the local crypto address index in envoy.resolver
+"""
+
+import pytest
+
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+
+from envoy.mirror import Mirror
+from envoy.exceptions import NotFound
+from envoy.resolver import AddressResolver
+
+
+pytestmark = pytest.mark.mock_envoy(transactions=10, accounts=30, counterparties=5)
+
+
+def all_addresses(mock_envoy):
+    return {
+        addr["crypto_address"]: acct["id"]
+        for acct in mock_envoy.data["accounts"].values()
+        for addr in acct["crypto_addresses"]
+    }
+
+
+class TestAddressResolver(object):
+
+    def test_lookup(self, mock_envoy, envoy_client):
+        resolver = AddressResolver(envoy_client)
+        envoy_client.accounts.resolver = resolver
+        addresses = all_addresses(mock_envoy)
+
+        for address, rid in addresses.items():
+            assert envoy_client.accounts.lookup(address)["id"] == rid
+
+        # Every lookup is resolved by the index after the initial scan
+        stats = resolver.stats()
+        assert stats["hits"] == len(addresses)
+        assert stats["remote"] == 0
+        assert stats["addresses"] == len(addresses)
+        assert stats["accounts"] == 30
+
+        # The returned records are accounts of the resource
+        account = envoy_client.accounts.lookup(next(iter(addresses)))
+        assert account.parent is envoy_client.accounts
+
+    def test_fallback(self, mock_envoy, envoy_client):
+        resolver = AddressResolver(envoy_client, refresh_interval=None, negative_ttl=60)
+        resolver.refresh()
+
+        acct = {
+            "id": "01NEWACCOUNT000000000000000",
+            "customer_id": "999",
+            "crypto_addresses": [{"crypto_address": "mNEWADDRESS", "network": "BTC"}],
+        }
+        mock_envoy.data["accounts"][acct["id"]] = acct
+
+        assert resolver.lookup("mNEWADDRESS")["id"] == acct["id"]
+        assert resolver.lookup("mNEWADDRESS")["id"] == acct["id"]
+        assert resolver.remote == 1
+
+        # Unknown addresses are only looked up once while they are remembered
+        for _ in range(3):
+            with pytest.raises(NotFound):
+                resolver.lookup("mUNKNOWN")
+        assert resolver.remote == 2
+
+        resolver.fallback = False
+        with pytest.raises(NotFound):
+            resolver.lookup("mOTHER")
+        assert resolver.remote == 2
+
+    def test_incremental_refresh(self, mock_envoy, envoy_client):
+        resolver = AddressResolver(envoy_client)
+        assert resolver.refresh()["inserted"] == 30
+
+        accounts = list(mock_envoy.data["accounts"].values())
+        old = accounts[0]["crypto_addresses"][0]["crypto_address"]
+        accounts[0]["crypto_addresses"][0]["crypto_address"] = "mCHANGED"
+        accounts[0]["modified"] = "2030-01-01T00:00:00Z"
+        del mock_envoy.data["accounts"][accounts[1]["id"]]
+
+        counts = resolver.refresh()
+        assert counts == {"seen": 29, "inserted": 0, "updated": 1, "deleted": 1}
+        assert resolver.resolve("mCHANGED")["id"] == accounts[0]["id"]
+        assert resolver.resolve(old) is None
+        for addr in accounts[1]["crypto_addresses"]:
+            assert addr["crypto_address"] not in resolver
+
+    def test_stale_refresh(self, envoy_client, monkeypatch):
+        resolver = AddressResolver(envoy_client, refresh_interval=10)
+        resolver.refresh()
+
+        calls = []
+        monkeypatch.setattr(resolver, "_scan", lambda: calls.append(1) or {})
+        resolver.lookup_many([])
+        assert not calls
+
+        resolver.refreshed -= 11
+        resolver.lookup_many([])
+        assert calls == [1]
+
+    def test_lookup_many(self, mock_envoy, envoy_client):
+        resolver = AddressResolver(envoy_client)
+        addresses = all_addresses(mock_envoy)
+        results = resolver.lookup_many(list(addresses) + ["mUNKNOWN"])
+
+        assert results.pop("mUNKNOWN") is None
+        assert {addr: acct["id"] for addr, acct in results.items()} == addresses
+        assert resolver.remote == 1
+
+    def test_concurrent_stats(self, mock_envoy, envoy_client):
+        resolver = AddressResolver(envoy_client, refresh_interval=None)
+        addresses = list(all_addresses(mock_envoy)) * 20 + ["mUNKNOWN"] * 10
+        resolver.refresh()
+
+        def lookup(address):
+            with pytest.raises(NotFound) if address == "mUNKNOWN" else nullcontext():
+                resolver.lookup(address)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(lookup, addresses))
+
+        stats = resolver.stats()
+        assert stats["hits"] + stats["misses"] == len(addresses)
+        assert stats["misses"] == stats["remote"] == 10
+
+    def test_mirror(self, mock_envoy, envoy_client):
+        with Mirror() as mirror:
+            resolver = AddressResolver(envoy_client, mirror=mirror)
+            addresses = all_addresses(mock_envoy)
+
+            for address, rid in addresses.items():
+                assert resolver.lookup(address)["id"] == rid
+
+            assert resolver.remote == 0
+            assert len(resolver) == len(addresses)
+            assert resolver.stats()["accounts"] == 30
+            assert len(mirror.accounts) == 30
+
+            results = resolver.lookup_many(list(addresses)[:5] + ["mUNKNOWN"])
+            assert results.pop("mUNKNOWN") is None
+            for address, account in results.items():
+                assert account["id"] == addresses[address]
@@ -0,0 +1,125 @@
+"""
+Tests for the envoy.resource module
+"""
+
+import pytest
+
+from envoy.resource import Resource
+from envoy.exceptions import ValidationError
+from envoy.records import Record, PaginatedRecords
+
+
+class MockClient(object):
+    """
+    Returns pages of records from the specified pages, keyed by next page token.
+    """
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.calls = []
+
+    def get(self, *endpoint, params=None, require_authentication=True):
+        params = params or {}
+        self.calls.append(params)
+        return self.pages[params.get("next_page_token", None)]()
+
+    def post(self, data, *endpoint, params=None, require_authentication=True):
+        if data.get("fail"):
+            raise ValidationError("could not create thing")
+        return dict(data, id=f"t{data['n']}")
+
+    def put(self, data, *endpoint, params=None, require_authentication=True):
+        return dict(data, updated=True)
+
+    def delete(self, *endpoint, params=None, require_authentication=True):
+        self.calls.append(endpoint)
+        return None
+
+
+class Things(Resource):
+
+    @property
+    def endpoint(self):
+        return "things"
+
+
+def make_pages(n, size=3):
+    pages = {}
+    for i in range(n):
+        token = None if i == 0 else f"page{i}"
+        nxt = f"page{i+1}" if i + 1 < n else ""
+
+        def page(i=i, nxt=nxt):
+            things = [{"id": i * size + j} for j in range(size)]
+            return {
+                "things": things,
+                "page": {"page_size": size, "next_page_token": nxt},
+            }
+
+        pages[token] = page
+    return pages
+
+
+@pytest.mark.parametrize("prefetch", [True, False])
+def test_iter_all(prefetch):
+    client = MockClient(make_pages(4))
+    records = list(Things(client).iter_all({"status": "review"}, prefetch=prefetch))
+
+    assert [r["id"] for r in records] == list(range(12))
+    assert all(isinstance(r, Record) for r in records)
+    assert len(client.calls) == 4
+    assert all(call["status"] == "review" for call in client.calls)
+
+
+def test_iter_all_single_page():
+    client = MockClient({None: lambda: {"things": [{"id": 1}]}})
+    records = list(Things(client).iter_all())
+    assert len(records) == 1
+    assert len(client.calls) == 1
+
+
+def test_iter_all_repeated_token():
+    client = MockClient(
+        {
+            None: lambda: {"things": [{"id": 1}], "page": {"next_page_token": "a"}},
+            "a": lambda: {"things": [{"id": 2}], "page": {"next_page_token": "a"}},
+        }
+    )
+    records = list(Things(client).iter_all())
+    assert [r["id"] for r in records] == [1, 2]
+
+
+def test_next_page_token():
+    page = PaginatedRecords({"things": [], "page": {"next_page_token": "abc"}})
+    assert page.has_next_page()
+    assert page.next_page_token == "abc"
+
+    page = PaginatedRecords({"things": [], "page": None})
+    assert not page.has_next_page()
+
+
+def test_bulk_create():
+    items = ({"n": i, "fail": i == 3} for i in range(10))
+    results = list(Things(MockClient({})).bulk_create(items, workers=4))
+
+    assert [r.index for r in results] == list(range(10))
+    assert [r.ok for r in results] == [i != 3 for i in range(10)]
+    assert isinstance(results[3].error, ValidationError)
+    assert results[5].value["id"] == "t5"
+    assert isinstance(results[5].value, Record)
+
+
+def test_bulk_update():
+    items = [{"id": "a"}, {"name": "missing id"}, {"id": "c"}]
+    results = list(Things(MockClient({})).bulk_update(items, workers=2))
+
+    assert [r.ok for r in results] == [True, False, True]
+    assert results[2].value["updated"]
+
+
+def test_bulk_delete():
+    client = MockClient({})
+    results = list(Things(client).bulk_delete(["a", {"id": "b"}, "c"], workers=2))
+
+    assert all(r.ok for r in results)
+    assert sorted(client.calls) == [("things", "a"), ("things", "b"), ("things", "c")]
@@ -0,0 +1,149 @@
+"""
+Tests for the envoy.retry module and retrying requests in the client
+"""
+
+import pytest
+
+from envoy.client import Client
+from envoy.exceptions import ServerError, ClientError
+from envoy.retry import RetryPolicy, get_retry_policy, parse_retry_after
+
+
+@pytest.fixture
+def busy(fake_reply):
+    """
+    Returns a function that creates a 503 reply with the optional Retry-After header.
+    """
+
+    def busy(retry_after=None):
+        headers = {"Retry-After": retry_after} if retry_after is not None else None
+        return fake_reply(503, headers=headers)
+
+    return busy
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr("envoy.client.time.sleep", sleeps.append)
+    return sleeps
+
+
+@pytest.mark.parametrize(
+    "method,status,expected",
+    [
+        ("GET", 503, True),
+        ("get", 504, True),
+        ("PUT", 502, True),
+        ("DELETE", 429, True),
+        ("POST", 429, True),
+        ("POST", 503, False),
+        ("GET", 500, False),
+        ("GET", 404, False),
+    ],
+)
+def test_is_retryable(method, status, expected):
+    assert RetryPolicy().is_retryable(method, status) is expected
+
+
+def test_backoff(busy):
+    policy = RetryPolicy(
+        total=10, backoff=1.0, max_backoff=8.0, deadline=None, jitter=False
+    )
+    delays = [policy.next_delay("GET", busy(), i, 0.0) for i in range(6)]
+    assert delays == [1.0, 2.0, 4.0, 8.0, 8.0, 8.0]
+
+    policy.jitter = True
+    for i in range(6):
+        assert 0 <= policy.next_delay("GET", busy(), i, 0.0) <= min(2**i, 8)
+
+
+def test_limits(busy):
+    policy = RetryPolicy(total=2, backoff=1.0, deadline=5.0, jitter=False)
+    assert policy.next_delay("GET", busy(), 2, 0.0) is None
+    assert policy.next_delay("GET", busy(), 1, 2.0) == 2.0
+    assert policy.next_delay("GET", busy(), 1, 3.5) is None
+    assert policy.next_delay("GET", busy("10"), 0, 0.0) is None
+
+
+def test_retry_after_limits(busy):
+    policy = RetryPolicy(max_backoff=8.0, deadline=None, jitter=False)
+    assert policy.next_delay("GET", busy("3"), 0, 0.0) == 3.0
+    assert policy.next_delay("GET", busy("3600"), 0, 0.0) == 8.0
+
+    # Retry-After values that are not finite fall back to the exponential backoff
+    assert policy.next_delay("GET", busy("nan"), 0, 0.0) == 0.5
+    assert policy.next_delay("GET", busy("inf"), 1, 0.0) == 1.0
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    [
+        (None, None),
+        ("", None),
+        ("3", 3.0),
+        ("1.5", 1.5),
+        ("-1", 0.0),
+        ("Wed, 21 Oct 2015 07:28:00 GMT", 0.0),
+        ("soon", None),
+        ("nan", None),
+        ("inf", None),
+        ("-inf", None),
+    ],
+)
+def test_parse_retry_after(value, expected):
+    assert parse_retry_after(value) == expected
+
+
+def test_get_retry_policy():
+    assert get_retry_policy(None) is None
+    assert get_retry_policy(False) is None
+    assert isinstance(get_retry_policy(True), RetryPolicy)
+    assert get_retry_policy(5).total == 5
+
+    policy = RetryPolicy()
+    assert get_retry_policy(policy) is policy
+
+    with pytest.raises(TypeError):
+        get_retry_policy("always")
+
+
+class TestClientRetries(object):
+
+    def test_no_retry(self, sleeps, fake_session):
+        client = Client("https://envoy.test")
+        client.session = fake_session([503])
+        with pytest.raises(ServerError):
+            client.status()
+        assert client.session.calls == 1
+
+    def test_retry(self, sleeps, fake_session):
+        client = Client("https://envoy.test", retry=RetryPolicy(jitter=False))
+        client.session = fake_session([503, 429, 502])
+        assert client.status() == {"status": "ok"}
+        assert client.session.calls == 4
+        assert sleeps == [0.5, 1.0, 2.0]
+
+    def test_retry_after(self, sleeps, fake_session, fake_reply):
+        client = Client("https://envoy.test", retry=True)
+        client.session = fake_session([fake_reply(429, headers={"Retry-After": "2"})])
+        assert client.status() == {"status": "ok"}
+        assert sleeps == [2.0]
+
+    def test_exhausted(self, sleeps, fake_session):
+        client = Client("https://envoy.test", retry=2)
+        client.session = fake_session([503, 503, 503])
+        with pytest.raises(ServerError):
+            client.status()
+        assert client.session.calls == 3
+
+    def test_not_idempotent(self, sleeps, fake_session):
+        client = Client("https://envoy.test", retry=True)
+        client.session = fake_session([503, 429])
+        with pytest.raises(ServerError):
+            client.post({}, "status", require_authentication=False)
+
+        client.session = fake_session([429, 400])
+        with pytest.raises(ClientError):
+            client.post({}, "status", require_authentication=False)
+        assert client.session.calls == 2
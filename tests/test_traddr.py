@@ -0,0 +1,103 @@
+"""
+Tests for the local travel address codec in envoy.traddr
+"""
+
+import pytest
+
+from envoy import traddr
+from envoy.mock import MockEnvoyHandler
+from envoy.exceptions import ClientError
+
+
+URI = "trisa.example.com:443/accounts/01HV6RV08YNR2GH8MEEFCV4NKN?mode=trisa&t=i"
+
+
+class TestTravelAddressCodec(object):
+
+    def test_node_addresses(self, accounts):
+        # Travel addresses issued by an Envoy node round trip through the local codec
+        for account in accounts:
+            uri = traddr.decode(account["travel_address"])
+            assert uri.startswith("trisa.rotational.io:443/accounts/" + account["id"])
+            assert traddr.encode(uri) == account["travel_address"]
+
+    def test_round_trip(self):
+        encoded = traddr.encode(URI)
+        assert encoded.startswith("ta")
+        assert traddr.decode(encoded) == URI
+        assert traddr.is_valid(encoded)
+
+    @pytest.mark.parametrize("data", [b"", b"\0", b"\0\0\x01", b"\xff" * 33, b"\x01\0"])
+    def test_base58(self, data):
+        assert traddr.b58decode(traddr.b58encode(data)) == data
+
+    def test_base58_vectors(self):
+        assert traddr.b58encode(b"hello world") == "StV1DL6CwTryKyV"
+        assert traddr.b58encode(b"\0\0\x28\x7f\xb4\xcd") == "11233QC4"
+
+    @pytest.mark.parametrize(
+        "value",
+        [
+            "",
+            "xx4n7VX9D53cuj5Z7",
+            "ta0OIl",
+            "ta1111",
+            None,
+        ],
+    )
+    def test_invalid(self, value):
+        with pytest.raises(ValueError):
+            traddr.decode(value)
+        assert not traddr.is_valid(value)
+
+    def test_checksum(self):
+        encoded = traddr.encode(URI)
+        tampered = encoded[:-1] + ("2" if encoded[-1] != "2" else "3")
+        with pytest.raises(ValueError, match="checksum"):
+            traddr.decode(tampered)
+
+    def test_many(self):
+        uris = [f"trisa.example.com:443/accounts/{i}?mode=trisa&t=i" for i in range(50)]
+        encoded = traddr.encode_many(uris)
+        assert traddr.decode_many(encoded) == uris
+        decoded = traddr.decode_many(encoded[:2] + ["bad"], strict=False)
+        assert decoded == uris[:2] + [None]
+        with pytest.raises(ValueError):
+            traddr.decode_many(["bad"])
+
+
+@pytest.mark.mock_envoy(transactions=1, accounts=1, counterparties=1)
+class TestTravelAddresses(object):
+
+    def test_local(self, mock_envoy, envoy_client):
+        ta = envoy_client.utilities.travel_addresses
+        encoded = ta.encode(URI)
+        assert ta.decode(encoded) == URI
+        assert ta.decode_many(ta.encode_many([URI, URI])) == [URI, URI]
+        assert mock_envoy.travel_address_requests == 0
+
+    def test_remote_round_trip(self, mock_envoy, envoy_client):
+        # The mock node encodes with envoy.traddr, so this only checks the requests;
+        # compatibility is checked against real node vectors in test_node_addresses
+        ta = envoy_client.utilities.travel_addresses
+        encoded = ta.encode(URI, remote=True)
+        assert ta.decode(encoded, remote=True) == URI
+        assert mock_envoy.travel_address_requests == 2
+
+    def test_verify_mismatch(self, envoy_client, monkeypatch):
+        def travel_address(handler, action, body):
+            return handler.reply(200, {"encoded": "ta" + body["decoded"]})
+
+        monkeypatch.setattr(MockEnvoyHandler, "travel_address", travel_address)
+        ta = envoy_client.utilities.travel_addresses
+        assert ta.verify([URI]) == [(URI, traddr.encode(URI), "ta" + URI)]
+
+    def test_fallback(self, mock_envoy, envoy_client):
+        ta = envoy_client.utilities.travel_addresses
+        with pytest.raises(ClientError):
+            ta.decode("tanotvalid")
+        assert mock_envoy.travel_address_requests == 1
+
+        with pytest.raises(ClientError):
+            ta.decode_many([ta.encode(URI), "tanotvalid"])
+        assert mock_envoy.travel_address_requests == 2